@@ -1,5 +1,6 @@
 """音频捕获模块 - 处理本机/网络音频的录制和流式传输"""
 
+import asyncio
 import threading
 import time
 import warnings
@@ -7,6 +8,12 @@ from typing import Dict, List, Optional
 
 import numpy as np
 
+from audio_metrics import AudioLevelMeter
+from audio_mixer import AudioMixer, MixConfig
+from audio_pipeline import AudioRingBuffer, AudioSender, PcmConverter
+from audio_resampler import Downmixer, PolyphaseResampler
+from audio_vad import VadConfig
+
 # Suppress SoundcardRuntimeWarning about data discontinuity
 try:
     import soundcard as sc
@@ -24,9 +31,175 @@ except ImportError:
 
 _warned_missing_soundcard = False
 
+# 支持的本机音频源："mixed" 同时采集麦克风与系统音频并混音
+AUDIO_SOURCES = ("system", "microphone", "mixed")
+
+
+class AudioDeviceRegistry:
+    """音频设备注册表 - 在后台线程中枚举设备并缓存结果。
+
+    - HTTP 接口直接读取缓存，不在事件循环线程上枚举设备
+    - 缓存超过 TTL 后在后台刷新（期间继续返回旧结果）
+    - 后台轮询检测设备热插拔与默认设备变化
+    - recorder 创建时按 id / 名称 O(1) 查找设备对象
+    """
+
+    def __init__(self, ttl: float = 10.0, poll_interval: float = 5.0):
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._devices: Optional[Dict[str, List[Dict[str, str]]]] = None
+        self._microphones: Dict[str, object] = {}
+        self._speakers: Dict[str, object] = {}
+        self._loopbacks: Dict[str, object] = {}
+        self._default_microphone = None
+        self._default_speaker = None
+        self._updated_at = 0.0
+        self.generation = 0  # 设备列表每变化一次加一
+
+        self._poll_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self, ttl: Optional[float] = None, poll_interval: Optional[float] = None) -> None:
+        """启动后台轮询线程（重复调用无副作用）"""
+        if ttl is not None:
+            self.ttl = ttl
+        if poll_interval is not None:
+            self.poll_interval = poll_interval
+        if sc is None or (self._poll_thread and self._poll_thread.is_alive()):
+            return
+
+        self._stop_event.clear()
+        self._poll_thread = threading.Thread(
+            target=self._poll_loop, name="AudioDeviceRegistry", daemon=True
+        )
+        self._poll_thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _poll_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self.refresh()
+            self._stop_event.wait(self.poll_interval)
+
+    def refresh(self) -> bool:
+        """同步枚举设备并更新缓存，返回设备列表是否发生变化"""
+        result = {"input_devices": [], "output_devices": []}
+        if sc is None:
+            with self._lock:
+                self._devices = result
+                self._updated_at = time.monotonic()
+            return False
+
+        # 同一时间只允许一个枚举（后台轮询与按需刷新可能同时发生）
+        with self._refresh_lock:
+            try:
+                microphones = sc.all_microphones(include_loopback=False)
+                speakers = sc.all_speakers()
+                loopbacks = [
+                    mic for mic in sc.all_microphones(include_loopback=True)
+                    if getattr(mic, "isloopback", False)
+                ]
+                default_microphone = sc.default_microphone()
+                default_speaker = sc.default_speaker()
+            except Exception as e:
+                print(f"Error getting audio devices: {e}")
+                return False
+
+            # 获取所有输入设备（麦克风）与输出设备（扬声器，用于系统音频捕获）
+            for mic in microphones:
+                result["input_devices"].append({"id": str(mic.id), "name": str(mic.name)})
+            for speaker in speakers:
+                result["output_devices"].append(
+                    {"id": str(speaker.id), "name": str(speaker.name)}
+                )
+
+            with self._lock:
+                changed = self._devices is not None and (
+                    result != self._devices
+                    or getattr(default_microphone, "id", None) != getattr(self._default_microphone, "id", None)
+                    or getattr(default_speaker, "id", None) != getattr(self._default_speaker, "id", None)
+                )
+                self._devices = result
+                self._microphones = {str(mic.id): mic for mic in microphones}
+                self._speakers = {str(speaker.id): speaker for speaker in speakers}
+                self._loopbacks = {str(mic.name): mic for mic in loopbacks}
+                self._default_microphone = default_microphone
+                self._default_speaker = default_speaker
+                self._updated_at = time.monotonic()
+                if changed:
+                    self.generation += 1
+
+        if changed:
+            print(
+                f"🔌 Audio devices changed: {len(result['input_devices'])} input(s), "
+                f"{len(result['output_devices'])} output(s)"
+            )
+        return changed
+
+    def _is_fresh(self) -> bool:
+        return self._devices is not None and time.monotonic() - self._updated_at < self.ttl
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_lock.locked():
+            return
+        threading.Thread(target=self.refresh, name="AudioDeviceRefresh", daemon=True).start()
+
+    def get_devices(self) -> Dict[str, List[Dict[str, str]]]:
+        """返回设备列表（首次调用时同步枚举，之后返回缓存）"""
+        if self._devices is None:
+            self.refresh()
+        elif not self._is_fresh():
+            self._refresh_in_background()
+        with self._lock:
+            return self._devices or {"input_devices": [], "output_devices": []}
+
+    async def get_devices_async(self) -> Dict[str, List[Dict[str, str]]]:
+        """事件循环中使用：首次枚举放到线程池执行，不阻塞事件循环"""
+        if self._devices is None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.refresh)
+        return self.get_devices()
+
+    def _ensure_loaded(self) -> None:
+        if self._devices is None:
+            self.refresh()
+
+    def find_microphone(self, device_id: str):
+        self._ensure_loaded()
+        with self._lock:
+            return self._microphones.get(str(device_id))
+
+    def find_speaker(self, device_id: str):
+        self._ensure_loaded()
+        with self._lock:
+            return self._speakers.get(str(device_id))
+
+    def find_loopback(self, speaker_name: str):
+        self._ensure_loaded()
+        with self._lock:
+            return self._loopbacks.get(str(speaker_name))
+
+    def default_microphone(self):
+        self._ensure_loaded()
+        with self._lock:
+            return self._default_microphone
+
+    def default_speaker(self):
+        self._ensure_loaded()
+        with self._lock:
+            return self._default_speaker
+
+
+# 全局设备注册表
+device_registry = AudioDeviceRegistry()
+
 
 def get_audio_devices() -> Dict[str, List[Dict[str, str]]]:
-    """获取所有可用的音频输入和输出设备列表
+    """获取所有可用的音频输入和输出设备列表（来自设备注册表缓存）
 
     返回:
         {
@@ -34,38 +207,148 @@ def get_audio_devices() -> Dict[str, List[Dict[str, str]]]:
             "output_devices": [{"id": "...", "name": "..."}, ...]
         }
     """
-    result = {"input_devices": [], "output_devices": []}
+    return device_registry.get_devices()
 
-    if sc is None:
-        return result
 
-    try:
-        # 获取所有输入设备（麦克风）
-        microphones = sc.all_microphones(include_loopback=False)
-        for mic in microphones:
-            result["input_devices"].append({"id": str(mic.id), "name": str(mic.name)})
-
-        # 获取所有输出设备（扬声器，用于系统音频捕获）
-        speakers = sc.all_speakers()
-        for speaker in speakers:
-            result["output_devices"].append(
-                {"id": str(speaker.id), "name": str(speaker.name)}
-            )
-    except Exception as e:
-        print(f"Error getting audio devices: {e}")
+class _CaptureWorker:
+    """单个音频源配置的采集线程。
+
+    每个工作线程自己打开并使用 recorder（soundcard 的 recorder 需在同一线程中使用）。
+    新线程以“待命”状态启动，产出第一块音频时才由 AudioStreamer 提升为活动线程，
+    在此之前旧线程继续采集，从而实现无缝切换。
+    """
+
+    def __init__(
+        self,
+        streamer: "AudioStreamer",
+        source: str,
+        input_device_id: Optional[str],
+        output_device_id: Optional[str],
+    ):
+        self.streamer = streamer
+        self.source = source
+        self.input_device_id = input_device_id
+        self.output_device_id = output_device_id
+        self.converter = PcmConverter(streamer.chunk_size)
+        # 混音在采集采样率下进行，之后统一重采样到发送采样率
+        self.mixer = AudioMixer(streamer.capture_rate, streamer.capture_frames, streamer.mix_config)
+        self.resampler = PolyphaseResampler(
+            streamer.capture_rate, streamer.sample_rate, max_input_frames=streamer.capture_frames
+        )
+        self.retired = threading.Event()
+        self.requested_at = time.monotonic()
+        self._format_logged = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"AudioCapture-{source}", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self, timeout: float) -> None:
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def _running(self) -> bool:
+        return not self.retired.is_set() and not self.streamer._stop_event.is_set()
+
+    def _run(self) -> None:
+        if self.source == "mixed":
+            self._run_mixed()
+            return
+
+        recorder_ctx = self.streamer._create_recorder(
+            self.source, self.input_device_id, self.output_device_id
+        )
+        if recorder_ctx is None:
+            return
+
+        try:
+            with recorder_ctx as recorder:
+                while self._running():
+                    data = recorder.record(numframes=self.streamer.capture_frames)
+                    if data.size == 0:
+                        continue
+                    self._log_capture_format(data)
+                    if not self._deliver(self.resampler.process(data)):
+                        break
+        except Exception as capture_error:
+            print(f"Error capturing audio from {self.source}: {capture_error}")
+
+    def _deliver(self, samples: np.ndarray) -> bool:
+        """转换为 int16 后交给 AudioStreamer；返回 False 表示应当退出"""
+        if samples.shape[0] == 0:
+            return True
+        return self.streamer._deliver(self, self.converter.convert(samples))
+
+    def _log_capture_format(self, data: np.ndarray) -> None:
+        """原生格式采集时，首块到达后打印设备实际的采样率与声道数"""
+        if self._format_logged or not self.streamer.native_capture:
+            return
+        self._format_logged = True
+        print(
+            f"🎛️  Capturing {self.source} at {self.streamer.capture_rate} Hz x {data.shape[1]} ch, "
+            f"resampling to {self.streamer.sample_rate} Hz mono"
+        )
+
+    def _run_mixed(self) -> None:
+        """同时采集麦克风与系统音频并混音。
+
+        麦克风在当前线程采集并作为时钟基准；系统音频在辅助线程中采集，
+        写入容量约两块的环形缓冲区，两路互不阻塞，时间偏差被限制在两块以内。
+        """
+        streamer = self.streamer
+        mic_ctx = streamer._create_recorder("microphone", self.input_device_id, self.output_device_id)
+        system_ctx = streamer._create_recorder("system", self.input_device_id, self.output_device_id)
+        if mic_ctx is None or system_ctx is None:
+            return
 
-    return result
+        system_ring = AudioRingBuffer(streamer.capture_frames * 2, dtype=np.float32)
+        system_stop = threading.Event()
+        system_downmixer = Downmixer(streamer.capture_frames)
+        mic_downmixer = Downmixer(streamer.capture_frames)
+
+        def capture_system() -> None:
+            try:
+                with system_ctx as recorder:
+                    while not system_stop.is_set():
+                        data = recorder.record(numframes=streamer.capture_frames)
+                        if data.size:
+                            system_ring.write(system_downmixer.downmix(data))
+            except Exception as capture_error:
+                print(f"Error capturing audio from system: {capture_error}")
 
+        system_thread = threading.Thread(
+            target=capture_system, name="AudioCapture-mixed-system", daemon=True
+        )
+        system_thread.start()
 
-def _convert_float32_to_int16(channel_data: np.ndarray) -> bytes:
-    """将浮点音频数据转换为int16字节流"""
-    clipped = np.clip(channel_data, -1.0, 1.0)
-    data_int16 = (clipped * 32767).astype(np.int16)
-    return data_int16.tobytes()
+        try:
+            with mic_ctx as recorder:
+                while self._running():
+                    data = recorder.record(numframes=streamer.capture_frames)
+                    if data.size == 0:
+                        continue
+                    self._log_capture_format(data)
+
+                    mic = mic_downmixer.downmix(data)
+                    if streamer._mic_gated(mic.shape[0], streamer.capture_rate):
+                        mic[:] = 0.0
+                    mixed = self.mixer.mix(mic, system_ring)
+                    if not self._deliver(self.resampler.process(mixed)):
+                        break
+        except Exception as capture_error:
+            print(f"Error capturing audio from microphone: {capture_error}")
+        finally:
+            system_stop.set()
+            system_thread.join(timeout=1.5)
 
 
 class AudioStreamer:
-    """音频流控制器 - 支持系统输出与麦克风之间切换"""
+    """音频流控制器 - 支持系统输出、麦克风及两者混音之间无缝切换"""
 
     def __init__(
         self,
@@ -75,10 +358,27 @@ class AudioStreamer:
         chunk_size: int = 3840,
         input_device_id: Optional[str] = None,
         output_device_id: Optional[str] = None,
+        max_backlog_ms: int = 2000,
+        vad_config: Optional[VadConfig] = None,
+        keepalive_interval: float = 5.0,
+        min_chunk_size: Optional[int] = None,
+        mix_config: Optional[MixConfig] = None,
+        capture_rate: Optional[int] = None,
+        reconnect_buffer_ms: int = 0,
+        finalize_silence_ms: int = 0,
     ):
         self.ws = ws
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
+        # 采集块大小：自适应帧长时按最小帧采集，由发送线程负责拼帧
+        self.capture_size = min(chunk_size, min_chunk_size or chunk_size)
+        # 原生格式采集：按设备采样率与声道数录音，在本进程内降混并重采样到 sample_rate；
+        # 否则直接向系统请求 sample_rate 单声道（由 WASAPI/PulseAudio 重采样）
+        self.native_capture = capture_rate is not None
+        self.capture_rate = capture_rate or sample_rate
+        self.capture_frames = -(-self.capture_size * self.capture_rate // sample_rate)
+        self.max_backlog_ms = max_backlog_ms
+        self.mix_config = mix_config or MixConfig()
 
         self._stop_event = threading.Event()
         self._source_changed_event = threading.Event()
@@ -89,6 +389,40 @@ class AudioStreamer:
         self._output_device_id = output_device_id
         self._thread: Optional[threading.Thread] = None
 
+        # 采集工作线程：active 正在写入缓冲区，pending 为预先打开的待命线程
+        self._worker_lock = threading.Lock()
+        self._active_worker: Optional[_CaptureWorker] = None
+        self._pending_worker: Optional[_CaptureWorker] = None
+        self.switch_count = 0
+        self.switch_failures = 0
+        self.last_cutover_ms: Optional[float] = None
+        self.level_meter = AudioLevelMeter(sample_rate, chunk_size)
+
+        # 静音（VRChat MuteSelf）时屏蔽麦克风：麦克风源不写入缓冲区（发送线程只发送 keepalive），
+        # 混音源中麦克风置零、系统音频照常发送
+        self._mic_gate_at: Optional[float] = None  # 尾音结束、开始屏蔽的时刻；None 表示未静音
+        self.mic_gated_seconds = 0.0
+
+        # 采集线程只写入环形缓冲区，由独立的发送线程负责网络发送
+        # reconnect_buffer_ms > 0 时，Soniox 连接断开期间采集继续，缓冲区至少能容纳该时长的音频
+        self.reconnect_buffer_ms = reconnect_buffer_ms
+        # 连接正常时积压超过 max_backlog_ms 即丢弃；容量多出的部分只在断开期间用于缓冲
+        limit_samples = max(int(sample_rate * max_backlog_ms / 1000), chunk_size)
+        backlog_samples = max(int(sample_rate * reconnect_buffer_ms / 1000), limit_samples)
+        self._ring = AudioRingBuffer(backlog_samples, limit=limit_samples)
+        self._sender = AudioSender(
+            ws,
+            self._ring,
+            frame_samples=chunk_size,
+            name="AudioSender",
+            on_error=self._on_send_error,
+            sample_rate=sample_rate,
+            vad_config=vad_config,
+            keepalive_interval=keepalive_interval,
+            min_frame_samples=min_chunk_size,
+            finalize_silence_ms=finalize_silence_ms,
+        )
+
     def start(self) -> None:
         """启动音频流线程"""
         if self._thread and self._thread.is_alive():
@@ -97,6 +431,9 @@ class AudioStreamer:
         self._stop_event.clear()
         self._source_changed_event.clear()
 
+        self._ring.clear()
+        self._sender.start()
+
         self._thread = threading.Thread(
             target=self._run, name="AudioStreamer", daemon=True
         )
@@ -112,11 +449,83 @@ class AudioStreamer:
             thread.join(timeout=1.5)
 
         self._thread = None
+        self._sender.stop()
+
+    @property
+    def is_detached(self) -> bool:
+        return self._sender.detached
+
+    def detach(self) -> None:
+        """Soniox 连接关闭：停止发送，采集继续写入缓冲区，等待 attach() 到新连接"""
+        self._sender.detach()
+        self.ws = None
+
+    def attach(self, ws) -> None:
+        """连接到新的 Soniox 会话，并补发断开期间缓冲的音频"""
+        self.ws = ws
+        self._sender.attach(ws)
+
+    def set_suspended(self, suspended: bool) -> None:
+        """软暂停：保持连接，发送线程丢弃音频并只发送 keepalive"""
+        self._sender.set_suspended(suspended)
+
+    def set_mic_muted(self, muted: bool, tail_ms: int = 0) -> None:
+        """静音时屏蔽麦克风；tail_ms 为静音后继续发送的尾音时长，避免截断最后一个音节"""
+        if not muted:
+            self._mic_gate_at = None
+        elif self._mic_gate_at is None:
+            self._mic_gate_at = time.monotonic() + max(0, tail_ms) / 1000
+
+    @property
+    def mic_muted(self) -> bool:
+        return self._mic_gate_at is not None
+
+    def _mic_gated(self, samples: int, rate: int) -> bool:
+        """由采集线程调用：麦克风当前是否被屏蔽，屏蔽时累计被屏蔽的时长"""
+        gate_at = self._mic_gate_at
+        if gate_at is None or time.monotonic() < gate_at:
+            return False
+        self.mic_gated_seconds += samples / rate
+        return True
+
+    def request_finalize(self, suspend_after: bool = False) -> None:
+        """请求 Soniox 立即把已发送的音频确认为 final；suspend_after=True 时发送后进入软暂停"""
+        self._sender.request_finalize(suspend_after)
+
+    def _on_send_error(self) -> None:
+        """发送失败（连接已断开）时停止采集；启用跨连接缓冲时继续采集，等待重新连接"""
+        if self.reconnect_buffer_ms > 0:
+            return
+        self._stop_event.set()
+        self._source_changed_event.set()
+
+    def get_stats(self) -> dict:
+        """获取采集/发送缓冲区统计"""
+        stats = self._ring.get_stats(self.sample_rate)
+        stats.update(self._sender.get_stats())
+        stats["source_switches"] = self.switch_count
+        stats["source_switch_failures"] = self.switch_failures
+        stats["last_cutover_ms"] = self.last_cutover_ms
+        stats["capture_rate"] = self.capture_rate
+        stats["mic_muted"] = self.mic_muted
+        stats["mic_gated_seconds"] = self.mic_gated_seconds
+        worker = self._active_worker
+        if worker is not None and worker.source == "mixed":
+            stats.update(worker.mixer.get_stats())
+        return stats
+
+    def get_level_metrics(self) -> dict:
+        """取走当前统计窗口的电平/削波/抖动汇总"""
+        return self.level_meter.snapshot()
+
+    def get_session_audio_ms(self) -> float:
+        """当前连接上已发送给 Soniox 的音频时长（毫秒）"""
+        return self._sender.session_samples_sent * 1000 / self.sample_rate
 
     def set_source(self, source: str) -> bool:
         """切换音频源。返回是否发生了实际切换"""
-        if source not in ("system", "microphone"):
-            raise ValueError("Invalid audio source. Expect 'system' or 'microphone'.")
+        if source not in AUDIO_SOURCES:
+            raise ValueError("Invalid audio source. Expect 'system', 'microphone' or 'mixed'.")
 
         with self._source_lock:
             if source == self._current_source:
@@ -153,42 +562,94 @@ class AudioStreamer:
         with self._source_lock:
             return self._output_device_id
 
-    def _run(self) -> None:
-        """音频线程主循环"""
-        while not self._stop_event.is_set():
-            with self._source_lock:
-                source = self._current_source
+    def _deliver(self, worker: _CaptureWorker, samples: np.ndarray) -> bool:
+        """由采集线程调用：活动线程写入缓冲区；待命线程在首块到达时完成切换。
+
+        返回 False 表示该线程已被替换，应当退出。
+        """
+        retired = None
+        cutover_ms = 0.0
+        with self._worker_lock:
+            if worker is not self._active_worker:
+                if worker is not self._pending_worker:
+                    return False
+                # 在块边界上切换：旧线程写完的最后一块与新线程的第一块首尾相接
+                retired = self._active_worker
+                self._active_worker = worker
+                self._pending_worker = None
+                cutover_ms = (time.monotonic() - worker.requested_at) * 1000
+                if retired is not None:
+                    self.switch_count += 1
+                    self.last_cutover_ms = cutover_ms
+                self.level_meter.reset_timing()
+            # 静音中的麦克风不写入缓冲区；电平表照常统计，保持到达间隔连续
+            if worker.source != "microphone" or not self._mic_gated(samples.shape[0], self.sample_rate):
+                self._ring.write(samples)
+            self.level_meter.observe(samples)
+
+        if retired is not None:
+            retired.retired.set()
+            print(f"🎚️  Audio source cut over to '{worker.source}' in {cutover_ms:.0f} ms")
+        return True
 
-            recorder_ctx = self._create_recorder(source)
-            if recorder_ctx is None:
-                time.sleep(1.0)
-                continue
+    def _spawn_worker(self) -> None:
+        """按当前配置预先打开一个待命采集线程"""
+        with self._source_lock:
+            worker = _CaptureWorker(
+                self, self._current_source, self._input_device_id, self._output_device_id
+            )
 
-            # 清除切换信号，准备开始当前音频源
-            self._source_changed_event.clear()
+        with self._worker_lock:
+            previous = self._pending_worker
+            self._pending_worker = worker
+        if previous is not None:
+            previous.retired.set()
+        worker.start()
 
-            try:
-                with recorder_ctx as recorder:
-                    while (
-                        not self._stop_event.is_set()
-                        and not self._source_changed_event.is_set()
-                    ):
-                        data = recorder.record(numframes=self.chunk_size)
-                        if data.size == 0:
-                            continue
-
-                        payload = _convert_float32_to_int16(data[:, 0])
-                        try:
-                            self.ws.send(payload)
-                        except Exception as send_error:
-                            print(f"Error sending audio data: {send_error}")
-                            return
-            except Exception as capture_error:
-                print(f"Error capturing audio from {source}: {capture_error}")
-                time.sleep(0.5)
+    def _run(self) -> None:
+        """音频线程主循环：监督采集线程，处理音频源/设备切换"""
+        self._spawn_worker()
+
+        while not self._stop_event.is_set():
+            if self._source_changed_event.wait(timeout=0.2):
+                self._source_changed_event.clear()
+                if self._stop_event.is_set():
+                    break
+                self._spawn_worker()
                 continue
 
-    def _create_recorder(self, source: str):
+            with self._worker_lock:
+                active = self._active_worker
+                pending = self._pending_worker
+
+            if pending is not None and not pending.is_alive():
+                # 新音频源未能打开：保持旧音频源继续工作
+                with self._worker_lock:
+                    if self._pending_worker is pending:
+                        self._pending_worker = None
+                if active is not None:
+                    self.switch_failures += 1
+                    print(f"⚠️  Failed to open audio source '{pending.source}', keeping '{active.source}'")
+                pending = None
+
+            if pending is None and (active is None or not active.is_alive()):
+                # 当前音频源中断（设备拔出等），稍后按当前配置重新打开
+                with self._worker_lock:
+                    self._active_worker = None
+                time.sleep(1.0)
+                if not self._stop_event.is_set():
+                    self._spawn_worker()
+
+        with self._worker_lock:
+            workers = [self._active_worker, self._pending_worker]
+            self._active_worker = None
+            self._pending_worker = None
+        for worker in workers:
+            if worker is not None:
+                worker.retired.set()
+                worker.join(timeout=1.0)
+
+    def _create_recorder(self, source: str, input_device_id: Optional[str], output_device_id: Optional[str]):
         """根据音频源创建对应的recorder上下文"""
         try:
             global _warned_missing_soundcard
@@ -202,53 +663,66 @@ class AudioStreamer:
                 return None
 
             if source == "system":
-                # 使用指定的输出设备ID，或默认扬声器
-                if self._output_device_id:
-                    try:
-                        speaker = sc.get_speaker(id=self._output_device_id)
-                    except Exception:
-                        print(
-                            f"⚠️  Output device '{self._output_device_id}' not found, using default"
-                        )
-                        speaker = sc.default_speaker()
+                # 使用指定的输出设备ID，或默认扬声器（优先从注册表缓存中查找）
+                if output_device_id:
+                    speaker = device_registry.find_speaker(output_device_id)
+                    if speaker is None:
+                        try:
+                            # 注册表尚未发现的新设备，直接向 soundcard 查询
+                            speaker = sc.get_speaker(id=output_device_id)
+                        except Exception:
+                            print(
+                                f"⚠️  Output device '{output_device_id}' not found, using default"
+                            )
+                            speaker = device_registry.default_speaker()
                 else:
-                    speaker = sc.default_speaker()
+                    speaker = device_registry.default_speaker()
 
                 if speaker is None:
                     print("⚠️  No default speaker available for system audio capture")
                     return None
 
-                loopback = sc.get_microphone(
-                    id=str(speaker.name), include_loopback=True
-                )
+                loopback = device_registry.find_loopback(speaker.name)
+                if loopback is None:
+                    loopback = sc.get_microphone(
+                        id=str(speaker.name), include_loopback=True
+                    )
                 if loopback is None:
                     print("⚠️  Loopback capture is not available on this device")
                     return None
 
                 print(f"🔊 Capturing system audio from: {speaker.name}")
-                return loopback.recorder(samplerate=self.sample_rate, channels=1)
+                return self._open_recorder(loopback)
 
-            # 使用指定的输入设备ID，或默认麦克风
-            if self._input_device_id:
-                try:
-                    microphone = sc.get_microphone(
-                        id=self._input_device_id, include_loopback=False
-                    )
-                except Exception:
-                    print(
-                        f"⚠️  Input device '{self._input_device_id}' not found, using default"
-                    )
-                    microphone = sc.default_microphone()
+            # 使用指定的输入设备ID，或默认麦克风（优先从注册表缓存中查找）
+            if input_device_id:
+                microphone = device_registry.find_microphone(input_device_id)
+                if microphone is None:
+                    try:
+                        microphone = sc.get_microphone(
+                            id=input_device_id, include_loopback=False
+                        )
+                    except Exception:
+                        print(
+                            f"⚠️  Input device '{input_device_id}' not found, using default"
+                        )
+                        microphone = device_registry.default_microphone()
             else:
-                microphone = sc.default_microphone()
+                microphone = device_registry.default_microphone()
 
             if microphone is None:
                 print("⚠️  No default microphone available")
                 return None
 
             print(f"🎤 Capturing from microphone: {microphone.name}")
-            return microphone.recorder(samplerate=self.sample_rate, channels=1)
+            return self._open_recorder(microphone)
 
         except Exception as init_error:
             print(f"Error initializing audio source '{source}': {init_error}")
             return None
+
+    def _open_recorder(self, device):
+        """原生格式采集时使用设备自身的声道数（channels=None），否则请求单声道"""
+        if self.native_capture:
+            return device.recorder(samplerate=self.capture_rate, channels=None)
+        return device.recorder(samplerate=self.sample_rate, channels=1)
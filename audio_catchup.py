@@ -0,0 +1,143 @@
+"""直播追赶模块 - 拉流落后于直播时丢弃静音/加速音频，回到直播边缘附近"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from audio_pipeline import PcmConverter
+from audio_resampler import PolyphaseResampler
+from audio_vad import EnergyVad
+
+
+@dataclass
+class CatchupConfig:
+    """追赶模式配置"""
+    trigger_ms: int = 2000  # 积压超过该时长时开始追赶
+    target_ms: int = 500  # 积压降到该时长以下时结束追赶
+    silence_db: float = -45.0  # 低于该能量（dBFS）的块视为静音，追赶时直接丢弃
+    max_speed: float = 1.0  # 追赶时语音的加速倍数（<=1 表示只丢弃静音，不加速）
+
+
+class LiveEdgeCatchup:
+    """按“已解码音频时长 vs 墙钟时间”估计拉流积压，并在追赶期间压缩音频。
+
+    把下游（Soniox）视为按实时速度消费音频的读取方：每块到达时积压先按经过的墙钟时间减少
+    （最低为 0，即读取方空闲等待），再加上本块送出的音频时长。网络抖动或 ffmpeg 重启后
+    HLS 会以快于实时的速度突发输出，这部分多出的音频就是字幕相对直播多出的延迟，
+    不做处理时会一直保持到会话结束。
+
+    积压超过 trigger_ms 后进入追赶：静音块直接丢弃；max_speed > 1 时语音块用多相重采样器
+    按该倍数加速（音调随之升高）；积压降到 target_ms 以下时退出并报告追赶前后的延迟。
+    """
+
+    def __init__(self, sample_rate: int, max_samples: int, config: Optional[CatchupConfig] = None):
+        self.sample_rate = sample_rate
+        self.config = config or CatchupConfig()
+        self._vad = EnergyVad(threshold_db=self.config.silence_db, max_samples=max_samples)
+
+        self._resampler: Optional[PolyphaseResampler] = None
+        if self.config.max_speed > 1.0:
+            # 把输入当作以 speed 倍采样率录制的音频重采样回 sample_rate，时长缩短为 1/speed
+            self._resampler = PolyphaseResampler(
+                int(round(sample_rate * self.config.max_speed)), sample_rate, max_input_frames=max_samples
+            )
+            self._scratch = np.zeros(max_samples, dtype=np.float32)
+            self._converter = PcmConverter(max_samples)
+
+        self._last_time: Optional[float] = None
+        self.backlog_seconds = 0.0
+        self.active = False
+        self._started_at = 0.0
+
+        self.catchup_count = 0
+        self.dropped_silence_seconds = 0.0
+        self.compressed_seconds = 0.0  # 加速节省的时长
+        self.last_lag_before_ms: Optional[float] = None
+        self.last_lag_after_ms: Optional[float] = None
+        self.last_duration_seconds: Optional[float] = None
+        self._peak_backlog = 0.0
+        self._event_dropped = 0.0
+        self._event_compressed = 0.0
+
+    def reset(self) -> None:
+        """重新开始拉流：清空积压估计"""
+        self._last_time = None
+        self.backlog_seconds = 0.0
+        self.active = False
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """处理一块 int16 音频，返回应当送出的样本（可能为空，或为内部缓冲区的视图）"""
+        now = time.monotonic()
+        if self._last_time is not None:
+            self.backlog_seconds = max(0.0, self.backlog_seconds - (now - self._last_time))
+        self._last_time = now
+
+        duration = samples.shape[0] / self.sample_rate
+        config = self.config
+
+        if not self.active and self.backlog_seconds * 1000 >= config.trigger_ms:
+            self._begin(now)
+
+        output = samples
+        if self.active:
+            if not self._vad.is_speech(samples):
+                output = samples[:0]
+                self.dropped_silence_seconds += duration
+                self._event_dropped += duration
+            elif self._resampler is not None:
+                count = samples.shape[0]
+                if count > self._scratch.shape[0]:
+                    self._scratch = np.zeros(count, dtype=np.float32)
+                scratch = self._scratch[:count]
+                np.multiply(samples, 1.0 / 32768.0, out=scratch)
+                output = self._converter.convert(self._resampler.process(scratch))
+                saved = duration - output.shape[0] / self.sample_rate
+                self.compressed_seconds += saved
+                self._event_compressed += saved
+
+        self.backlog_seconds += output.shape[0] / self.sample_rate
+        if self.backlog_seconds > self._peak_backlog:
+            self._peak_backlog = self.backlog_seconds
+
+        if self.active and self.backlog_seconds * 1000 <= config.target_ms:
+            self._finish(now)
+        return output
+
+    def _begin(self, now: float) -> None:
+        self.active = True
+        self.catchup_count += 1
+        self._started_at = now
+        self._peak_backlog = self.backlog_seconds
+        self._event_dropped = 0.0
+        self._event_compressed = 0.0
+        if self._resampler is not None:
+            self._resampler.reset()
+        self.last_lag_before_ms = self.backlog_seconds * 1000
+        self.last_lag_after_ms = None
+        print(f"⏩ Ingest is {self.last_lag_before_ms:.0f} ms behind live, catching up")
+
+    def _finish(self, now: float) -> None:
+        self.active = False
+        # 追赶期间积压可能继续增长，以峰值作为追赶前的延迟
+        self.last_lag_before_ms = self._peak_backlog * 1000
+        self.last_lag_after_ms = self.backlog_seconds * 1000
+        self.last_duration_seconds = now - self._started_at
+        print(
+            f"⏩ Caught up with live: lag {self.last_lag_before_ms:.0f} ms -> {self.last_lag_after_ms:.0f} ms "
+            f"in {self.last_duration_seconds:.1f} s (dropped {self._event_dropped:.1f} s of silence, "
+            f"compressed {self._event_compressed:.1f} s)"
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "catchup_backlog_ms": self.backlog_seconds * 1000,
+            "catchup_active": self.active,
+            "catchup_events": self.catchup_count,
+            "catchup_dropped_silence_seconds": self.dropped_silence_seconds,
+            "catchup_compressed_seconds": self.compressed_seconds,
+            "catchup_last_lag_before_ms": self.last_lag_before_ms,
+            "catchup_last_lag_after_ms": self.last_lag_after_ms,
+            "catchup_last_duration_seconds": self.last_duration_seconds,
+        }
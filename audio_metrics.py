@@ -0,0 +1,161 @@
+"""音频监测模块 - 逐块电平/削波/时序统计，并以低频率汇总发布"""
+
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+# int16 满幅
+_FULL_SCALE = 32768.0
+
+
+def _to_dbfs(level: float) -> float:
+    return 20.0 * math.log10(max(level, 1e-9) / _FULL_SCALE)
+
+
+class AudioLevelMeter:
+    """逐块音频电平与时序统计。
+
+    采集线程对每块 int16 音频调用 observe()（向量化计算，使用预分配缓冲区），
+    发布线程定期调用 snapshot() 取走当前窗口的汇总结果。
+    """
+
+    # 绝对值达到该值的样本视为削波（约 -0.2 dBFS）
+    CLIP_LEVEL = 32000
+
+    def __init__(self, sample_rate: int, max_samples: int):
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._allocate(max_samples)
+
+        self._last_arrival: Optional[float] = None
+        self._last_duration = 0.0
+        self._reset_window()
+
+        self.total_chunks = 0
+        self.total_clipped = 0
+
+    def _allocate(self, size: int) -> None:
+        self._scratch = np.zeros(size, dtype=np.float32)
+        self._flags = np.zeros(size, dtype=bool)
+
+    def _reset_window(self) -> None:
+        self._sum_squares = 0.0
+        self._samples = 0
+        self._peak = 0.0
+        self._clipped = 0
+        self._chunks = 0
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
+        self._intervals = 0
+
+    def observe(self, frame: np.ndarray) -> None:
+        """统计一块 int16 样本（采集线程调用）"""
+        now = time.monotonic()
+        count = int(frame.shape[0])
+        if count == 0:
+            return
+        if count > self._scratch.shape[0]:
+            self._allocate(count)
+
+        samples = self._scratch[:count]
+        np.copyto(samples, frame)
+        sum_squares = float(np.dot(samples, samples))
+        np.abs(samples, out=samples)
+        peak = float(samples.max())
+        flags = self._flags[:count]
+        np.greater_equal(samples, self.CLIP_LEVEL, out=flags)
+        clipped = int(np.count_nonzero(flags))
+
+        with self._lock:
+            # 抖动：相邻两块的到达间隔与上一块音频时长之差
+            if self._last_arrival is not None:
+                jitter = abs((now - self._last_arrival) - self._last_duration) * 1000.0
+                self._jitter_sum += jitter
+                self._intervals += 1
+                if jitter > self._jitter_max:
+                    self._jitter_max = jitter
+            self._last_arrival = now
+            self._last_duration = count / self.sample_rate
+
+            self._sum_squares += sum_squares
+            self._samples += count
+            if peak > self._peak:
+                self._peak = peak
+            self._clipped += clipped
+            self._chunks += 1
+            self.total_chunks += 1
+            self.total_clipped += clipped
+
+    def reset_timing(self) -> None:
+        """音频源切换或重新开始采集后，不把中间的空档计入抖动"""
+        with self._lock:
+            self._last_arrival = None
+
+    def snapshot(self) -> dict:
+        """返回自上次调用以来的汇总结果，并开始新的统计窗口"""
+        with self._lock:
+            samples = self._samples
+            rms = math.sqrt(self._sum_squares / samples) if samples else 0.0
+            result = {
+                "rms_dbfs": _to_dbfs(rms),
+                "peak_dbfs": _to_dbfs(self._peak),
+                "clip_ratio": (self._clipped / samples) if samples else 0.0,
+                "jitter_ms": (self._jitter_sum / self._intervals) if self._intervals else 0.0,
+                "jitter_max_ms": self._jitter_max,
+                "chunks": self._chunks,
+                "total_chunks": self.total_chunks,
+                "total_clipped_samples": self.total_clipped,
+            }
+            self._reset_window()
+        return result
+
+
+class AudioMetricsPublisher:
+    """后台线程按固定间隔汇总音频指标并发布（例如通过 /ws 广播）。
+
+    逐块统计都在采集线程中完成，事件循环每个间隔只处理一条汇总消息。
+    """
+
+    def __init__(
+        self,
+        collect: Callable[[], Optional[dict]],
+        publish: Callable[[dict], None],
+        interval: float = 0.2,
+    ):
+        self._collect = collect
+        self._publish = publish
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.latest: dict = {}
+
+    def start(self) -> None:
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="AudioMetricsPublisher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                metrics = self._collect()
+                if not metrics:
+                    continue
+                metrics["timestamp"] = time.time()
+                self.latest = metrics
+                self._publish(metrics)
+            except Exception as metrics_error:
+                print(f"Error publishing audio metrics: {metrics_error}")
@@ -0,0 +1,94 @@
+"""音频混音模块 - 将麦克风与系统音频混合为单路 PCM"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class MixConfig:
+    """混音配置"""
+    mic_gain: float = 1.0  # 麦克风增益（线性）
+    system_gain: float = 1.0  # 系统音频增益（线性）
+    ducking_db: float = -12.0  # 麦克风有人声时系统音频的衰减量（dB，0 表示不闪避）
+    duck_threshold_db: float = -40.0  # 麦克风能量高于该值（dBFS）时触发闪避
+    attack_ms: float = 20.0  # 闪避生效时间
+    release_ms: float = 400.0  # 闪避恢复时间
+
+
+class AudioMixer:
+    """以麦克风为主时钟的混音器。
+
+    麦克风块到达时，从系统音频环形缓冲区取出等长样本对齐混合；
+    系统音频不足时补零（例如回环设备在无声时不产出数据）。
+    闪避增益在块内线性过渡，避免增益突变产生爆音。
+    """
+
+    def __init__(self, sample_rate: int, max_samples: int, config: MixConfig):
+        self.sample_rate = sample_rate
+        self.config = config
+        self._duck_target = 10.0 ** (min(config.ducking_db, 0.0) / 20.0)
+        self._duck_gain = 1.0
+        self._allocate(max_samples)
+
+        self.mixed_samples = 0
+        self.padded_samples = 0  # 系统音频不足而补零的样本数
+
+    def _allocate(self, size: int) -> None:
+        self._output = np.zeros(size, dtype=np.float32)
+        self._secondary = np.zeros(size, dtype=np.float32)
+        self._ramp = np.zeros(size, dtype=np.float32)
+        self._index = np.arange(size, dtype=np.float32)
+
+    def _smoothing(self, time_ms: float, count: int) -> float:
+        """一阶平滑系数：在 time_ms 内接近目标值"""
+        if time_ms <= 0:
+            return 1.0
+        return 1.0 - math.exp(-count / (self.sample_rate * time_ms / 1000.0))
+
+    def mix(self, primary: np.ndarray, secondary_ring) -> np.ndarray:
+        """混合一块麦克风样本与系统音频，返回内部缓冲区的视图（下次调用前有效）"""
+        count = int(primary.shape[0])
+        if count > self._output.shape[0]:
+            self._allocate(count)
+
+        secondary = self._secondary[:count]
+        got = secondary_ring.read_available(secondary)
+        if got < count:
+            secondary[got:] = 0.0
+            self.padded_samples += count - got
+
+        config = self.config
+        output = self._output[:count]
+        np.multiply(primary, config.mic_gain, out=output)
+
+        # 根据麦克风能量决定闪避目标，并在块内从上一增益线性过渡到新增益
+        energy = float(np.dot(output, output)) / count if count else 0.0
+        level_db = 10.0 * math.log10(energy + 1e-12)
+        if level_db >= config.duck_threshold_db:
+            target, time_ms = self._duck_target, config.attack_ms
+        else:
+            target, time_ms = 1.0, config.release_ms
+        start_gain = self._duck_gain
+        end_gain = start_gain + (target - start_gain) * self._smoothing(time_ms, count)
+        self._duck_gain = end_gain
+
+        ramp = self._ramp[:count]
+        if start_gain == end_gain:
+            ramp.fill(end_gain * config.system_gain)
+        else:
+            np.multiply(self._index[:count], (end_gain - start_gain) / count, out=ramp)
+            ramp += start_gain
+            ramp *= config.system_gain
+
+        secondary *= ramp
+        output += secondary
+        self.mixed_samples += count
+        return output
+
+    def get_stats(self) -> dict:
+        return {
+            "mix_duck_gain_db": 20.0 * math.log10(max(self._duck_gain, 1e-6)),
+            "mix_system_padded_seconds": self.padded_samples / self.sample_rate,
+        }
@@ -0,0 +1,602 @@
+"""音频管线模块 - 采集线程与 WebSocket 发送线程之间的缓冲与发送"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from audio_vad import EnergyVad, VadConfig, VoiceActivityGate
+
+# Soniox 控制消息：静音被屏蔽期间保持连接不超时
+KEEPALIVE_MESSAGE = json.dumps({"type": "keepalive"})
+# 空消息表示音频结束，Soniox 处理完剩余音频后返回 finished
+END_OF_AUDIO_MESSAGE = ""
+# 手动确认：Soniox 立即把已发送音频的 non-final tokens 确认为 final，随后返回 <fin> token
+FINALIZE_MESSAGE = json.dumps({"type": "finalize"})
+
+
+class FramePool:
+    """可复用的 int16 帧缓冲池，避免每帧分配新数组。
+
+    池为空时会临时分配新帧（计入 allocations），释放后同样回收进池，
+    因此稳态下不再产生新的分配。
+    """
+
+    def __init__(self, frame_samples: int, size: int = 4):
+        self.frame_samples = int(frame_samples)
+        self._free: deque = deque(
+            np.zeros(self.frame_samples, dtype=np.int16) for _ in range(size)
+        )
+        self.allocations = size
+
+    def acquire(self) -> np.ndarray:
+        try:
+            return self._free.pop()
+        except IndexError:
+            self.allocations += 1
+            return np.zeros(self.frame_samples, dtype=np.int16)
+
+    def release(self, frame: np.ndarray) -> None:
+        # 自适应帧长时发送的是帧的前缀切片，归还其底层数组
+        if frame.base is not None:
+            frame = frame.base
+        if frame.shape[0] == self.frame_samples:
+            self._free.append(frame)
+
+
+class PcmConverter:
+    """float32 -> int16 转换器，所有中间结果写入预分配的缓冲区"""
+
+    def __init__(self, max_samples: int):
+        self._scratch = np.zeros(int(max_samples), dtype=np.float32)
+        self._output = np.zeros(int(max_samples), dtype=np.int16)
+
+    def convert(self, channel_data: np.ndarray) -> np.ndarray:
+        """转换一段浮点样本，返回内部 int16 缓冲区的视图（下次调用前有效）"""
+        count = int(channel_data.shape[0])
+        if count > self._scratch.shape[0]:
+            # 录音设备偶尔返回比请求更多的样本，扩容后继续复用
+            self._scratch = np.zeros(count, dtype=np.float32)
+            self._output = np.zeros(count, dtype=np.int16)
+
+        scratch = self._scratch[:count]
+        np.clip(channel_data, -1.0, 1.0, out=scratch)
+        np.multiply(scratch, 32767, out=scratch)
+        output = self._output[:count]
+        np.copyto(output, scratch, casting="unsafe")
+        return output
+
+
+def as_bytes_view(frame: np.ndarray) -> memoryview:
+    """以零拷贝的字节视图发送 int16 帧（websockets 按字节长度计算帧大小）"""
+    return memoryview(frame).cast("B")
+
+
+class AudioRingBuffer:
+    """预分配的环形缓冲区（单生产者/单消费者，默认存放 int16 样本）。
+
+    写入永不阻塞：积压超过丢弃上限时丢弃最旧的数据并计数，
+    这样采集线程的节奏不会受到网络发送速度的影响。
+
+    limit 为连接正常时的丢弃上限（默认等于容量）；容量大于 limit 的部分只用于跨连接缓冲：
+    hold() 期间（连接断开）积压可增长到容量，release() 后积压不再增长，
+    随补发逐步回落到 limit。
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16, limit: Optional[int] = None):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+
+        self.capacity = int(capacity)
+        self.limit = self.capacity if limit is None else max(1, min(int(limit), self.capacity))
+        self._drop_limit = self.limit  # 当前生效的丢弃上限
+        self._held = False
+        self._buffer = np.zeros(self.capacity, dtype=dtype)
+        # 读写位置使用单调递增的绝对样本计数，取模得到实际下标
+        self._read_pos = 0
+        self._write_pos = 0
+        self._closed = False
+        self._interrupted = False
+        self._cond = threading.Condition()
+
+        self.overrun_count = 0  # 发生丢弃的写入次数
+        self.dropped_samples = 0  # 因积压超限被丢弃的样本数
+        self.max_depth = 0  # 观察到的最大积压（样本数）
+
+    @property
+    def depth(self) -> int:
+        """当前积压的样本数"""
+        with self._cond:
+            return self._write_pos - self._read_pos
+
+    def write(self, samples: np.ndarray) -> None:
+        """写入一段 int16 样本，超过丢弃上限时丢弃最旧的数据"""
+        count = int(samples.shape[0])
+        if count == 0:
+            return
+
+        with self._cond:
+            limit = self._drop_limit
+            if count > limit:
+                # 单次写入就超过上限，只保留最新的部分
+                skipped = count - limit
+                self._read_pos = self._write_pos
+                self.dropped_samples += skipped
+                self.overrun_count += 1
+                samples = samples[skipped:]
+                count = limit
+
+            overflow = (self._write_pos - self._read_pos) + count - limit
+            if overflow > 0:
+                self._read_pos += overflow
+                self.dropped_samples += overflow
+                self.overrun_count += 1
+
+            start = self._write_pos % self.capacity
+            first = min(count, self.capacity - start)
+            self._buffer[start:start + first] = samples[:first]
+            if first < count:
+                self._buffer[:count - first] = samples[first:]
+            self._write_pos += count
+
+            depth = self._write_pos - self._read_pos
+            if depth > self.max_depth:
+                self.max_depth = depth
+            self._cond.notify()
+
+    def read_into(self, out: np.ndarray, timeout: Optional[float] = None) -> int:
+        """等待积压达到 len(out) 后整帧读出。
+
+        返回读取的样本数；超时、被 interrupt() 唤醒或缓冲区已关闭时返回 0。
+        """
+        wanted = int(out.shape[0])
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._closed or self._interrupted or self._write_pos - self._read_pos >= wanted,
+                timeout=timeout,
+            )
+            if self._interrupted:
+                self._interrupted = False
+                return 0
+            if not ready or self._closed:
+                return 0
+
+            start = self._read_pos % self.capacity
+            first = min(wanted, self.capacity - start)
+            out[:first] = self._buffer[start:start + first]
+            if first < wanted:
+                out[first:wanted] = self._buffer[:wanted - first]
+            self._read_pos += wanted
+            self._shrink_drop_limit()
+            self._cond.notify_all()
+            return wanted
+
+    def interrupt(self) -> None:
+        """唤醒等待中的 read_into()（返回 0），让读取方立即处理控制请求"""
+        with self._cond:
+            self._interrupted = True
+            self._cond.notify_all()
+
+    def read_available(self, out: np.ndarray) -> int:
+        """不等待，读出当前可用的样本（最多 len(out) 个），返回读取数"""
+        with self._cond:
+            count = min(int(out.shape[0]), self._write_pos - self._read_pos)
+            if count <= 0:
+                return 0
+
+            start = self._read_pos % self.capacity
+            first = min(count, self.capacity - start)
+            out[:first] = self._buffer[start:start + first]
+            if first < count:
+                out[first:count] = self._buffer[:count - first]
+            self._read_pos += count
+            self._shrink_drop_limit()
+            self._cond.notify_all()
+            return count
+
+    def wait_for_space(self, count: int, timeout: Optional[float] = None) -> bool:
+        """等待缓冲区能容纳 count 个样本而不丢弃数据（供不允许丢音频的生产者使用）。
+
+        返回 False 表示超时或缓冲区已关闭。
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._closed
+                or self._drop_limit - (self._write_pos - self._read_pos) >= min(int(count), self._drop_limit),
+                timeout=timeout,
+            )
+            return ready and not self._closed
+
+    def hold(self) -> None:
+        """连接断开：积压可增长到容量（跨连接缓冲），不按 limit 丢弃"""
+        with self._cond:
+            self._held = True
+            self._drop_limit = self.capacity
+
+    def release(self) -> None:
+        """连接恢复：断开期间的积压保留用于补发，但不再增长，读出后逐步回落到 limit"""
+        with self._cond:
+            self._held = False
+            self._drop_limit = max(self.limit, self._write_pos - self._read_pos)
+
+    def _shrink_drop_limit(self) -> None:
+        # 调用方持有 self._cond
+        if not self._held and self._drop_limit > self.limit:
+            self._drop_limit = max(self.limit, self._write_pos - self._read_pos)
+
+    def get_stats(self, sample_rate: int) -> dict:
+        """以毫秒为单位返回积压统计"""
+        samples_per_ms = sample_rate / 1000
+        with self._cond:
+            depth = self._write_pos - self._read_pos
+        return {
+            "backlog_ms": depth / samples_per_ms,
+            "max_backlog_ms": self.max_depth / samples_per_ms,
+            "backlog_capacity_ms": self.capacity / samples_per_ms,
+            "backlog_limit_ms": self._drop_limit / samples_per_ms,
+            "overruns": self.overrun_count,
+            "dropped_ms": self.dropped_samples / samples_per_ms,
+        }
+
+    def clear(self) -> None:
+        """丢弃所有积压数据（不计入丢弃统计）"""
+        with self._cond:
+            self._read_pos = self._write_pos
+            self._shrink_drop_limit()
+
+    def close(self) -> None:
+        """关闭缓冲区并唤醒等待中的读取方"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self) -> None:
+        """重新打开缓冲区（保留统计数据）"""
+        with self._cond:
+            self._closed = False
+
+
+class AudioSender:
+    """发送线程：从环形缓冲区按固定帧长取出音频并发送到 WebSocket"""
+
+    def __init__(
+        self,
+        ws,
+        ring: AudioRingBuffer,
+        frame_samples: int,
+        name: str = "AudioSender",
+        on_error=None,
+        sample_rate: int = 16000,
+        vad_config: Optional[VadConfig] = None,
+        keepalive_interval: float = 5.0,
+        min_frame_samples: Optional[int] = None,
+        finalize_silence_ms: int = 0,
+    ):
+        self.ws = ws
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.frame_samples = int(frame_samples)
+        self.name = name
+        self._on_error = on_error  # 发送失败时的回调（无参数）
+        self.keepalive_interval = keepalive_interval
+
+        # 启用 VAD 时 pre-roll 会暂存若干帧，池会按需扩容一次后稳定复用
+        self.pool = FramePool(self.frame_samples)
+        self.gate: Optional[VoiceActivityGate] = None
+        if vad_config is not None:
+            self.gate = VoiceActivityGate(self.pool, sample_rate, self.frame_samples, vad_config)
+
+        # 自适应帧长：语音期间使用最小帧以降低首字延迟，静音期间使用最大帧以减少包数
+        self.min_frame_samples = self.frame_samples
+        self._activity_vad: Optional[EnergyVad] = None
+        self._activity_hold = 0
+        self._activity_hangover = 0
+        if min_frame_samples is not None and 0 < int(min_frame_samples) < self.frame_samples:
+            self.min_frame_samples = int(min_frame_samples)
+            if self.gate is None:
+                activity = vad_config or VadConfig()
+                self._activity_vad = EnergyVad(activity.threshold_db, activity.zcr_threshold, max_samples=self.frame_samples)
+                self._activity_hangover = int(sample_rate * activity.hangover_ms / 1000)
+        self.current_frame_samples = self.frame_samples
+
+        # 手动确认：语音后的静音达到 finalize_silence_ms 时发送 finalize，不等待 Soniox 的端点检测
+        self.finalize_silence_samples = int(sample_rate * finalize_silence_ms / 1000) if finalize_silence_ms > 0 else 0
+        if self.finalize_silence_samples and self.gate is None and self._activity_vad is None:
+            activity = vad_config or VadConfig()
+            self._activity_vad = EnergyVad(activity.threshold_db, activity.zcr_threshold, max_samples=self.frame_samples)
+        self._finalize_requested = threading.Event()
+        self._suspend_after_finalize = False
+        self._speech_since_finalize = False
+        self._trailing_silence = 0
+        self.finalizes_sent = 0
+        self.silence_finalizes = 0
+
+        self._stop_event = threading.Event()
+        self._end_of_stream = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_send_time = 0.0
+        self.frames_sent = 0
+        self.samples_sent = 0
+        self.session_samples_sent = 0  # 当前连接上已发送的样本数（对应 Soniox 的音频时间轴）
+        self.keepalives_sent = 0
+
+        # 软暂停：连接保持打开，采集到的音频被丢弃，只发送 keepalive
+        self.suspended = False
+        self.suspended_samples = 0  # 软暂停期间丢弃的样本数（累计）
+
+        # 跨连接缓冲：断开期间采集继续写入环形缓冲区，重新连接后先补发积压的音频
+        self.detached = False
+        self._detached_dropped_mark = 0
+        self.reattach_count = 0
+        self.replayed_samples = 0  # 重新连接后补发的积压样本数（累计）
+        self.reconnect_dropped_samples = 0  # 断开期间因缓冲区已满被丢弃的样本数（累计）
+        self.last_replayed_samples = 0
+        self.last_reconnect_dropped_samples = 0
+
+    @property
+    def adaptive(self) -> bool:
+        return self.min_frame_samples < self.frame_samples
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._end_of_stream.clear()
+        self.session_samples_sent = 0
+        self.ring.reopen()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.ring.close()
+
+        thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=1.5)
+        self._thread = None
+
+    def detach(self) -> None:
+        """连接即将关闭：停止发送，但保留缓冲区中的音频（采集方继续写入）"""
+        self.stop()
+        self.detached = True
+        self._detached_dropped_mark = self.ring.dropped_samples
+        self.ring.hold()
+
+    def attach(self, ws) -> None:
+        """使用新连接恢复发送：先以网络允许的最快速度补发断开期间积压的音频"""
+        self.ring.release()
+        backlog = self.ring.depth
+        dropped = self.ring.dropped_samples - self._detached_dropped_mark
+        self.ws = ws
+        self.detached = False
+        self.reattach_count += 1
+        self.last_replayed_samples = backlog
+        self.last_reconnect_dropped_samples = dropped
+        self.replayed_samples += backlog
+        self.reconnect_dropped_samples += dropped
+        if backlog or dropped:
+            print(
+                f"⏪ Replaying {backlog / self.sample_rate:.2f} s of buffered audio "
+                f"({dropped / self.sample_rate:.2f} s dropped while disconnected)"
+            )
+        self.start()
+
+    def set_suspended(self, suspended: bool) -> None:
+        """开启/结束软暂停：暂停期间丢弃音频并按 keepalive 间隔发送 keepalive，连接不关闭"""
+        self._suspend_after_finalize = False
+        self.suspended = bool(suspended)
+
+    def request_finalize(self, suspend_after: bool = False) -> None:
+        """请求 Soniox 立即确认已发送的音频（可在任意线程调用）。
+
+        发送线程先发出缓冲区中不足一帧的剩余音频，再按顺序发送 finalize 控制消息。
+        suspend_after=True 时在 finalize 发出后才进入软暂停，暂停前说的话不会被丢弃。
+        """
+        if suspend_after:
+            self._suspend_after_finalize = True
+        self._finalize_requested.set()
+        self.ring.interrupt()
+
+    def finish(self) -> None:
+        """输入已结束（例如文件回放完毕）：发送完缓冲区中的剩余音频后通知 Soniox 音频结束"""
+        self._end_of_stream.set()
+
+    def get_stats(self) -> dict:
+        samples_per_ms = self.sample_rate / 1000
+        frames_sent = self.frames_sent
+        stats = {
+            "frames_sent": frames_sent,
+            "keepalives_sent": self.keepalives_sent,
+            "finalizes_sent": self.finalizes_sent,
+            "silence_finalizes": self.silence_finalizes,
+            "suspended": self.suspended,
+            "suspended_seconds": self.suspended_samples / self.sample_rate,
+            "frame_ms": self.current_frame_samples / samples_per_ms,
+            "avg_frame_ms": (self.samples_sent / frames_sent / samples_per_ms) if frames_sent else 0.0,
+            "adaptive_frames": self.adaptive,
+            "session_audio_sent_ms": self.session_samples_sent / samples_per_ms,
+            "reconnects": self.reattach_count,
+            "replayed_seconds": self.replayed_samples / self.sample_rate,
+            "reconnect_dropped_seconds": self.reconnect_dropped_samples / self.sample_rate,
+            "last_replayed_seconds": self.last_replayed_samples / self.sample_rate,
+            "last_reconnect_dropped_seconds": self.last_reconnect_dropped_samples / self.sample_rate,
+        }
+        if self.gate is not None:
+            stats.update(self.gate.get_stats())
+        return stats
+
+    def _send_frames(self, frames) -> bool:
+        """发送一组帧并归还到池中，返回是否成功"""
+        pool = self.pool
+        try:
+            for frame in frames:
+                # ws.send 返回时数据已写入套接字，帧可以立即回收
+                self.ws.send(as_bytes_view(frame))
+                self.frames_sent += 1
+                self.samples_sent += int(frame.shape[0])
+                self.session_samples_sent += int(frame.shape[0])
+        except Exception as send_error:
+            print(f"Error sending audio data: {send_error}")
+            return False
+        finally:
+            for frame in frames:
+                pool.release(frame)
+        self._last_send_time = time.monotonic()
+        return True
+
+    def _maybe_send_keepalive(self) -> bool:
+        """长时间没有发送音频时发送 keepalive，返回是否成功"""
+        now = time.monotonic()
+        if now - self._last_send_time < self.keepalive_interval:
+            return True
+        try:
+            self.ws.send(KEEPALIVE_MESSAGE)
+        except Exception as send_error:
+            print(f"Error sending keepalive: {send_error}")
+            return False
+        self._last_send_time = now
+        self.keepalives_sent += 1
+        return True
+
+    def _next_frame_samples(self) -> int:
+        """根据当前是否有语音决定下一帧的长度"""
+        if not self.adaptive:
+            return self.frame_samples
+        if self.gate is not None:
+            speaking = self.gate.is_open
+        else:
+            speaking = self._activity_hold > 0
+        return self.min_frame_samples if speaking else self.frame_samples
+
+    def _observe_activity(self, frame: np.ndarray) -> bool:
+        """未启用 VAD 门控时，单独跟踪语音活动以驱动自适应帧长与静音确认，返回该帧是否为语音"""
+        vad = self._activity_vad
+        if vad is None:
+            return False
+        speech = vad.is_speech(frame)
+        if speech:
+            self._activity_hold = self._activity_hangover + 1
+        elif self._activity_hold > 0:
+            self._activity_hold = max(0, self._activity_hold - int(frame.shape[0]))
+        return speech
+
+    def _send_finalize_message(self) -> bool:
+        """发送 finalize 控制消息，返回是否成功"""
+        try:
+            self.ws.send(FINALIZE_MESSAGE)
+        except Exception as send_error:
+            print(f"Error sending finalize: {send_error}")
+            return False
+        self._last_send_time = time.monotonic()
+        self.finalizes_sent += 1
+        self._speech_since_finalize = False
+        self._trailing_silence = 0
+        return True
+
+    def _send_finalize(self) -> bool:
+        """处理 request_finalize()：发出缓冲区中的剩余音频后发送 finalize"""
+        frame = self.pool.acquire()
+        tail = self.ring.read_available(frame)
+        if not tail:
+            self.pool.release(frame)
+        elif self.gate is not None:
+            # 门控关闭时剩余音频是静音，由门控决定是否发送
+            frames = self.gate.process(frame[:tail])
+            if frames and not self._send_frames(frames):
+                return False
+        elif not self._send_frames([frame[:tail]]):
+            return False
+        return self._send_finalize_message()
+
+    def _observe_trailing_silence(self, speaking: bool, count: int) -> bool:
+        """语音之后的静音达到阈值时发送 finalize，返回是否成功"""
+        if speaking:
+            self._speech_since_finalize = True
+            self._trailing_silence = 0
+            return True
+        if not self._speech_since_finalize:
+            return True
+        self._trailing_silence += count
+        if self._trailing_silence < self.finalize_silence_samples:
+            return True
+        self.silence_finalizes += 1
+        return self._send_finalize_message()
+
+    def _send_end_of_audio(self, frame: np.ndarray) -> bool:
+        """发送不足一帧的剩余音频，再发送音频结束消息"""
+        tail = self.ring.read_available(frame)
+        if tail:
+            if not self._send_frames([frame[:tail]]):
+                return False
+        else:
+            self.pool.release(frame)
+        try:
+            self.ws.send(END_OF_AUDIO_MESSAGE)
+        except Exception as send_error:
+            print(f"Error sending end of audio: {send_error}")
+            return False
+        return True
+
+    def _run(self) -> None:
+        pool = self.pool
+        gate = self.gate
+        self._last_send_time = time.monotonic()
+
+        while not self._stop_event.is_set():
+            if self._finalize_requested.is_set():
+                self._finalize_requested.clear()
+                if not self._send_finalize():
+                    self._stop_event.set()
+                    if self._on_error is not None:
+                        self._on_error()
+                    break
+                if self._suspend_after_finalize:
+                    self._suspend_after_finalize = False
+                    self.suspended = True
+
+            size = self._next_frame_samples()
+            self.current_frame_samples = size
+            frame = pool.acquire()[:size]
+            count = self.ring.read_into(frame, timeout=0.1)
+            if count == 0 and self._end_of_stream.is_set() and not self._stop_event.is_set():
+                if not self._send_end_of_audio(frame) and self._on_error is not None:
+                    self._on_error()
+                break
+            speaking = False
+            if count == 0:
+                pool.release(frame)
+                frames = []
+            elif self.suspended:
+                # 软暂停：丢弃音频；清空 pre-roll，恢复后不补发暂停前缓存的帧
+                self.suspended_samples += count
+                pool.release(frame)
+                frames = []
+                if gate is not None:
+                    gate.reset()
+            elif gate is not None:
+                frames = gate.process(frame)
+                speaking = gate.is_open
+            else:
+                speaking = self._observe_activity(frame)
+                frames = [frame]
+
+            if frames:
+                ok = self._send_frames(frames)
+            else:
+                ok = self._maybe_send_keepalive()
+            if ok and count and self.finalize_silence_samples and not self.suspended:
+                ok = self._observe_trailing_silence(speaking, count)
+
+            if not ok:
+                self._stop_event.set()
+                if self._on_error is not None:
+                    self._on_error()
+                break
+
+        if gate is not None:
+            gate.reset()
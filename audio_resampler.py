@@ -0,0 +1,142 @@
+"""重采样模块 - 将设备原生采样率/声道的音频转换为 Soniox 使用的单声道采样率"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class Downmixer:
+    """多声道 -> 单声道（各声道取平均），输出写入预分配的缓冲区"""
+
+    def __init__(self, max_frames: int):
+        self._output = np.zeros(int(max_frames), dtype=np.float32)
+
+    def downmix(self, data: np.ndarray) -> np.ndarray:
+        """返回单声道样本；单声道输入直接返回其视图，否则返回内部缓冲区的视图"""
+        if data.ndim == 1:
+            return data
+        if data.shape[1] == 1:
+            return data[:, 0]
+
+        count = int(data.shape[0])
+        if count > self._output.shape[0]:
+            self._output = np.zeros(count, dtype=np.float32)
+        output = self._output[:count]
+        np.mean(data, axis=1, out=output)
+        return output
+
+
+class PolyphaseResampler:
+    """流式有理数比例多相重采样器（Kaiser 窗 sinc 低通）。
+
+    in_rate -> out_rate 按 L/M（上采样 L、下采样 M）实现，
+    只计算实际输出的样本：每个输出样本取对应相位的 taps_per_phase 个系数与输入做点积，
+    整块输出通过滑动窗口视图一次性向量化计算。
+    块与块之间保存输入历史与相位，任意分块的输出与一次性处理整段音频一致。
+    """
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        max_input_frames: int = 4096,
+        taps_per_phase: int = 64,
+        kaiser_beta: float = 8.0,
+    ):
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        divisor = math.gcd(self.in_rate, self.out_rate)
+        self.up = self.out_rate // divisor
+        self.down = self.in_rate // divisor
+        self.passthrough = self.up == 1 and self.down == 1
+        self.taps = int(taps_per_phase)
+
+        self._downmixer = Downmixer(max_input_frames)
+        self._coefficients = self._design_filter(kaiser_beta)
+        # 输入历史（taps-1 个样本）+ 当前块
+        self._history = self.taps - 1
+        self._next_t = 0  # 下一个输出样本在上采样时间轴上的位置（相对当前块起点）
+        self._allocate(max_input_frames)
+
+    def _design_filter(self, kaiser_beta: float) -> np.ndarray:
+        """设计原型低通滤波器并拆成多相系数表（每行一个相位，按时间正序排列）"""
+        up = self.up
+        length = self.taps * up
+        # 截止频率取输入/输出奈奎斯特频率中较低者，留 10% 过渡带
+        cutoff = 0.9 / max(up, self.down)
+        n = np.arange(length, dtype=np.float64) - (length - 1) / 2.0
+        prototype = cutoff * np.sinc(cutoff * n) * np.kaiser(length, kaiser_beta)
+        prototype *= up / prototype.sum()
+
+        # phases[p, k] = h[p + k*up]；与输入窗口 x[i-taps+1 .. i] 对齐需要反转 k
+        phases = prototype.reshape(self.taps, up).T
+        return np.ascontiguousarray(phases[:, ::-1], dtype=np.float32)
+
+    def _allocate(self, max_input_frames: int) -> None:
+        self._max_input = int(max_input_frames)
+        max_output = self._max_input * self.up // self.down + 2
+        self._input = np.zeros(self._history + self._max_input, dtype=np.float32)
+        self._windows = np.zeros((max_output, self.taps), dtype=np.float32)
+        self._weights = np.zeros((max_output, self.taps), dtype=np.float32)
+        self._steps = np.arange(max_output, dtype=np.int64) * self.down
+        self._positions = np.zeros(max_output, dtype=np.int64)
+        self._phases = np.zeros(max_output, dtype=np.int64)
+        self._output = np.zeros(max_output, dtype=np.float32)
+
+    def output_frames(self, input_frames: int) -> int:
+        """处理 input_frames 个输入样本将产生的输出样本数"""
+        total = input_frames * self.up - self._next_t
+        return max(0, -(-total // self.down))
+
+    def reset(self) -> None:
+        """清空滤波器历史（切换设备后重新开始）"""
+        self._input[: self._history] = 0.0
+        self._next_t = 0
+
+    def process(self, data: np.ndarray) -> np.ndarray:
+        """处理一块输入（(frames,) 或 (frames, channels) 的 float32），多声道先平均为单声道。
+
+        返回单声道输出，为内部缓冲区的视图（下次调用前有效）；采样率相同时直接返回输入。
+        """
+        mono = self._downmixer.downmix(data)
+        if self.passthrough:
+            return mono
+
+        count = int(mono.shape[0])
+        if count == 0:
+            return self._output[:0]
+        if count > self._max_input:
+            history = self._input[: self._history].copy()
+            self._allocate(count)
+            self._input[: self._history] = history
+
+        history = self._history
+        buffer = self._input[: history + count]
+        buffer[history:] = mono
+
+        produced = self.output_frames(count)
+        if produced:
+            # 第 m 个输出样本位于上采样时间 t = next_t + m*down，
+            # 对应输入样本 t // up（窗口终点）与滤波器相位 t % up
+            positions = self._positions[:produced]
+            np.add(self._steps[:produced], self._next_t, out=positions)
+            phases = self._phases[:produced]
+            np.remainder(positions, self.up, out=phases)
+            np.floor_divide(positions, self.up, out=positions)
+
+            windows = self._windows[:produced]
+            weights = self._weights[:produced]
+            np.take(sliding_window_view(buffer, self.taps), positions, axis=0, out=windows)
+            np.take(self._coefficients, phases, axis=0, out=weights)
+            np.multiply(windows, weights, out=windows)
+            output = self._output[:produced]
+            np.sum(windows, axis=1, out=output)
+        else:
+            output = self._output[:0]
+
+        self._next_t += produced * self.down - count * self.up
+        # 保留最后 taps-1 个输入样本作为下一块的历史
+        self._input[:history] = buffer[count:]
+        return output
+
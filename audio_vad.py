@@ -0,0 +1,135 @@
+"""语音活动检测模块 - 在发送前屏蔽静音帧，减少无效的上行音频"""
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+
+@dataclass
+class VadConfig:
+    """语音门限配置"""
+    threshold_db: float = -45.0  # 高于该能量（dBFS）直接判定为语音
+    zcr_threshold: float = 0.25  # 低能量但高过零率（清辅音）也视为语音
+    hangover_ms: int = 600  # 语音结束后继续发送的时长，避免截断句尾
+    preroll_ms: int = 480  # 语音开始前补发的时长，避免截断首个音节
+
+
+class EnergyVad:
+    """基于短时能量与过零率的向量化检测器（使用预分配缓冲区）"""
+
+    # 清辅音（s/f/sh 等）能量低但过零率高，在该能量余量内用过零率补判
+    UNVOICED_MARGIN_DB = 12.0
+
+    def __init__(self, threshold_db: float = -45.0, zcr_threshold: float = 0.25, max_samples: int = 3840):
+        self.threshold_db = float(threshold_db)
+        self.zcr_threshold = float(zcr_threshold)
+        self._allocate(max_samples)
+        self.last_db = -120.0
+
+    def _allocate(self, size: int) -> None:
+        self._scratch = np.zeros(size, dtype=np.float32)
+        self._signs = np.zeros(size, dtype=bool)
+        self._crossings = np.zeros(size, dtype=bool)
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        count = int(frame.shape[0])
+        if count < 2:
+            return False
+        if count > self._scratch.shape[0]:
+            self._allocate(count)
+
+        samples = self._scratch[:count]
+        np.multiply(frame, 1.0 / 32768.0, out=samples, casting="unsafe")
+        energy = float(np.dot(samples, samples)) / count
+        db = 10.0 * math.log10(energy + 1e-12)
+        self.last_db = db
+
+        if db >= self.threshold_db:
+            return True
+        if db < self.threshold_db - self.UNVOICED_MARGIN_DB:
+            return False
+
+        signs = self._signs[:count]
+        np.signbit(samples, out=signs)
+        crossings = self._crossings[:count - 1]
+        np.not_equal(signs[1:], signs[:-1], out=crossings)
+        zcr = np.count_nonzero(crossings) / (count - 1)
+        return zcr >= self.zcr_threshold
+
+
+class VoiceActivityGate:
+    """语音门：静音帧暂存在 pre-roll 队列中，检测到语音时连同 pre-roll 一起放行。
+
+    帧对象来自调用方的 FramePool：被放行的帧由调用方发送后归还，
+    被 pre-roll 挤出的帧由本类直接归还。
+    """
+
+    def __init__(self, pool, sample_rate: int, frame_samples: int, config: VadConfig):
+        self.sample_rate = sample_rate
+        self.pool = pool
+        self.vad = EnergyVad(config.threshold_db, config.zcr_threshold, max_samples=frame_samples)
+        # pre-roll 与 hangover 按样本数计算，帧长可变（自适应帧长）时同样适用
+        self._preroll: deque = deque()
+        self._preroll_samples = 0
+        self._preroll_limit = max(1, int(sample_rate * config.preroll_ms / 1000))
+        self._hangover_limit = max(0, int(sample_rate * config.hangover_ms / 1000))
+        self._hangover_left = 0
+        self._open = False
+
+        self.total_samples = 0
+        self.gated_samples = 0
+
+    @property
+    def is_open(self) -> bool:
+        """当前是否处于放行状态（语音或 hangover 期间）"""
+        return self._open
+
+    def process(self, frame: np.ndarray) -> List[np.ndarray]:
+        """处理一帧，返回需要立即发送的帧列表（按时间顺序）"""
+        count = int(frame.shape[0])
+        self.total_samples += count
+
+        if self.vad.is_speech(frame):
+            self._open = True
+            self._hangover_left = self._hangover_limit
+            frames = list(self._preroll)
+            self._preroll.clear()
+            self.gated_samples -= self._preroll_samples
+            self._preroll_samples = 0
+            frames.append(frame)
+            return frames
+
+        if self._open and self._hangover_left > 0:
+            self._hangover_left -= count
+            return [frame]
+
+        self._open = False
+        self._preroll.append(frame)
+        self._preroll_samples += count
+        self.gated_samples += count
+        # 保留覆盖 pre-roll 时长所需的最少帧数
+        while len(self._preroll) > 1 and self._preroll_samples - int(self._preroll[0].shape[0]) >= self._preroll_limit:
+            evicted = self._preroll.popleft()
+            self._preroll_samples -= int(evicted.shape[0])
+            self.pool.release(evicted)
+        return []
+
+    def reset(self) -> None:
+        """清空 pre-roll 并把帧归还到池中"""
+        while self._preroll:
+            self.pool.release(self._preroll.popleft())
+        self._preroll_samples = 0
+        self._hangover_left = 0
+        self._open = False
+
+    def get_stats(self) -> dict:
+        total = self.total_samples
+        return {
+            "vad_gated_ratio": (self.gated_samples / total) if total else 0.0,
+            "vad_gated_seconds": self.gated_samples / self.sample_rate,
+            "vad_open": self.is_open,
+            "vad_level_db": self.vad.last_db,
+        }
@@ -75,6 +75,16 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return float(str(value).strip())
+    except Exception:
+        return default
+
+
 def _env_str(name: str, default: str) -> str:
     value = os.environ.get(name)
     return default if value is None else str(value)
@@ -82,6 +92,8 @@ def _env_str(name: str, default: str) -> str:
 # Soniox API配置
 SONIOX_WEBSOCKET_URL = _env_str("SONIOX_WEBSOCKET_URL", "wss://stt-rt.soniox.com/transcribe-websocket")
 SONIOX_TEMP_KEY_URL = os.environ.get("SONIOX_TEMP_KEY_URL")
+# 临时 key 缓存到 expiresAt 之前，后台在过期前该时长（秒）预先刷新
+SONIOX_TEMP_KEY_REFRESH_MARGIN_SECONDS = _env_float("SONIOX_TEMP_KEY_REFRESH_MARGIN_SECONDS", 60.0)
 
 # 自动使用系统语言
 # True: 自动读取系统语言设置作为目标翻译语言
@@ -115,9 +127,173 @@ TWITCH_CHANNEL = _env_str("TWITCH_CHANNEL", "")
 # 优先选择的码流（通常可用：audio_only / best）
 TWITCH_STREAM_QUALITY = _env_str("TWITCH_STREAM_QUALITY", "audio_only")
 
+# 通用 URL 拉流（默认关闭）
+# 设置为 ffmpeg 可读取的任意地址（HLS/RTMP/SRT/HTTP 直播流或本地媒体文件）时，以该输入代替本机采集/Twitch 作为音频源，
+# 解码、卡顿检测、跨连接缓冲与重连均与 Twitch 拉流相同
+AUDIO_STREAM_URL = _env_str("AUDIO_STREAM_URL", "")
+# URL 输入类型：
+# - auto：本地文件（普通路径或 file://，.m3u8 播放列表除外）视为有限长度，其余网络地址一律视为直播
+#   （HTTP 地址无法区分 Icecast/HTTP-FLV 直播与媒体文件，按直播处理）
+# - live：直播，ffmpeg 退出即视为断线，按退避重新拉流
+# - finite：有限长度（如 HTTP 媒体文件），按原始速率读取，播放完毕后通知 Soniox 音频结束
+AUDIO_STREAM_INPUT_KIND_CHOICES = ("auto", "live", "finite")
+AUDIO_STREAM_INPUT_KIND = _env_str("AUDIO_STREAM_INPUT_KIND", "auto")
+if AUDIO_STREAM_INPUT_KIND not in AUDIO_STREAM_INPUT_KIND_CHOICES:
+    print(f"⚠️  Unsupported AUDIO_STREAM_INPUT_KIND: {AUDIO_STREAM_INPUT_KIND}, fallback to: auto")
+    AUDIO_STREAM_INPUT_KIND = "auto"
+# URL 拉流配置（standard / low_latency，含义同 TWITCH_INGEST_PROFILE；非 HLS 输入会自动忽略 HLS 专用参数）
+AUDIO_STREAM_INGEST_PROFILE = _env_str("AUDIO_STREAM_INGEST_PROFILE", "standard")
+
+# 录音文件回放（默认关闭）
+# 设置为 WAV（16-bit PCM）或原始 s16le 16kHz 单声道文件路径时，以该文件代替本机采集/Twitch 作为音频源，
+# 用于复现延迟问题、测试识别管线或批量处理录音
+AUDIO_REPLAY_FILE = _env_str("AUDIO_REPLAY_FILE", "")
+# 回放倍速：1 为实时，N 为 N 倍速，0 表示不限速
+AUDIO_REPLAY_SPEED = _env_float("AUDIO_REPLAY_SPEED", 1.0)
+# True: 文件结束后从头循环；False: 文件结束后通知 Soniox 音频结束
+AUDIO_REPLAY_LOOP = _env_bool("AUDIO_REPLAY_LOOP", False)
+
 # ffmpeg 可执行文件路径（默认依赖 PATH 中的 ffmpeg）
 FFMPEG_PATH = _env_str("FFMPEG_PATH", "ffmpeg")
 
+# Twitch 拉流配置
+# standard: ffmpeg 默认的格式探测与缓冲，HLS 从倒数第 3 个分片开始
+# low_latency: 最小化格式探测与解复用缓冲，HLS 从最新分片开始，每个音频包立即写入管道
+TWITCH_INGEST_PROFILE_CHOICES = ("standard", "low_latency")
+TWITCH_INGEST_PROFILE = _env_str("TWITCH_INGEST_PROFILE", "standard")
+if TWITCH_INGEST_PROFILE not in TWITCH_INGEST_PROFILE_CHOICES:
+    print(f"⚠️  Unsupported TWITCH_INGEST_PROFILE: {TWITCH_INGEST_PROFILE}, fallback to: standard")
+    TWITCH_INGEST_PROFILE = "standard"
+if AUDIO_STREAM_INGEST_PROFILE not in TWITCH_INGEST_PROFILE_CHOICES:
+    print(f"⚠️  Unsupported AUDIO_STREAM_INGEST_PROFILE: {AUDIO_STREAM_INGEST_PROFILE}, fallback to: standard")
+    AUDIO_STREAM_INGEST_PROFILE = "standard"
+# 直播延迟估计：获取播放列表比较分片时间戳与墙钟的间隔（秒），0 表示关闭
+TWITCH_LIVE_EDGE_PROBE_SECONDS = _env_float("TWITCH_LIVE_EDGE_PROBE_SECONDS", 5.0)
+
+# 直播追赶模式（Twitch/URL 拉流，默认关闭）
+# 网络抖动或 ffmpeg 重启后拉流会突发输出积压的音频，字幕随之落后于直播；
+# 开启后按“已解码音频时长 vs 墙钟时间”估计积压，超过 AUDIO_CATCHUP_TRIGGER_MS 时丢弃静音（并可加速语音），
+# 直到积压降到 AUDIO_CATCHUP_TARGET_MS 以下
+AUDIO_CATCHUP_ENABLED = _env_bool("AUDIO_CATCHUP_ENABLED", False)
+AUDIO_CATCHUP_TRIGGER_MS = _env_int("AUDIO_CATCHUP_TRIGGER_MS", 2000)
+AUDIO_CATCHUP_TARGET_MS = _env_int("AUDIO_CATCHUP_TARGET_MS", 500)
+# 低于该能量（dBFS）的音频块视为静音，追赶时丢弃
+AUDIO_CATCHUP_SILENCE_DB = _env_float("AUDIO_CATCHUP_SILENCE_DB", -45.0)
+# 追赶时语音的加速倍数（1 表示不加速；加速会同时升高音调，建议不超过 1.25）
+AUDIO_CATCHUP_MAX_SPEED = _env_float("AUDIO_CATCHUP_MAX_SPEED", 1.0)
+
+# ffmpeg 卡顿检测窗口（秒）：窗口内输出的 PCM 低于实时速率的 25% 时重启 ffmpeg
+FFMPEG_STALL_TIMEOUT_SECONDS = _env_float("FFMPEG_STALL_TIMEOUT_SECONDS", 6.0)
+
+# 音频采集的最大发送积压（毫秒，本机采集与 Twitch 串流共用）
+# 采集/读取线程与发送线程之间通过环形缓冲区解耦；网络卡顿导致积压超过该值时丢弃最旧的音频
+# （只限制连接正常时的积压；Soniox 连接断开期间的缓冲时长由 AUDIO_RECONNECT_BUFFER_MS 单独控制）
+AUDIO_MAX_BACKLOG_MS = _env_int("AUDIO_MAX_BACKLOG_MS", 2000)
+
+# 音频帧时长（毫秒），即每次发送给 Soniox 的音频长度
+# 可选：20 / 40 / 80 / 120 / 240。帧越短首字延迟越低，但包数和系统调用越多
+AUDIO_FRAME_MS_CHOICES = (20, 40, 80, 120, 240)
+AUDIO_FRAME_MS = _env_int("AUDIO_FRAME_MS", 240)
+if AUDIO_FRAME_MS not in AUDIO_FRAME_MS_CHOICES:
+    print(f"⚠️  Unsupported AUDIO_FRAME_MS: {AUDIO_FRAME_MS}, fallback to: 240")
+    AUDIO_FRAME_MS = 240
+
+# 自适应帧长（默认关闭）
+# True: 检测到语音时使用 AUDIO_ADAPTIVE_MIN_FRAME_MS 的短帧，静音时使用 AUDIO_FRAME_MS 的长帧
+# False: 始终使用 AUDIO_FRAME_MS
+AUDIO_ADAPTIVE_FRAME = _env_bool("AUDIO_ADAPTIVE_FRAME", False)
+AUDIO_ADAPTIVE_MIN_FRAME_MS = _env_int("AUDIO_ADAPTIVE_MIN_FRAME_MS", 40)
+if AUDIO_ADAPTIVE_MIN_FRAME_MS not in AUDIO_FRAME_MS_CHOICES:
+    print(f"⚠️  Unsupported AUDIO_ADAPTIVE_MIN_FRAME_MS: {AUDIO_ADAPTIVE_MIN_FRAME_MS}, fallback to: 40")
+    AUDIO_ADAPTIVE_MIN_FRAME_MS = 40
+
+# 原生格式采集（默认关闭）
+# True: 按 AUDIO_CAPTURE_SAMPLE_RATE 与设备自身声道数录音，在本程序内降混为单声道并重采样到 16 kHz，
+#       避免依赖系统（WASAPI/PulseAudio）的重采样，也兼容不支持 16 kHz 的设备
+# False: 直接向系统请求 16 kHz 单声道
+AUDIO_CAPTURE_NATIVE_FORMAT = _env_bool("AUDIO_CAPTURE_NATIVE_FORMAT", False)
+# 原生格式采集时的采样率（多数设备的共享模式格式为 48000 或 44100）
+AUDIO_CAPTURE_SAMPLE_RATE = _env_int("AUDIO_CAPTURE_SAMPLE_RATE", 48000)
+
+# 跨连接音频缓冲（毫秒，0 表示关闭）
+# 暂停/恢复、重启或重新连接 Soniox 时采集不中断，断开期间的音频写入缓冲区（最多保留该时长），
+# 新连接建立后以高于实时的速度补发，避免重连窗口内的语音丢失
+AUDIO_RECONNECT_BUFFER_MS = _env_int("AUDIO_RECONNECT_BUFFER_MS", 3000)
+
+# 音频设备注册表
+# 设备列表缓存有效期（秒），过期后在后台刷新
+AUDIO_DEVICE_CACHE_TTL_SECONDS = _env_float("AUDIO_DEVICE_CACHE_TTL_SECONDS", 10.0)
+# 后台检测设备热插拔的轮询间隔（秒）
+AUDIO_DEVICE_POLL_SECONDS = _env_float("AUDIO_DEVICE_POLL_SECONDS", 5.0)
+
+# 混音音频源（"mixed"：同时采集麦克风与系统音频）
+# 麦克风/系统音频的线性增益
+AUDIO_MIX_MIC_GAIN = _env_float("AUDIO_MIX_MIC_GAIN", 1.0)
+AUDIO_MIX_SYSTEM_GAIN = _env_float("AUDIO_MIX_SYSTEM_GAIN", 1.0)
+# 麦克风有人声时系统音频的闪避衰减（dB，0 表示关闭闪避）
+AUDIO_MIX_DUCKING_DB = _env_float("AUDIO_MIX_DUCKING_DB", -12.0)
+
+# 语音活动检测（VAD）门控（默认关闭）
+# True: 静音片段不发送给 Soniox（节省费用与上行带宽），期间改为定期发送 keepalive 控制消息
+# False: 所有采集到的音频都发送
+AUDIO_VAD_ENABLED = _env_bool("AUDIO_VAD_ENABLED", False)
+# 判定为语音的能量阈值（dBFS，自适应帧长也使用该阈值）
+AUDIO_VAD_THRESHOLD_DB = _env_float("AUDIO_VAD_THRESHOLD_DB", -45.0)
+# 语音结束后继续发送的时长（毫秒），避免截断句尾
+AUDIO_VAD_HANGOVER_MS = _env_int("AUDIO_VAD_HANGOVER_MS", 600)
+# 语音开始前补发的时长（毫秒），保证静音后的第一个音节不被截断
+AUDIO_VAD_PREROLL_MS = _env_int("AUDIO_VAD_PREROLL_MS", 480)
+# 没有音频发送时的 keepalive 间隔（秒），Soniox 要求至少每 20 秒收到一次数据
+SONIOX_KEEPALIVE_INTERVAL_SECONDS = _env_float("SONIOX_KEEPALIVE_INTERVAL_SECONDS", 5.0)
+
+# make-before-break 会话交接：重启、切换翻译目标语言与定时轮换时，先建立并配置新连接，
+# 音频同时发送到新旧两个连接，在旧连接的端点（<end>）处切换，界面不清空、音频不中断
+# False: 重启与切换语言时先关闭旧连接再建立新连接
+SONIOX_HANDOVER_ENABLED = _env_bool("SONIOX_HANDOVER_ENABLED", True)
+# 新连接至少接收多长时间的重叠音频后才允许切换（毫秒）
+SONIOX_HANDOVER_OVERLAP_MS = _env_int("SONIOX_HANDOVER_OVERLAP_MS", 1500)
+# 等待端点的最长时间（秒），超时后强制切换
+SONIOX_HANDOVER_MAX_WAIT_SECONDS = _env_float("SONIOX_HANDOVER_MAX_WAIT_SECONDS", 10.0)
+# 长时间直播的定时轮换间隔（分钟），在 Soniox 单次会话时长上限之前交接到新连接，0 表示不轮换
+SONIOX_SESSION_ROLLOVER_MINUTES = _env_float("SONIOX_SESSION_ROLLOVER_MINUTES", 0.0)
+
+# Soniox 连接异常断开（网络错误、服务器结束会话、可重试的错误码、接收停滞）时在服务器端自动重连，
+# 不依赖浏览器调用 /restart；重连间隔按指数退避并加入随机抖动
+SONIOX_AUTO_RECONNECT = _env_bool("SONIOX_AUTO_RECONNECT", True)
+# 持续发送音频却超过该时长（秒）没有收到任何响应时视为连接停滞并重连，0 表示不检测
+SONIOX_STALL_TIMEOUT_SECONDS = _env_float("SONIOX_STALL_TIMEOUT_SECONDS", 15.0)
+
+# 暂停方式
+# soft: 保持 Soniox 连接，暂停期间不发送音频（只发送 keepalive）、不写日志，恢复时立即继续
+# hard: 暂停时关闭连接，恢复时重新获取 key 并建立新连接
+SONIOX_PAUSE_MODE_CHOICES = ("soft", "hard")
+SONIOX_PAUSE_MODE = _env_str("SONIOX_PAUSE_MODE", "soft")
+if SONIOX_PAUSE_MODE not in SONIOX_PAUSE_MODE_CHOICES:
+    print(f"⚠️  Unsupported SONIOX_PAUSE_MODE: {SONIOX_PAUSE_MODE}, fallback to: soft")
+    SONIOX_PAUSE_MODE = "soft"
+# 软暂停超过该时长（分钟）后自动转为断开连接的暂停，0 表示一直保持连接
+SONIOX_SOFT_PAUSE_MAX_MINUTES = _env_float("SONIOX_SOFT_PAUSE_MAX_MINUTES", 10.0)
+
+# 手动确认（finalize）：不等待 Soniox 的端点检测，立即把已发送音频的 non-final 文本确认为 final，
+# 并发送到 OSC 与外部 WebSocket
+# VRChat 中静音（OSC MuteSelf=True）时确认（仅本机采集；Twitch/URL 拉流与文件回放模式不监听 OSC）
+SONIOX_FINALIZE_ON_MUTE = _env_bool("SONIOX_FINALIZE_ON_MUTE", True)
+# 软暂停开始时确认
+SONIOX_FINALIZE_ON_PAUSE = _env_bool("SONIOX_FINALIZE_ON_PAUSE", True)
+# 本地 VAD 检测到语音后持续静音达到该时长（毫秒）时确认，0 表示不启用
+# 启用 VAD 门控时从门控关闭（AUDIO_VAD_HANGOVER_MS 之后）开始计时
+SONIOX_FINALIZE_SILENCE_MS = _env_int("SONIOX_FINALIZE_SILENCE_MS", 0)
+
+# VRChat 中静音（OSC MuteSelf=True）时屏蔽麦克风：麦克风源停止发送音频（只发送 keepalive），
+# 混音源中只屏蔽麦克风；系统音频、Twitch/URL 拉流与文件回放不受影响
+AUDIO_MUTE_GATE_ENABLED = _env_bool("AUDIO_MUTE_GATE_ENABLED", True)
+# 静音后继续发送麦克风音频的尾音时长（毫秒），避免截断最后一个音节；静音时的确认在尾音结束后发送
+AUDIO_MUTE_GATE_TAIL_MS = _env_int("AUDIO_MUTE_GATE_TAIL_MS", 200)
+
+# 音频指标（电平/削波/抖动/丢帧）通过 /ws 广播的间隔（秒），0 表示不广播
+# 最新一次汇总也可通过 GET /audio-metrics 获取
+AUDIO_METRICS_INTERVAL_SECONDS = _env_float("AUDIO_METRICS_INTERVAL_SECONDS", 0.2)
+
 # 服务器配置
 # SERVER_PORT 设置为 0 时将自动选择一个空闲端口
 # AUTO_OPEN_WEBVIEW=True 时强制绑定到 127.0.0.1；关闭后默认绑定到 0.0.0.0 以便局域网访问
@@ -0,0 +1,331 @@
+"""URL 拉流模块 - 使用 ffmpeg 把任意直播流/媒体文件解码为 PCM_s16le 并流式传输到 Soniox"""
+
+import os
+import random
+import threading
+import time
+from typing import List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+from audio_catchup import CatchupConfig, LiveEdgeCatchup
+from audio_metrics import AudioLevelMeter
+from audio_pipeline import AudioRingBuffer, AudioSender, as_bytes_view
+from audio_vad import VadConfig
+from ffmpeg_supervisor import FfmpegSupervisor, build_pcm_command
+
+
+def is_local_input(url: str) -> bool:
+    """输入是否为本地文件（普通路径或 file:// 地址）"""
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return True
+    # Windows 盘符（C:\\...）会被解析为单字母 scheme
+    return (not parsed.scheme or len(parsed.scheme) == 1) and os.path.isfile(url)
+
+
+def is_hls_input(url: str) -> bool:
+    """输入是否为 HLS 播放列表（按扩展名判断）"""
+    return urlparse(url).path.lower().endswith((".m3u8", ".m3u"))
+
+
+def is_finite_input(url: str, input_kind: str = "auto") -> bool:
+    """输入是否有终点（input_kind：auto / live / finite，见 config.AUDIO_STREAM_INPUT_KIND）。
+
+    live 输入没有终点，ffmpeg 退出即视为断线并重新拉流；finite 输入按原始速率读取，播放完毕后结束。
+    auto 时只有本地文件视为有限长度；网络地址（包括 Icecast、HTTP-FLV 等 HTTP 直播流）
+    无法从地址区分直播与媒体文件，一律按直播处理，HTTP 媒体文件需显式指定 finite。
+    """
+    if input_kind == "live":
+        return False
+    if input_kind == "finite":
+        return True
+    return is_local_input(url) and not is_hls_input(url)
+
+
+def describe_input(url: str) -> str:
+    """用于日志的输入描述：去掉查询参数与用户信息，避免打印推流密钥/签名"""
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return url
+    host = parsed.hostname or ""
+    if parsed.port:
+        host = f"{host}:{parsed.port}"
+    return f"{parsed.scheme}://{host}{parsed.path}"
+
+
+class FfmpegAudioStreamer:
+    """ffmpeg 拉流 -> Soniox WebSocket
+
+    - 输入可以是 ffmpeg 支持的任意地址：HLS / RTMP / SRT / HTTP / 本地文件
+    - 解码进程由 FfmpegSupervisor 监督（后台读取 stderr、按输出速率检测卡顿）
+    - 读取线程只写入环形缓冲区，网络发送由共享的 AudioSender 完成；
+      会话重启时只断开发送（detach/attach），ffmpeg 持续解码
+    - ffmpeg 退出后按指数退避（带随机抖动）重新拉流
+    - 有限长度的输入（本地文件，或 input_kind="finite" 指定的 HTTP 媒体文件等）按原始速率读取（-re），
+      播放完毕后通知 Soniox 音频结束
+    - 可选追赶模式：拉流突发输出导致落后于直播时丢弃静音/加速语音（见 LiveEdgeCatchup）
+
+    子类（如 TwitchAudioStreamer）通过 _resolve_input()/_build_command() 等钩子提供平台相关的地址解析。
+    """
+
+    # 会话结束时保持拉流，由 SonioxSession 调用 detach()/attach() 切换连接
+    persistent_ingest = True
+
+    # ffmpeg 重连退避（秒）
+    RECONNECT_BACKOFF_INITIAL = 0.5
+    RECONNECT_BACKOFF_MAX = 30.0
+    # ffmpeg 持续输出超过该时长（秒）视为连接稳定，退避重新从初始值开始
+    STABLE_RUN_SECONDS = 10.0
+    # stdout 结束后等待 ffmpeg 退出的时长（秒）
+    EXIT_WAIT_SECONDS = 2.0
+
+    # 线程名与日志中的音频源名称
+    thread_name = "UrlAudioStreamer"
+    sender_name = "UrlAudioSender"
+    source_label = "URL"
+
+    def __init__(
+        self,
+        ws,
+        input_url: str,
+        ffmpeg_path: str = "ffmpeg",
+        sample_rate: int = 16000,
+        chunk_size: int = 3840,
+        max_backlog_ms: int = 2000,
+        vad_config: Optional[VadConfig] = None,
+        keepalive_interval: float = 5.0,
+        min_chunk_size: Optional[int] = None,
+        reconnect_buffer_ms: int = 0,
+        stall_seconds: float = 6.0,
+        ingest_profile: str = "standard",
+        catchup_config: Optional[CatchupConfig] = None,
+        finalize_silence_ms: int = 0,
+        input_kind: str = "auto",
+    ):
+        if not input_url:
+            raise ValueError("Ingest URL is empty")
+
+        self.ws = ws
+        self.input_url = input_url
+        self.ffmpeg_path = ffmpeg_path
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        # 读取块大小：自适应帧长时按最小帧读取，由发送线程负责拼帧
+        self.read_size = min(chunk_size, min_chunk_size or chunk_size)
+        # 非直播输入解码速度远快于实时，需要按原始速率读取，否则环形缓冲区会覆盖大部分音频
+        self.input_kind = input_kind
+        self.finite_input = self._is_finite_input(input_url)
+        self.finished = False
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.ffmpeg_restarts = 0
+        # ffmpeg 输出 16-bit 单声道 PCM，预期字节速率为 sample_rate * 2
+        self.decoder = FfmpegSupervisor(
+            self.thread_name, expected_byte_rate=sample_rate * 2, stall_seconds=stall_seconds
+        )
+        self.last_backoff_seconds = 0.0
+        self.ingest_profile = ingest_profile
+
+        # ffmpeg 读取线程只写入环形缓冲区，网络发送由共享的 AudioSender 完成
+        # reconnect_buffer_ms > 0 时，Soniox 连接断开期间继续读取输入，缓冲区至少能容纳该时长的音频
+        self.reconnect_buffer_ms = reconnect_buffer_ms
+        # 连接正常时积压超过 max_backlog_ms 即丢弃；容量多出的部分只在断开期间用于缓冲
+        limit_samples = max(int(sample_rate * max_backlog_ms / 1000), chunk_size)
+        backlog_samples = max(int(sample_rate * reconnect_buffer_ms / 1000), limit_samples)
+        self._ring = AudioRingBuffer(backlog_samples, limit=limit_samples)
+        self._sender = AudioSender(
+            ws,
+            self._ring,
+            frame_samples=chunk_size,
+            name=self.sender_name,
+            on_error=self._on_send_error,
+            sample_rate=sample_rate,
+            vad_config=vad_config,
+            keepalive_interval=keepalive_interval,
+            min_frame_samples=min_chunk_size,
+            finalize_silence_ms=finalize_silence_ms,
+        )
+        self.level_meter = AudioLevelMeter(sample_rate, self.read_size)
+        # 有限长度的输入按实时速率读取，不会出现突发积压
+        self.catchup: Optional[LiveEdgeCatchup] = None
+        if catchup_config is not None and not self.finite_input:
+            self.catchup = LiveEdgeCatchup(sample_rate, self.read_size, catchup_config)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._ring.clear()
+        if self.catchup is not None:
+            self.catchup.reset()
+        self._sender.start()
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.decoder.terminate()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout=2.0)
+        self._thread = None
+        self._sender.stop()
+
+    @property
+    def is_detached(self) -> bool:
+        return self._sender.detached
+
+    def detach(self) -> None:
+        """Soniox 连接关闭：停止发送，继续读取输入写入缓冲区，等待 attach() 到新连接"""
+        self._sender.detach()
+        self.ws = None
+
+    def attach(self, ws) -> None:
+        """连接到新的 Soniox 会话；启用跨连接缓冲时补发断开期间的音频，否则从直播当前位置开始"""
+        self.ws = ws
+        if self.reconnect_buffer_ms <= 0:
+            self._ring.clear()
+        self._sender.attach(ws)
+
+    def set_suspended(self, suspended: bool) -> None:
+        """软暂停：保持连接，发送线程丢弃音频并只发送 keepalive"""
+        self._sender.set_suspended(suspended)
+
+    def request_finalize(self, suspend_after: bool = False) -> None:
+        """请求 Soniox 立即把已发送的音频确认为 final；suspend_after=True 时发送后进入软暂停"""
+        self._sender.request_finalize(suspend_after)
+
+    def _on_send_error(self) -> None:
+        """发送失败时只停止发送线程，拉流继续，等待会话 detach()/attach() 到新连接"""
+
+    def get_stats(self) -> dict:
+        """获取读取/发送缓冲区统计"""
+        stats = self._ring.get_stats(self.sample_rate)
+        stats.update(self._sender.get_stats())
+        stats.update(self.decoder.get_stats())
+        stats["ffmpeg_restarts"] = self.ffmpeg_restarts
+        stats["reconnect_backoff_seconds"] = self.last_backoff_seconds
+        stats["ingest_profile"] = self.ingest_profile
+        stats["ingest_finished"] = self.finished
+        if self.catchup is not None:
+            stats.update(self.catchup.get_stats())
+        return stats
+
+    def get_level_metrics(self) -> dict:
+        """取走当前统计窗口的电平/削波/抖动汇总"""
+        return self.level_meter.snapshot()
+
+    def get_session_audio_ms(self) -> float:
+        """当前连接上已发送给 Soniox 的音频时长（毫秒）"""
+        return self._sender.session_samples_sent * 1000 / self.sample_rate
+
+    def _is_finite_input(self, input_url: str) -> bool:
+        """输入是否有终点（按原始速率读取，播放完毕后结束而不是重新拉流）"""
+        return is_finite_input(input_url, self.input_kind)
+
+    def _resolve_input(self) -> str:
+        """返回本次启动 ffmpeg 使用的输入地址"""
+        if is_hls_input(self.input_url):
+            kind = "HLS"
+        elif self.finite_input:
+            kind = "local file" if is_local_input(self.input_url) else "media file"
+        else:
+            kind = "stream"
+        print(
+            f"🌐 URL audio ingest: {describe_input(self.input_url)} ({kind}, {self.ingest_profile} profile)"
+        )
+        return self.input_url
+
+    def _build_command(self, input_url: str) -> List[str]:
+        return build_pcm_command(
+            self.ffmpeg_path,
+            input_url,
+            self.sample_rate,
+            self.ingest_profile,
+            hls=is_hls_input(input_url),
+            realtime=self.finite_input,
+        )
+
+    def _on_decoder_started(self, input_url: str) -> None:
+        """ffmpeg 已启动（子类可在此开始延迟监测等）"""
+
+    def _on_no_data(self) -> None:
+        """本次启动没有读到任何数据（子类可在此让缓存的地址失效）"""
+
+    def _run(self) -> None:
+        # 预分配的读取帧：ffmpeg 输出直接 readinto 到 int16 数组
+        frame = np.zeros(int(self.read_size), dtype=np.int16)
+        frame_bytes = as_bytes_view(frame)
+        backoff = self.RECONNECT_BACKOFF_INITIAL
+
+        decoder = self.decoder
+        catchup = self.catchup
+
+        while not self._stop_event.is_set():
+            received = 0
+            at_eof = False
+            started_at = time.monotonic()
+            try:
+                input_url = self._resolve_input()
+                decoder.start(self._build_command(input_url))
+                self._on_decoder_started(input_url)
+                self.level_meter.reset_timing()
+                while not self._stop_event.is_set():
+                    count = decoder.readinto(frame_bytes)
+                    if count < 2:
+                        at_eof = True
+                        break
+                    received += count
+                    samples = frame[:count // 2]
+                    self.level_meter.observe(samples)
+                    if catchup is not None:
+                        samples = catchup.process(samples)
+                    if samples.shape[0]:
+                        self._ring.write(samples)
+                    if count < len(frame_bytes):
+                        at_eof = True
+                        break
+
+                if self._stop_event.is_set():
+                    return
+
+                log_text = decoder.recent_log()
+                if log_text and not decoder.stalled:
+                    print(f"ffmpeg error: {log_text}")
+
+            except FileNotFoundError:
+                print("❌ ffmpeg not found. Please install ffmpeg and ensure it's in PATH, or set FFMPEG_PATH in config.py")
+                return
+            except ModuleNotFoundError as error:
+                print(f"❌ {error}")
+                return
+            except Exception as error:
+                print(f"Error streaming {self.source_label} audio: {error}")
+            finally:
+                # 读到 EOF 时等待 ffmpeg 自行退出，取得真实的退出码（判断输入是否正常播放完毕）
+                decoder.stop(exit_timeout=self.EXIT_WAIT_SECONDS if at_eof else 0.0)
+
+            if self.finite_input and received and not decoder.stalled and decoder.exit_code == 0:
+                # 文件播放完毕：发送剩余音频后通知 Soniox 音频结束，不再重启 ffmpeg
+                self.finished = True
+                print(f"🌐 URL audio ingest finished: {describe_input(self.input_url)}")
+                self._sender.finish()
+                return
+
+            if not received:
+                self._on_no_data()
+            if time.monotonic() - started_at >= self.STABLE_RUN_SECONDS:
+                backoff = self.RECONNECT_BACKOFF_INITIAL
+
+            # 指数退避并加入随机抖动，避免输入离线时频繁重试
+            delay = backoff * random.uniform(0.8, 1.2)
+            backoff = min(backoff * 2, self.RECONNECT_BACKOFF_MAX)
+            self.ffmpeg_restarts += 1
+            self.last_backoff_seconds = delay
+            print(f"🔁 Reconnecting to {self.source_label} stream in {delay:.1f} s")
+            if self._stop_event.wait(delay):
+                return
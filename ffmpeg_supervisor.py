@@ -0,0 +1,298 @@
+"""ffmpeg 子进程监督模块 - 后台读取 stderr、解析解码指标，并按输出字节速率检测卡顿"""
+
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# 输出进度信息（key=value 行）到 stderr，与日志一起由后台线程读取
+PROGRESS_ARGS = ["-nostats", "-progress", "pipe:2"]
+
+# 拉流配置：输入参数放在 -i 之前，输出参数放在输出之前
+# low_latency：尽量减少格式探测与解复用缓冲，HLS 从最新分片开始播放，每个音频包立即写入管道
+INGEST_PROFILES: Dict[str, Dict[str, List[str]]] = {
+    "standard": {
+        "input": [],
+        "output": [],
+    },
+    "low_latency": {
+        "input": [
+            "-fflags", "nobuffer+discardcorrupt",
+            "-flags", "low_delay",
+            "-probesize", "32768",
+            "-analyzeduration", "0",
+            "-live_start_index", "-1",
+        ],
+        "output": ["-flush_packets", "1"],
+    },
+}
+
+# HLS 解复用器默认从倒数第 3 个分片开始播放
+HLS_DEFAULT_LIVE_START_INDEX = -3
+
+# 仅 HLS 解复用器支持的输入参数（其他输入格式会因未知参数报错退出）
+HLS_ONLY_INPUT_OPTIONS = ("-live_start_index",)
+
+
+def profile_live_start_index(profile: str) -> int:
+    """返回该配置下 HLS 开始播放的分片位置（负数表示从末尾倒数）"""
+    args = INGEST_PROFILES.get(profile, INGEST_PROFILES["standard"])["input"]
+    if "-live_start_index" in args:
+        return int(args[args.index("-live_start_index") + 1])
+    return HLS_DEFAULT_LIVE_START_INDEX
+
+
+def build_pcm_command(
+    ffmpeg_path: str,
+    input_url: str,
+    sample_rate: int,
+    profile: str = "standard",
+    hls: bool = True,
+    realtime: bool = False,
+) -> List[str]:
+    """构造把输入解码为 16-bit 单声道 PCM 并写入 stdout 的 ffmpeg 命令。
+
+    hls=False 时去掉仅 HLS 支持的输入参数；realtime=True 时按输入的原始速率读取（用于本地文件等非直播输入）。
+    """
+    selected = INGEST_PROFILES.get(profile, INGEST_PROFILES["standard"])
+    input_args = list(selected["input"])
+    if not hls:
+        for option in HLS_ONLY_INPUT_OPTIONS:
+            if option in input_args:
+                index = input_args.index(option)
+                del input_args[index:index + 2]
+    if realtime:
+        input_args.insert(0, "-re")
+    return [
+        ffmpeg_path,
+        "-hide_banner",
+        "-loglevel",
+        "warning",
+        *PROGRESS_ARGS,
+        *input_args,
+        "-i",
+        input_url,
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        *selected["output"],
+        "-f",
+        "s16le",
+        "-acodec",
+        "pcm_s16le",
+        "pipe:1",
+    ]
+
+
+class FfmpegSupervisor:
+    """监督单个 ffmpeg 解码进程。
+
+    - stderr 由后台线程持续读取，避免管道写满后 ffmpeg 阻塞；
+      -progress 输出的 key=value 行解析为指标，其余行视为警告/错误日志
+    - stdout 由调用方通过 readinto() 读入预分配的缓冲区
+    - 看门狗线程按窗口统计输出字节速率，长时间低于预期速率时结束进程，
+      使读取方得到 EOF 并重新启动 ffmpeg（而不是无限期阻塞在读取上）
+
+    指标在多次 start() 之间累计，便于统计整个拉流过程。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        expected_byte_rate: float,
+        stall_seconds: float = 6.0,
+        startup_grace_seconds: float = 15.0,
+        min_rate_ratio: float = 0.25,
+    ):
+        self.name = name
+        self.expected_byte_rate = float(expected_byte_rate)
+        self.stall_seconds = stall_seconds
+        self.startup_grace_seconds = startup_grace_seconds
+        self.min_rate_ratio = min_rate_ratio
+
+        self._process: Optional[subprocess.Popen] = None
+        self._threads: List[threading.Thread] = []
+        self._exited = threading.Event()
+        self._log_lines: deque = deque(maxlen=20)
+        self._started_at = 0.0
+        self.stalled = False
+        # 上一次 ffmpeg 进程的退出码（None 表示尚未退出或由 stop() 结束）
+        self.exit_code: Optional[int] = None
+
+        self.bytes_read = 0
+        self.last_data_time = 0.0
+        self.stall_count = 0
+        self.warning_count = 0
+        self.last_warning = ""
+        self.speed: Optional[float] = None
+        self.out_time_seconds = 0.0
+        self.byte_rate_ratio: Optional[float] = None
+
+    def start(self, cmd: List[str]) -> None:
+        """启动 ffmpeg（cmd 中应包含 PROGRESS_ARGS 才能得到进度指标）"""
+        self.stop()
+        self._exited.clear()
+        self._log_lines.clear()
+        self.stalled = False
+        self.exit_code = None
+        self.speed = None
+        self.out_time_seconds = 0.0
+        self._started_at = time.monotonic()
+
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+        self._threads = [
+            threading.Thread(target=self._drain_stderr, name=f"{self.name}-stderr", daemon=True),
+            threading.Thread(target=self._watchdog, name=f"{self.name}-watchdog", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def readinto(self, view: memoryview) -> int:
+        """持续 readinto 直到填满 view 或遇到 EOF（进程退出/被看门狗结束），返回读取的字节数"""
+        process = self._process
+        if process is None or process.stdout is None:
+            return 0
+
+        stream = process.stdout
+        total = 0
+        size = len(view)
+        while total < size:
+            count = stream.readinto(view[total:])
+            if not count:
+                break
+            total += count
+            self.bytes_read += count
+            self.last_data_time = time.monotonic()
+        return total
+
+    def terminate(self) -> None:
+        """从其他线程结束进程，使阻塞在 readinto() 上的读取方立即返回"""
+        process = self._process
+        if process is not None and process.poll() is None:
+            try:
+                process.terminate()
+            except Exception:
+                pass
+
+    def stop(self, exit_timeout: float = 0.0) -> None:
+        """结束进程并回收后台线程（由读取方线程调用）。
+
+        读到 EOF 后调用时传入 exit_timeout：stdout 关闭时进程通常还没有被回收，
+        先等待其自行退出以记录真实的退出码，超时仍未退出才结束进程。
+        """
+        process = self._process
+        if process is not None:
+            try:
+                self.exit_code = process.wait(timeout=exit_timeout) if exit_timeout > 0 else process.poll()
+            except subprocess.TimeoutExpired:
+                self.exit_code = None
+            if self.exit_code is None:
+                try:
+                    process.terminate()
+                    process.wait(timeout=2.0)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                except Exception:
+                    pass
+            self._exited.set()
+
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+        self._threads = []
+        self._process = None
+
+    def recent_log(self) -> str:
+        """最近的 ffmpeg 日志（用于进程退出时打印原因）"""
+        return "\n".join(self._log_lines)
+
+    def get_stats(self) -> dict:
+        return {
+            "ffmpeg_speed": self.speed,
+            "ffmpeg_out_time_seconds": self.out_time_seconds,
+            "ffmpeg_warnings": self.warning_count,
+            "ffmpeg_last_warning": self.last_warning,
+            "ffmpeg_stalls": self.stall_count,
+            "ffmpeg_byte_rate_ratio": self.byte_rate_ratio,
+        }
+
+    def _drain_stderr(self) -> None:
+        process = self._process
+        if process is None or process.stderr is None:
+            return
+        try:
+            for raw_line in iter(process.stderr.readline, b""):
+                line = raw_line.decode("utf-8", errors="ignore").strip()
+                if line:
+                    self._handle_stderr_line(line)
+        except Exception:
+            pass
+        finally:
+            self._exited.set()
+
+    def _handle_stderr_line(self, line: str) -> None:
+        key, sep, value = line.partition("=")
+        if sep and key and " " not in key:
+            if key == "speed":
+                try:
+                    self.speed = float(value.rstrip("x"))
+                except ValueError:
+                    self.speed = None
+            elif key == "out_time_us":
+                try:
+                    self.out_time_seconds = int(value) / 1_000_000
+                except ValueError:
+                    pass
+            return
+
+        # 非进度行：ffmpeg 的警告/错误日志（HLS 不连续、解码错误等）
+        self.warning_count += 1
+        self.last_warning = line
+        self._log_lines.append(line)
+
+    def _watchdog(self) -> None:
+        """按 stall_seconds 窗口检查输出字节速率，过低时结束进程"""
+        window_start = time.monotonic()
+        window_bytes = self.bytes_read
+        threshold = self.expected_byte_rate * self.min_rate_ratio
+
+        while not self._exited.wait(1.0):
+            process = self._process
+            if process is None or process.poll() is not None:
+                return
+
+            now = time.monotonic()
+            if self.last_data_time < self._started_at:
+                # 尚未收到任何数据：给 HLS 探测/首个分片下载留出启动时间
+                if now - self._started_at < self.startup_grace_seconds:
+                    window_start, window_bytes = now, self.bytes_read
+                    continue
+                reason = f"no output after {self.startup_grace_seconds:.0f} s"
+            else:
+                elapsed = now - window_start
+                if elapsed < self.stall_seconds:
+                    continue
+                rate = (self.bytes_read - window_bytes) / elapsed
+                self.byte_rate_ratio = rate / self.expected_byte_rate if self.expected_byte_rate else None
+                window_start, window_bytes = now, self.bytes_read
+                if rate >= threshold:
+                    continue
+                reason = f"output rate {rate / 1000:.1f} kB/s over {elapsed:.0f} s"
+
+            self.stall_count += 1
+            self.stalled = True
+            print(f"⚠️  {self.name}: ffmpeg stalled ({reason}), restarting")
+            try:
+                process.kill()
+            except Exception:
+                pass
+            return
@@ -0,0 +1,234 @@
+"""文件音频流模块 - 回放 WAV/PCM 录音并流式传输到 Soniox"""
+
+import struct
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from audio_metrics import AudioLevelMeter
+from audio_pipeline import AudioRingBuffer, AudioSender, PcmConverter
+from audio_resampler import PolyphaseResampler
+from audio_vad import VadConfig
+
+
+def open_pcm_file(path: str, raw_sample_rate: int = 16000) -> Tuple[np.ndarray, int]:
+    """以内存映射方式打开 16-bit PCM 音频文件。
+
+    支持 WAV（PCM / WAVE_FORMAT_EXTENSIBLE，16-bit）与无文件头的 s16le 单声道原始数据
+    （采样率为 raw_sample_rate）。返回 (形状为 (frames, channels) 的 int16 memmap, 采样率)。
+    """
+    with open(path, "rb") as file:
+        header = file.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            # 无文件头：按原始 s16le 单声道处理
+            samples = np.memmap(path, dtype="<i2", mode="r")
+            return samples.reshape(-1, 1), int(raw_sample_rate)
+
+        channels = rate = None
+        offset = 12
+        while True:
+            chunk_header = file.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError("WAV file has no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            offset += 8
+
+            if chunk_id == b"fmt ":
+                fmt = file.read(chunk_size)
+                if len(fmt) < 16:
+                    raise ValueError("WAV fmt chunk is truncated")
+                audio_format, channels, rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                if audio_format not in (1, 0xFFFE) or bits != 16:
+                    raise ValueError("Only 16-bit PCM WAV files are supported")
+                if channels == 0 or rate == 0:
+                    raise ValueError("WAV fmt chunk has no channels or sample rate")
+            elif chunk_id == b"data":
+                if channels is None:
+                    raise ValueError("WAV data chunk appears before fmt chunk")
+                frames = chunk_size // (2 * channels)
+                samples = np.memmap(
+                    path, dtype="<i2", mode="r", offset=offset, shape=(frames, channels)
+                )
+                return samples, int(rate)
+            else:
+                file.seek(chunk_size, 1)
+
+            # RIFF 块按偶数字节对齐
+            offset += chunk_size + (chunk_size & 1)
+            file.seek(offset)
+
+
+class FileAudioStreamer:
+    """录音文件回放 -> Soniox WebSocket
+
+    - 以内存映射方式读取 WAV/PCM，不把整个文件读入内存
+    - speed=1 按实时速度回放，speed=N 按 N 倍速，speed<=0 不限速
+    - 文件采样率/声道与发送格式不同时，使用流式多相重采样器转换
+    - 回放不会丢弃音频：发送积压满时暂停读取文件
+    - 文件结束后发送剩余音频并通知 Soniox 音频结束（loop=True 时从头循环）
+    """
+
+    def __init__(
+        self,
+        ws,
+        path: str,
+        sample_rate: int = 16000,
+        chunk_size: int = 3840,
+        speed: float = 1.0,
+        loop: bool = False,
+        max_backlog_ms: int = 2000,
+        vad_config: Optional[VadConfig] = None,
+        keepalive_interval: float = 5.0,
+        min_chunk_size: Optional[int] = None,
+        finalize_silence_ms: int = 0,
+    ):
+        if not path:
+            raise ValueError("Replay file path is empty")
+
+        self.ws = ws
+        self.path = path
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.speed = speed
+        self.loop = loop
+        # 读取块大小：自适应帧长时按最小帧读取，由发送线程负责拼帧
+        self.read_size = min(chunk_size, min_chunk_size or chunk_size)
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.position_seconds = 0.0  # 已回放的音频时长（按发送采样率计）
+        self.finished = False
+
+        backlog_samples = max(int(sample_rate * max_backlog_ms / 1000), chunk_size)
+        self._ring = AudioRingBuffer(backlog_samples)
+        self._sender = AudioSender(
+            ws,
+            self._ring,
+            frame_samples=chunk_size,
+            name="FileAudioSender",
+            on_error=self._stop_event.set,
+            sample_rate=sample_rate,
+            vad_config=vad_config,
+            keepalive_interval=keepalive_interval,
+            min_frame_samples=min_chunk_size,
+            finalize_silence_ms=finalize_silence_ms,
+        )
+        self.level_meter = AudioLevelMeter(sample_rate, self.read_size)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._ring.clear()
+        self._sender.start()
+        self._thread = threading.Thread(target=self._run, name="FileAudioStreamer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout=2.0)
+        self._thread = None
+        self._sender.stop()
+
+    def set_suspended(self, suspended: bool) -> None:
+        """软暂停：回放继续，发送线程丢弃音频并只发送 keepalive"""
+        self._sender.set_suspended(suspended)
+
+    def request_finalize(self, suspend_after: bool = False) -> None:
+        """请求 Soniox 立即把已发送的音频确认为 final；suspend_after=True 时发送后进入软暂停"""
+        self._sender.request_finalize(suspend_after)
+
+    def set_source(self, source: str) -> bool:
+        raise ValueError("Audio source switching is not supported while replaying a file")
+
+    def get_stats(self) -> dict:
+        """获取回放/发送缓冲区统计"""
+        stats = self._ring.get_stats(self.sample_rate)
+        stats.update(self._sender.get_stats())
+        stats["replay_position_seconds"] = self.position_seconds
+        stats["replay_speed"] = self.speed
+        stats["replay_finished"] = self.finished
+        return stats
+
+    def get_level_metrics(self) -> dict:
+        """取走当前统计窗口的电平/削波/抖动汇总"""
+        return self.level_meter.snapshot()
+
+    def get_session_audio_ms(self) -> float:
+        """当前连接上已发送给 Soniox 的音频时长（毫秒）"""
+        return self._sender.session_samples_sent * 1000 / self.sample_rate
+
+    def _write(self, samples: np.ndarray) -> bool:
+        """写入发送缓冲区，积压已满时等待发送线程取走数据；返回 False 表示已停止"""
+        while not self._ring.wait_for_space(samples.shape[0], timeout=0.5):
+            if self._stop_event.is_set():
+                return False
+        self._ring.write(samples)
+        self.level_meter.observe(samples)
+        return True
+
+    def _run(self) -> None:
+        try:
+            samples, file_rate = open_pcm_file(self.path, self.sample_rate)
+        except (OSError, ValueError) as error:
+            print(f"❌ Failed to open replay file '{self.path}': {error}")
+            return
+
+        total_frames, channels = samples.shape
+        speed_text = f"{self.speed:g}x" if self.speed > 0 else "unthrottled"
+        print(
+            f"📼 Replaying {self.path} ({total_frames / file_rate:.1f} s, {file_rate} Hz x {channels} ch, {speed_text})"
+        )
+
+        # 与发送格式一致时直接从 memmap 取单声道视图，否则转换为浮点后重采样
+        needs_conversion = file_rate != self.sample_rate or channels > 1
+        block_frames = -(-self.read_size * file_rate // self.sample_rate)
+        resampler = PolyphaseResampler(file_rate, self.sample_rate, max_input_frames=block_frames)
+        converter = PcmConverter(self.read_size + 1)
+        scratch = np.zeros((block_frames, channels), dtype=np.float32)
+
+        started_at = time.monotonic()
+        sent_samples = 0
+        position = 0
+
+        while not self._stop_event.is_set():
+            if position >= total_frames:
+                if not self.loop:
+                    break
+                position = 0
+
+            block = samples[position:position + block_frames]
+            position += block.shape[0]
+
+            if needs_conversion:
+                buffer = scratch[: block.shape[0]]
+                np.multiply(block, 1.0 / 32768.0, out=buffer)
+                output = converter.convert(resampler.process(buffer))
+            else:
+                output = block[:, 0]
+
+            if output.shape[0] and not self._write(output):
+                return
+            sent_samples += output.shape[0]
+            self.position_seconds = sent_samples / self.sample_rate
+
+            if self.speed > 0:
+                # 按目标倍速对齐到墙钟时间（基于累计时长，避免误差累积）
+                delay = started_at + self.position_seconds / self.speed - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    return
+
+        if self._stop_event.is_set():
+            return
+
+        self.finished = True
+        elapsed = time.monotonic() - started_at
+        print(
+            f"📼 Replay finished: {self.position_seconds:.1f} s of audio in {elapsed:.1f} s"
+        )
+        self._sender.finish()
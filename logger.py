@@ -37,7 +37,7 @@ class TranscriptLogger:
         return log_path
     
     def write_to_log(self, tokens: list):
-        """将final tokens写入日志文件"""
+        """将final tokens（soniox_tokens.Token）写入日志文件"""
         if not self.log_file:
             return
         
@@ -54,21 +54,16 @@ class TranscriptLogger:
                 current_line_tokens = []  # 保存完整的token对象以便检查translation_status
                 
                 for token in tokens:
-                    # 跳过分隔符
-                    if token.get('is_separator'):
-                        continue
-                    
-                    speaker = token.get('speaker')
-                    language = token.get('language')
-                    text = token.get('text', '')
-                    translation_status = token.get('translation_status', 'none')
+                    speaker = token.speaker
+                    language = token.language
+                    text = token.text
                     
                     # 如果说话人或语言改变，先写入当前行
                     if (speaker != current_speaker or language != current_lang) and current_line:
                         line_text = ''.join(current_line)
                         lang_tag = f"[{current_lang.upper()}]" if current_lang else ""
                         speaker_tag = f"[SPEAKER {current_speaker}]" if current_speaker else ""
-                        status_tag = "[TRANS]" if any(t.get('translation_status') == 'translation' for t in current_line_tokens) else ""
+                        status_tag = "[TRANS]" if any(t.translation_status == 'translation' for t in current_line_tokens) else ""
                         
                         self.log_file.write(f"[{timestamp}] {speaker_tag}{lang_tag}{status_tag} {line_text}\n")
                         current_line = []
@@ -86,7 +81,7 @@ class TranscriptLogger:
                     speaker_tag = f"[SPEAKER {current_speaker}]" if current_speaker else ""
                     
                     # 检查是否包含翻译
-                    status_tag = "[TRANS]" if any(t.get('translation_status') == 'translation' for t in current_line_tokens) else ""
+                    status_tag = "[TRANS]" if any(t.translation_status == 'translation' for t in current_line_tokens) else ""
                     
                     self.log_file.write(f"[{timestamp}] {speaker_tag}{lang_tag}{status_tag} {line_text}\n")
                 
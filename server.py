@@ -69,6 +69,28 @@ def parse_cli_args(argv: list[str]) -> tuple[argparse.Namespace, list[str]]:
     parser.add_argument('--twitch-channel', dest='twitch_channel', default=None)
     parser.add_argument('--twitch-stream-quality', dest='twitch_stream_quality', default=None)
     parser.add_argument('--ffmpeg-path', dest='ffmpeg_path', default=None)
+    parser.add_argument('--twitch-ingest-profile', dest='twitch_ingest_profile', default=None,
+                        choices=['standard', 'low_latency'])
+
+    parser.add_argument('--stream-url', dest='stream_url', default=None,
+                        help='Caption audio from any ffmpeg-readable URL or media file (HLS/RTMP/SRT/HTTP/file)')
+    parser.add_argument('--stream-ingest-profile', dest='stream_ingest_profile', default=None,
+                        choices=['standard', 'low_latency'])
+    parser.add_argument('--stream-input-kind', dest='stream_input_kind', default=None,
+                        choices=['auto', 'live', 'finite'],
+                        help='auto: local files play once, network URLs are live; finite: play the URL once')
+    catchup_group = parser.add_mutually_exclusive_group()
+    catchup_group.add_argument('--live-catchup', dest='live_catchup', action='store_true', default=None,
+                               help='Drop silence (and optionally speed up speech) when stream ingest falls behind live')
+    catchup_group.add_argument('--no-live-catchup', dest='live_catchup', action='store_false', default=None)
+
+    parser.add_argument('--replay-file', dest='replay_file', default=None,
+                        help='Replay a WAV/PCM recording instead of capturing audio')
+    parser.add_argument('--replay-speed', dest='replay_speed', type=float, default=None,
+                        help='Replay speed (1 = real time, N = N times faster, 0 = unthrottled)')
+    replay_loop_group = parser.add_mutually_exclusive_group()
+    replay_loop_group.add_argument('--replay-loop', dest='replay_loop', action='store_true', default=None)
+    replay_loop_group.add_argument('--no-replay-loop', dest='replay_loop', action='store_false', default=None)
 
     return parser.parse_known_args(argv)
 
@@ -96,6 +118,16 @@ def apply_cli_overrides_to_env(args: argparse.Namespace) -> None:
     _set_env_if_provided('TWITCH_CHANNEL', args.twitch_channel)
     _set_env_if_provided('TWITCH_STREAM_QUALITY', args.twitch_stream_quality)
     _set_env_if_provided('FFMPEG_PATH', args.ffmpeg_path)
+    _set_env_if_provided('TWITCH_INGEST_PROFILE', args.twitch_ingest_profile)
+
+    _set_env_if_provided('AUDIO_STREAM_URL', args.stream_url)
+    _set_env_if_provided('AUDIO_STREAM_INGEST_PROFILE', args.stream_ingest_profile)
+    _set_env_if_provided('AUDIO_STREAM_INPUT_KIND', args.stream_input_kind)
+    _set_env_bool_if_provided('AUDIO_CATCHUP_ENABLED', args.live_catchup)
+
+    _set_env_if_provided('AUDIO_REPLAY_FILE', args.replay_file)
+    _set_env_if_provided('AUDIO_REPLAY_SPEED', args.replay_speed)
+    _set_env_bool_if_provided('AUDIO_REPLAY_LOOP', args.replay_loop)
 
 
 def run_server(app, sock):
@@ -155,13 +187,22 @@ def main():
     apply_cli_overrides_to_env(args)
 
     from config import SERVER_HOST, SERVER_PORT, AUTO_OPEN_WEBVIEW, EXTERNAL_WS_URI, EXTERNAL_WS_AUTO_DUMMY_CLIENT
+    from config import USE_TWITCH_AUDIO_STREAM, AUDIO_REPLAY_FILE, AUDIO_STREAM_URL, AUDIO_DEVICE_CACHE_TTL_SECONDS, AUDIO_DEVICE_POLL_SECONDS
+    from config import SONIOX_FINALIZE_ON_MUTE, AUDIO_MUTE_GATE_ENABLED
+    from audio_capture import device_registry
     from logger import TranscriptLogger
+    from osc_manager import osc_manager
     from soniox_session import SonioxSession
     from web_server import WebServer
-    from soniox_client import get_api_key
+    from soniox_client import get_api_key_async, temp_key_manager, uses_temporary_keys
 
     # 创建日志记录器
     logger = TranscriptLogger()
+
+    # 在后台线程中枚举音频设备并检测热插拔（Twitch/URL 拉流/文件回放模式不使用本机设备）
+    local_capture = not USE_TWITCH_AUDIO_STREAM and not AUDIO_STREAM_URL and not AUDIO_REPLAY_FILE
+    if local_capture:
+        device_registry.start(ttl=AUDIO_DEVICE_CACHE_TTL_SECONDS, poll_interval=AUDIO_DEVICE_POLL_SECONDS)
     
     # 创建Web服务器（会在创建session时传入）
     web_server = None
@@ -191,6 +232,12 @@ def main():
     # Initialize external WS settings in soniox_session
     soniox_session.set_external_ws_send_enabled(web_server.external_ws_send_enabled)
     soniox_session.set_external_ws_send_non_final(web_server.external_ws_send_non_final)
+
+    # VRChat 静音（OSC MuteSelf）时屏蔽麦克风并立即确认识别结果
+    # 只对本机采集生效：Twitch/URL 拉流/文件回放与 VRChat 麦克风无关，不监听 OSC 端口
+    listen_mute_self = local_capture and (SONIOX_FINALIZE_ON_MUTE or AUDIO_MUTE_GATE_ENABLED)
+    if listen_mute_self:
+        osc_manager.set_mute_callback(soniox_session.handle_mute_change)
     
     # 设置信号处理，优雅退出
     def signal_handler(sig, frame):
@@ -209,8 +256,17 @@ def main():
     
     # 启动后台任务
     async def start_background_tasks(app_instance):
+        if uses_temporary_keys():
+            # 后台预取并在过期前刷新临时 key，重启/恢复/重连时直接使用缓存
+            temp_key_manager.start()
+        if listen_mute_self:
+            # 接收 VRChat 发出的 MuteSelf 参数；端口被占用时只是收不到静音状态
+            try:
+                await osc_manager.start_server()
+            except OSError as error:
+                print(f"⚠️  OSC listener unavailable ({error}), MuteSelf will be ignored")
         try:
-            api_key = get_api_key()
+            api_key = await get_api_key_async()
         except RuntimeError as e:
             print(f"❌ Error: {e}")
             print("Please set the SONIOX_API_KEY environment variable or ensure network connection is available")
@@ -1,16 +1,236 @@
 """
 Soniox客户端模块 - 处理与Soniox STT服务的连接和音频流
 """
+import asyncio
 import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
 import requests
-from config import SONIOX_TEMP_KEY_URL, TARGET_LANG_1, TARGET_LANG_2
+from requests.adapters import HTTPAdapter
+
+from config import (
+    SONIOX_TEMP_KEY_URL,
+    SONIOX_TEMP_KEY_REFRESH_MARGIN_SECONDS,
+    TARGET_LANG_1,
+    TARGET_LANG_2,
+)
+
+# 临时 key 剩余有效期低于该值（秒，最多为有效期的 1/4）时不再交给新连接使用（需要留出建立连接的时间）
+TEMP_KEY_MIN_REMAINING_SECONDS = 5.0
+# 后台刷新失败后的重试间隔（秒，指数退避）
+TEMP_KEY_RETRY_INITIAL = 2.0
+TEMP_KEY_RETRY_MAX = 60.0
+
+
+def _parse_expires_at(value) -> Optional[float]:
+    """把 expiresAt（ISO 8601 字符串，或 Unix 时间戳秒/毫秒）转换为 Unix 时间戳（秒）"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e12 else float(value)
+    try:
+        text = str(value).strip()
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        # 未带时区的时间按 UTC 处理
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class TempKeyManager:
+    """临时 API key 管理器 - 缓存 SONIOX_TEMP_KEY_URL 返回的 key，直到 expiresAt 之前。
+
+    - 同一时间只发出一个请求，并发调用方等待同一次请求的结果
+    - 通过保持连接的 requests.Session 复用 TCP/TLS 连接
+    - 后台线程在过期前 refresh_margin 秒预先刷新，取 key 时通常直接命中缓存
+    - get_key_async() 命中缓存时不离开事件循环，未命中时在线程池中请求，不阻塞事件循环
+    """
+
+    def __init__(self, url: Optional[str], refresh_margin: float = 60.0, timeout: float = 10.0):
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._http: Optional[requests.Session] = None
+        self._key: Optional[str] = None
+        self._usable_until: Optional[float] = None  # time.monotonic() 时间轴
+        self._refresh_at: Optional[float] = None
+
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+        self.fetch_count = 0
+        self.fetch_failures = 0
+        self.cache_hits = 0
+        self.last_fetch_ms: Optional[float] = None
+
+    def start(self) -> None:
+        """启动后台刷新线程（重复调用无副作用）"""
+        if not self.url or (self._refresh_thread and self._refresh_thread.is_alive()):
+            return
+
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name="TempKeyRefresh", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def invalidate(self) -> None:
+        """丢弃缓存的 key（例如 Soniox 返回 401），下次取 key 时重新请求"""
+        with self._lock:
+            self._key = None
+            self._usable_until = None
+            self._refresh_at = None
+        self._wake_event.set()
+
+    def _cached_key(self) -> Optional[str]:
+        with self._lock:
+            key = self._key
+            if key is None:
+                return None
+            if self._usable_until is not None and time.monotonic() >= self._usable_until:
+                return None
+            self.cache_hits += 1
+            return key
+
+    def get_key(self) -> str:
+        """返回有效的临时 key（缓存未命中时同步请求，失败时抛出 RuntimeError）"""
+        key = self._cached_key()
+        if key is not None:
+            return key
+        with self._refresh_lock:
+            # 等待期间其他线程可能已经取得新的 key
+            key = self._cached_key()
+            if key is not None:
+                return key
+            print("⏳ API Key not found in environment, fetching temporary key...")
+            return self._fetch()
+
+    async def get_key_async(self) -> str:
+        """事件循环中使用：命中缓存时直接返回，否则在线程池中请求"""
+        key = self._cached_key()
+        if key is not None:
+            return key
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_key)
+
+    def _fetch(self) -> str:
+        """请求新的临时 key 并更新缓存（调用方持有 _refresh_lock）"""
+        if not self.url:
+            raise RuntimeError("Failed to fetch temporary API Key: SONIOX_TEMP_KEY_URL is not set")
+        if self._http is None:
+            # 只访问一个主机：一个连接池，保持连接以复用 TCP/TLS 握手
+            self._http = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            self._http.mount("https://", adapter)
+            self._http.mount("http://", adapter)
+
+        started = time.monotonic()
+        try:
+            response = self._http.post(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        except requests.RequestException as e:
+            self.fetch_failures += 1
+            raise RuntimeError(f"Failed to fetch temporary API Key: {e}")
+        except Exception as e:
+            self.fetch_failures += 1
+            raise RuntimeError(f"Failed to parse temporary API Key: {e}")
+
+        temp_key = data.get("apiKey") if isinstance(data, dict) else None
+        if not temp_key:
+            self.fetch_failures += 1
+            raise RuntimeError("Failed to parse temporary API Key: Invalid temporary key response format")
+
+        now = time.monotonic()
+        expires_at = data.get("expiresAt")
+        expires_ts = _parse_expires_at(expires_at)
+        with self._lock:
+            self._key = temp_key
+            if expires_ts is None:
+                # 没有过期时间：不缓存，每次使用前重新请求
+                self._usable_until = now
+                self._refresh_at = None
+            else:
+                ttl = max(0.0, expires_ts - time.time())
+                self._usable_until = now + ttl - min(TEMP_KEY_MIN_REMAINING_SECONDS, ttl / 4)
+                # 有效期较短时至少用满一半再刷新
+                self._refresh_at = now + max(ttl - self.refresh_margin, ttl / 2)
+            self.fetch_count += 1
+            self.last_fetch_ms = (now - started) * 1000
+
+        print(f"✅ Successfully obtained temporary API Key ({self.last_fetch_ms:.0f} ms)")
+        print(f"   Expires at: {expires_at}")
+        self._wake_event.set()
+        return temp_key
+
+    def _refresh_loop(self) -> None:
+        retry = TEMP_KEY_RETRY_INITIAL
+        while not self._stop_event.is_set():
+            with self._lock:
+                refresh_at = self._refresh_at
+                has_key = self._key is not None
+
+            if has_key and refresh_at is None:
+                # 没有过期时间的 key 不预取，等待下一次请求或 invalidate()
+                delay = None
+            else:
+                delay = 0.0 if refresh_at is None else refresh_at - time.monotonic()
+
+            if delay is None or delay > 0:
+                self._wake_event.wait(delay)
+                self._wake_event.clear()
+                continue
+
+            try:
+                with self._refresh_lock:
+                    self._fetch()
+                retry = TEMP_KEY_RETRY_INITIAL
+            except RuntimeError as error:
+                print(f"⚠️  Temporary API Key refresh failed: {error}; retrying in {retry:.0f} s")
+                if self._stop_event.wait(retry):
+                    return
+                retry = min(retry * 2, TEMP_KEY_RETRY_MAX)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            usable_for = None if self._usable_until is None else self._usable_until - time.monotonic()
+            return {
+                "temp_key_cached": self._key is not None,
+                "temp_key_usable_seconds": usable_for,
+                "temp_key_fetches": self.fetch_count,
+                "temp_key_fetch_failures": self.fetch_failures,
+                "temp_key_cache_hits": self.cache_hits,
+                "temp_key_last_fetch_ms": self.last_fetch_ms,
+            }
+
+
+temp_key_manager = TempKeyManager(SONIOX_TEMP_KEY_URL, refresh_margin=SONIOX_TEMP_KEY_REFRESH_MARGIN_SECONDS)
+
+
+def uses_temporary_keys() -> bool:
+    """未设置 SONIOX_API_KEY 时使用临时 key"""
+    return not os.environ.get("SONIOX_API_KEY")
 
 
 def get_api_key() -> str:
     """
     获取API Key
     1. 先尝试从环境变量 SONIOX_API_KEY 加载
-    2. 如果没有，则请求临时key
+    2. 如果没有，则使用临时key（缓存到过期之前，见 TempKeyManager）
     """
     # 尝试从环境变量获取
     api_key = os.environ.get("SONIOX_API_KEY")
@@ -19,31 +239,24 @@ def get_api_key() -> str:
         print(f"✅ Using API Key from environment variable")
         return api_key
     
-    # 如果没有，获取临时key
-    print("⏳ API Key not found in environment, fetching temporary key...")
-    try:
-        response = requests.post(SONIOX_TEMP_KEY_URL, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        temp_key = data.get("apiKey")
-        expires_at = data.get("expiresAt")
-        
-        if temp_key:
-            print(f"✅ Successfully obtained temporary API Key")
-            print(f"   Key: {temp_key}")
-            print(f"   Expires at: {expires_at}")
-            return temp_key
-        else:
-            raise RuntimeError("Invalid temporary key response format")
-            
-    except requests.RequestException as e:
-        raise RuntimeError(f"Failed to fetch temporary API Key: {e}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to parse temporary API Key: {e}")
-
-
-def get_config(api_key: str, audio_format: str, translation: str, translation_target_lang: str | None = None) -> dict:
+    return temp_key_manager.get_key()
+
+
+async def get_api_key_async() -> str:
+    """get_api_key() 的事件循环版本：需要请求临时 key 时在线程池中执行，不阻塞事件循环"""
+    api_key = os.environ.get("SONIOX_API_KEY")
+    if api_key:
+        return api_key
+    return await temp_key_manager.get_key_async()
+
+
+def get_config(
+    api_key: str,
+    audio_format: str,
+    translation: str,
+    translation_target_lang: str | None = None,
+    sample_rate: int = 16000,
+) -> dict:
     """获取Soniox STT配置"""
     from config import (
         TRANSLATION_TARGET_LANG,
@@ -65,7 +278,7 @@ def get_config(api_key: str, audio_format: str, translation: str, translation_ta
         config["audio_format"] = "auto"
     elif audio_format == "pcm_s16le":
         config["audio_format"] = "pcm_s16le"
-        config["sample_rate"] = 16000
+        config["sample_rate"] = sample_rate
         config["num_channels"] = 1
     else:
         raise ValueError(f"Unsupported audio_format: {audio_format}")
@@ -2,12 +2,14 @@
 Soniox会话模块 - 管理与Soniox服务的WebSocket会话
 """
 import json
+import random
 import threading
+import time
 import asyncio
 from typing import Optional, Tuple
 
 from websockets import ConnectionClosedOK
-from websockets.sync.client import connect as sync_connect
+from websockets.asyncio.client import connect as async_connect
 
 from config import (
     SONIOX_WEBSOCKET_URL,
@@ -15,23 +17,177 @@ from config import (
     TWITCH_CHANNEL,
     TWITCH_STREAM_QUALITY,
     FFMPEG_PATH,
+    FFMPEG_STALL_TIMEOUT_SECONDS,
+    AUDIO_CATCHUP_ENABLED,
+    AUDIO_CATCHUP_TRIGGER_MS,
+    AUDIO_CATCHUP_TARGET_MS,
+    AUDIO_CATCHUP_SILENCE_DB,
+    AUDIO_CATCHUP_MAX_SPEED,
+    TWITCH_INGEST_PROFILE,
+    TWITCH_LIVE_EDGE_PROBE_SECONDS,
     EXTERNAL_WS_NON_FINAL_SEND_INTERVAL,
+    AUDIO_MAX_BACKLOG_MS,
+    AUDIO_VAD_ENABLED,
+    AUDIO_VAD_THRESHOLD_DB,
+    AUDIO_VAD_HANGOVER_MS,
+    AUDIO_VAD_PREROLL_MS,
+    SONIOX_KEEPALIVE_INTERVAL_SECONDS,
+    SONIOX_HANDOVER_ENABLED,
+    SONIOX_HANDOVER_OVERLAP_MS,
+    SONIOX_HANDOVER_MAX_WAIT_SECONDS,
+    SONIOX_SESSION_ROLLOVER_MINUTES,
+    SONIOX_AUTO_RECONNECT,
+    SONIOX_STALL_TIMEOUT_SECONDS,
+    SONIOX_PAUSE_MODE,
+    SONIOX_PAUSE_MODE_CHOICES,
+    SONIOX_SOFT_PAUSE_MAX_MINUTES,
+    SONIOX_FINALIZE_ON_MUTE,
+    SONIOX_FINALIZE_ON_PAUSE,
+    SONIOX_FINALIZE_SILENCE_MS,
+    AUDIO_MUTE_GATE_ENABLED,
+    AUDIO_MUTE_GATE_TAIL_MS,
+    AUDIO_FRAME_MS,
+    AUDIO_ADAPTIVE_FRAME,
+    AUDIO_ADAPTIVE_MIN_FRAME_MS,
+    AUDIO_MIX_MIC_GAIN,
+    AUDIO_MIX_SYSTEM_GAIN,
+    AUDIO_MIX_DUCKING_DB,
+    AUDIO_CAPTURE_NATIVE_FORMAT,
+    AUDIO_CAPTURE_SAMPLE_RATE,
+    AUDIO_METRICS_INTERVAL_SECONDS,
+    AUDIO_REPLAY_FILE,
+    AUDIO_STREAM_URL,
+    AUDIO_STREAM_INGEST_PROFILE,
+    AUDIO_STREAM_INPUT_KIND,
+    AUDIO_REPLAY_SPEED,
+    AUDIO_REPLAY_LOOP,
+    AUDIO_RECONNECT_BUFFER_MS,
 )
-from soniox_client import get_config
-from audio_capture import AudioStreamer
+from soniox_client import get_api_key_async, get_config, temp_key_manager, uses_temporary_keys
+from audio_capture import AUDIO_SOURCES, AudioStreamer
+from audio_catchup import CatchupConfig
+from audio_metrics import AudioMetricsPublisher
+from audio_mixer import MixConfig
+from audio_vad import VadConfig
 from osc_manager import osc_manager
+from soniox_tokens import Token, parse_tokens, tokens_to_dicts
+from soniox_transport import SonioxAudioFanout, SonioxSendQueue, in_loop_thread
+
+# 交接后旧连接补齐剩余 final tokens 的最长时间（秒），超时后直接关闭
+RETIRING_CONNECTION_TIMEOUT_SECONDS = 5.0
+# 定时轮换交接失败后的重试间隔（秒）
+ROLLOVER_RETRY_SECONDS = 60.0
+# 自动重连的退避间隔（秒）；连接稳定运行超过 STABLE_CONNECTION_SECONDS 后退避重置
+RECONNECT_BACKOFF_INITIAL = 1.0
+RECONNECT_BACKOFF_MAX = 30.0
+STABLE_CONNECTION_SECONDS = 30.0
+# 重连也无法恢复的错误码（请求/配置错误、API key 无效、余额不足），不自动重连
+FATAL_ERROR_CODES = (400, 401, 402, 403)
+
+
+class _SonioxConnection:
+    """一条 Soniox WebSocket 连接：发送任务、接收任务，以及交接期间的 token 过滤状态"""
+
+    def __init__(self, ws, send_queue: SonioxSendQueue, translation_target_lang: str, candidate: bool = False):
+        self.ws = ws
+        self.send_queue = send_queue
+        self.translation_target_lang = translation_target_lang
+        self.sender_task: Optional[asyncio.Task] = None
+        self.reader_task: Optional[asyncio.Task] = None
+        self.opened_at = time.monotonic()
+        self.rollover_at: Optional[float] = None
+        # 停滞检测：最近一次收到响应的时间，以及当时已发送的音频时长
+        self.last_message_at = self.opened_at
+        self.audio_ms_at_last_message = 0.0
+        # 连接结束的原因（用于决定是否重连）
+        self.error_code = None
+        self.error_message: Optional[str] = None
+        self.finished = False
+        self.close_reason: Optional[str] = None
+        # 交接中的新连接：切换前的响应先缓存（None 表示直接分发）
+        self.pending: Optional[list] = [] if candidate else None
+        # 切换点在本连接音频时间轴上的位置，之前的音频已由旧连接负责
+        self.cutover_ms: Optional[float] = None
+        self._keep_final = False
+        # 已被替换的旧连接：只分发剩余的 final tokens，直到 Soniox 返回 finished
+        self.retiring = False
+
+    def filter_tokens(self, tokens: list[Token]) -> list[Token]:
+        if self.retiring:
+            return [token for token in tokens if token.is_final]
+        cutover_ms = self.cutover_ms
+        if cutover_ms is None:
+            return tokens
+        kept = []
+        for token in tokens:
+            start_ms = token.start_ms
+            if token.is_final:
+                # 译文与 <end> 没有时间戳，跟随前面的原文 token 决定是否保留
+                if start_ms is not None:
+                    self._keep_final = start_ms >= cutover_ms
+                if self._keep_final:
+                    kept.append(token)
+            elif start_ms is None or start_ms >= cutover_ms:
+                kept.append(token)
+        return kept
+
+
+class _Handover:
+    """一次 make-before-break 交接的状态"""
+
+    def __init__(self, reason: str, translation_target_lang: str):
+        self.reason = reason
+        self.translation_target_lang = translation_target_lang
+        self.connection: Optional[_SonioxConnection] = None
+        self.started_at = time.monotonic()
+        # 新连接开始接收音频并经过重叠时长后，才允许在旧连接的端点处切换
+        self.ready_at: Optional[float] = None
 
 
 class SonioxSession:
     """Soniox会话管理器"""
     
     def __init__(self, logger, broadcast_callback):
+        # 会话以协程的形式运行在 aiohttp 的事件循环中；start()/stop() 可在任意线程调用
         self.stop_event = None
-        self.thread = None
+        self._session_task: Optional[asyncio.Task] = None
+        self._session_done: Optional[threading.Event] = None
+        # stop(keep_capture=True) 停止的会话的 stop_event：会话退出时保持采集，供紧接着的 start() 接上
+        self._capture_kept_for: Optional[threading.Event] = None
+        self._background_tasks: set = set()
+        # 当前会话的连接：正在分发的 active 连接、交接中的新连接、正在补齐结果的旧连接
+        self._connections: set = set()
+        self._active_connection: Optional[_SonioxConnection] = None
+        self._active_changed: Optional[asyncio.Event] = None
+        self._fanout: Optional[SonioxAudioFanout] = None
+        self._handover: Optional[_Handover] = None
+        self._handover_task: Optional[asyncio.Task] = None
+        self.handover_count = 0
+        self.handover_failures = 0
+        # 自动重连统计
+        self.reconnect_count = 0
+        self.stall_count = 0
+        self.downtime_seconds = 0.0
+        self.last_downtime_seconds = 0.0
+        self.last_disconnect_reason: Optional[str] = None
+        self._disconnected_at: Optional[float] = None
         self.last_sent_count = 0
         self.logger = logger
         self.broadcast_callback = broadcast_callback
         self.is_paused = False  # 暂停状态标志
+        self.pause_mode: Optional[str] = None  # 暂停方式（soft/hard），未暂停时为 None
+        self.paused_at: Optional[float] = None
+        self._soft_pause_timer: Optional[asyncio.TimerHandle] = None
+        # 手动确认（finalize）统计；final 延迟按是否由 finalize 产生分别累计 [总和, 次数]
+        self.finalize_requests = 0
+        self.finalize_count = 0
+        self.last_finalize_reason: Optional[str] = None
+        self.last_finalize_latency_ms: Optional[float] = None
+        self._final_lag = {"endpoint": [0.0, 0], "finalized": [0.0, 0]}
+        self._final_segment_open = False  # 上一个 <end> 之后是否已有 final 文本
+        # VRChat 静音状态（OSC MuteSelf）
+        self.mic_muted = False
+        self._mute_finalize_timer: Optional[asyncio.TimerHandle] = None
         self.ws = None
         self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.api_key: Optional[str] = None
@@ -39,19 +195,36 @@ class SonioxSession:
         self.translation: Optional[str] = None
         self.translation_target_lang: str = "en"
         self.sample_rate = 16000
-        self.chunk_size = 3840
-        self.audio_source = "twitch" if USE_TWITCH_AUDIO_STREAM else "system"
+        self.frame_ms = AUDIO_FRAME_MS
+        self.chunk_size = self.sample_rate * self.frame_ms // 1000
+        # 自适应帧长的最小帧（None 表示固定帧长）
+        self.min_chunk_size: Optional[int] = None
+        if AUDIO_ADAPTIVE_FRAME and AUDIO_ADAPTIVE_MIN_FRAME_MS < self.frame_ms:
+            self.min_chunk_size = self.sample_rate * AUDIO_ADAPTIVE_MIN_FRAME_MS // 1000
+        if AUDIO_REPLAY_FILE:
+            self.audio_source = "file"
+        elif AUDIO_STREAM_URL:
+            self.audio_source = "url"
+        else:
+            self.audio_source = "twitch" if USE_TWITCH_AUDIO_STREAM else "system"
         self.audio_streamer: Optional[object] = None
         self.audio_lock = threading.Lock()
+        # 识别延迟：已发送音频时长与最新 token 结束时间之差
+        self.asr_lag_ms: Optional[float] = None
+        self.metrics_publisher = AudioMetricsPublisher(
+            self._collect_audio_metrics,
+            self._publish_audio_metrics,
+            interval=AUDIO_METRICS_INTERVAL_SECONDS,
+        )
         self.input_device_id: Optional[str] = None  # 入力デバイスID
         self.output_device_id: Optional[str] = None  # 出力デバイスID
         self.osc_translation_enabled = False
         self._osc_buffer_lock = threading.Lock()
-        self._osc_translation_tokens: list[dict] = []
+        self._osc_translation_tokens: list[Token] = []
         # External WebSocket text buffer
         self._external_ws_buffer_lock = threading.Lock()
-        self._external_ws_tokens: list[dict] = []  # Final tokens
-        self._external_ws_non_final_tokens: list[dict] = []  # Non-final tokens (青文字)
+        self._external_ws_tokens: list[Token] = []  # Final tokens
+        self._external_ws_non_final_tokens: list[Token] = []  # Non-final tokens (青文字)
         self._external_ws_word_count = 0
         self._external_ws_non_final_token_count = 0
         self.external_ws_non_final_send_interval = EXTERNAL_WS_NON_FINAL_SEND_INTERVAL
@@ -76,7 +249,7 @@ class SonioxSession:
         translation_target_lang: Optional[str] = None,
     ):
         """启动新的Soniox会话"""
-        if self.thread and self.thread.is_alive():
+        if self.is_running() and self.stop_event is not None and not self.stop_event.is_set():
             print("⚠️  Soniox session already running, start request ignored")
             return False
 
@@ -86,7 +259,11 @@ class SonioxSession:
             return False
 
         self.last_sent_count = 0
+        self._final_segment_open = False
+        self._cancel_soft_pause_timer()
         self.is_paused = False
+        self.pause_mode = None
+        self.paused_at = None
         self.api_key = api_key
         self.audio_format = audio_format
         self.translation = translation
@@ -101,13 +278,80 @@ class SonioxSession:
         # 初始化日志文件（如果还没有创建）
         if self.logger.log_file is None:
             self.logger.init_log_file()
-        
-        self.thread = threading.Thread(
-            target=self._run_session,
-            args=(api_key, audio_format, translation, self.translation_target_lang, loop),
-            daemon=True
+
+        # 上一个会话可能仍在退出（在事件循环线程中调用 stop() 时无法同步等待），新会话先等待其结束
+        previous_done = self._session_done
+        self.stop_event = threading.Event()
+        self._session_done = threading.Event()
+        asyncio.run_coroutine_threadsafe(
+            self._run_session(
+                api_key,
+                audio_format,
+                translation,
+                self.translation_target_lang,
+                loop,
+                self.stop_event,
+                self._session_done,
+                previous_done,
+            ),
+            loop,
         )
-        self.thread.start()
+        return True
+
+    def _schedule(self, coro) -> None:
+        """在事件循环中执行协程：已在事件循环线程中时直接创建任务，否则跨线程提交"""
+        loop = self.loop
+        if in_loop_thread(loop):
+            task = loop.create_task(coro)
+            # 事件循环只保留任务的弱引用，完成前由这里持有
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def _cancel_session_task(self) -> None:
+        """在事件循环中取消正在运行的会话协程（尚未开始运行的协程会检查 stop_event 后直接退出）"""
+        task = self._session_task
+        if task is not None and not task.done():
+            task.cancel()
+
+    def is_running(self) -> bool:
+        """会话协程是否仍在运行（包括正在退出）"""
+        done = self._session_done
+        return done is not None and not done.is_set()
+
+    def handover(self, reason: str, translation_target_lang: Optional[str] = None) -> bool:
+        """make-before-break 交接到新连接（重启、切换翻译目标语言、定时轮换）。
+
+        旧连接继续识别，新连接建立并发送配置后同时接收音频；旧连接出现端点时切换，
+        旧连接发送音频结束消息补齐剩余结果后关闭。界面不清空，音频不中断。
+        返回 False 表示当前无法交接（未运行/已暂停/已禁用），调用方应退回 stop()/start()。
+        """
+        if not SONIOX_HANDOVER_ENABLED or self.is_paused or not self.is_running() or self.loop is None:
+            return False
+        if translation_target_lang is not None:
+            ok, message = self.set_translation_target_lang(translation_target_lang)
+            if not ok:
+                print(f"⚠️  {message}")
+                return False
+        if in_loop_thread(self.loop):
+            return self._begin_handover(reason)
+        self.loop.call_soon_threadsafe(self._begin_handover, reason)
+        return True
+
+    def _begin_handover(self, reason: str) -> bool:
+        """在事件循环中开始交接"""
+        if self._active_connection is None or self._fanout is None:
+            return False
+        if self._handover is not None:
+            print("⚠️  Soniox handover already in progress, request ignored")
+            return True
+        handover = _Handover(reason, self.get_translation_target_lang())
+        self._handover = handover
+        task = self.loop.create_task(self._run_handover(handover, self.loop))
+        self._handover_task = task
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
         return True
 
     def get_translation_target_lang(self) -> str:
@@ -126,17 +370,128 @@ class SonioxSession:
             print(f"🌐 Translation target language updated: {previous} -> {normalized}")
         return True, "ok"
     
-    def pause(self):
-        """暂停识别"""
+    def pause(self, mode: Optional[str] = None):
+        """暂停识别。
+
+        soft: 保持 Soniox 连接，停止发送音频（只发送 keepalive）与写日志，恢复时立即继续；
+        超过 SONIOX_SOFT_PAUSE_MAX_MINUTES 后自动转为 hard。
+        hard: 关闭连接，恢复时建立新连接。mode 为 None 时使用 SONIOX_PAUSE_MODE。
+        """
+        mode = mode or SONIOX_PAUSE_MODE
+        if mode not in SONIOX_PAUSE_MODE_CHOICES:
+            raise ValueError("Invalid pause mode. Expect 'soft' or 'hard'.")
+
         if self.is_paused:
             print("Pause requested but session already paused")
             return False
 
         self.is_paused = True
+        self.paused_at = time.monotonic()
+        if mode == "soft" and self._is_session_active():
+            self.pause_mode = "soft"
+            # 先确认暂停前说的话：发送线程发出剩余音频与 finalize 之后才开始丢弃音频
+            if not (SONIOX_FINALIZE_ON_PAUSE and self.finalize("pause", suspend_after=True)):
+                with self.audio_lock:
+                    streamer = self.audio_streamer
+                # 会话尚未启动采集时，由 _start_audio_streamer() 按 pause_mode 设置
+                if streamer is not None:
+                    streamer.set_suspended(True)
+            self._schedule_soft_pause_timeout(self.paused_at)
+            print("⏸️  Recognition paused (connection kept open)")
+            return True
+
+        self.pause_mode = "hard"
         print("⏸️  Recognition paused (connection closing)")
         self.stop()
         return True
 
+    def finalize(self, reason: str, suspend_after: bool = False) -> bool:
+        """请求 Soniox 立即把已发送音频的 non-final tokens 确认为 final（静音、软暂停等）。
+
+        finalize 消息由音频发送线程按顺序发送，确认后的 tokens 与 <fin> 标记照常经 _dispatch_tokens 分发；
+        suspend_after=True 时发送线程发出 finalize 后进入软暂停。
+        """
+        if not self._is_session_active():
+            return False
+        with self.audio_lock:
+            streamer = self.audio_streamer
+        if streamer is None or getattr(streamer, "is_detached", False):
+            return False
+        streamer.request_finalize(suspend_after)
+        self.finalize_requests += 1
+        self.last_finalize_reason = reason
+        print(f"⏹️  Finalizing pending tokens ({reason})")
+        return True
+
+    def handle_mute_change(self, muted) -> None:
+        """OSC MuteSelf 回调（在事件循环线程中调用）：屏蔽麦克风，并在尾音结束后确认识别结果"""
+        muted = bool(muted)
+        if muted == self.mic_muted:
+            return
+        self.mic_muted = muted
+        timer = self._mute_finalize_timer
+        self._mute_finalize_timer = None
+        if timer is not None:
+            timer.cancel()
+
+        tail_ms = 0
+        if AUDIO_MUTE_GATE_ENABLED:
+            with self.audio_lock:
+                streamer = self.audio_streamer
+            set_mic_muted = getattr(streamer, "set_mic_muted", None)
+            if set_mic_muted is not None:
+                set_mic_muted(muted, AUDIO_MUTE_GATE_TAIL_MS)
+                if streamer.get_source() in ("microphone", "mixed"):
+                    tail_ms = AUDIO_MUTE_GATE_TAIL_MS
+                    print("🔇 Microphone muted" if muted else "🎙️  Microphone unmuted")
+
+        if muted and SONIOX_FINALIZE_ON_MUTE:
+            if tail_ms > 0 and self.loop is not None:
+                self._mute_finalize_timer = self.loop.call_later(tail_ms / 1000, self.finalize, "mute")
+            else:
+                self.finalize("mute")
+
+    def _is_session_active(self) -> bool:
+        """会话正在运行且未被要求停止"""
+        return self.is_running() and self.stop_event is not None and not self.stop_event.is_set()
+
+    def _schedule_soft_pause_timeout(self, paused_at: float) -> None:
+        """软暂停超时后关闭连接（在事件循环中计时）"""
+        if SONIOX_SOFT_PAUSE_MAX_MINUTES <= 0 or self.loop is None:
+            return
+
+        def schedule():
+            self._cancel_soft_pause_timer()
+            self._soft_pause_timer = self.loop.call_later(
+                SONIOX_SOFT_PAUSE_MAX_MINUTES * 60, self._on_soft_pause_timeout, paused_at
+            )
+
+        if in_loop_thread(self.loop):
+            schedule()
+        else:
+            self.loop.call_soon_threadsafe(schedule)
+
+    def _cancel_soft_pause_timer(self) -> None:
+        timer = self._soft_pause_timer
+        self._soft_pause_timer = None
+        if timer is None:
+            return
+        if in_loop_thread(self.loop):
+            timer.cancel()
+        else:
+            self.loop.call_soon_threadsafe(timer.cancel)
+
+    def _on_soft_pause_timeout(self, paused_at: float) -> None:
+        """长时间暂停：转为断开连接的暂停（恢复时建立新连接）"""
+        self._soft_pause_timer = None
+        if self.pause_mode != "soft" or self.paused_at != paused_at:
+            return
+        print(
+            f"⏸️  Recognition paused for over {SONIOX_SOFT_PAUSE_MAX_MINUTES:g} min, closing Soniox connection"
+        )
+        self.pause_mode = "hard"
+        self.stop()
+
     def set_osc_translation_enabled(self, enabled: bool):
         """开启或关闭翻译结果通过 OSC 发送"""
         value = bool(enabled)
@@ -188,6 +543,9 @@ class SonioxSession:
             print("Resume requested but session is not paused")
             return False
 
+        if self.can_resume_in_place():
+            return self._resume_in_place(translation_target_lang)
+
         if api_key:
             self.api_key = api_key
         if audio_format:
@@ -217,13 +575,47 @@ class SonioxSession:
             print("▶️  Recognition resumed (new connection)")
         return started
     
-    def stop(self):
-        """停止当前会话"""
+    def can_resume_in_place(self) -> bool:
+        """软暂停中且连接仍在：恢复时无需获取 key 或重新连接"""
+        return self.is_paused and self.pause_mode == "soft" and self._is_session_active()
+
+    def _resume_in_place(self, translation_target_lang: Optional[str]) -> bool:
+        """结束软暂停：在原连接上继续发送音频与写日志"""
+        self._cancel_soft_pause_timer()
+        paused_for = time.monotonic() - self.paused_at if self.paused_at is not None else 0.0
+        self.is_paused = False
+        self.pause_mode = None
+        self.paused_at = None
+        with self.audio_lock:
+            streamer = self.audio_streamer
+        if streamer is not None:
+            streamer.set_suspended(False)
+        print(f"▶️  Recognition resumed (connection kept open, paused {paused_for:.1f} s)")
+
+        if translation_target_lang is not None:
+            previous = self.get_translation_target_lang()
+            ok, message = self.set_translation_target_lang(translation_target_lang)
+            if not ok:
+                print(f"⚠️  {message}")
+            elif self.get_translation_target_lang() != previous:
+                self.handover("translation target change")
+        return True
+
+    def stop(self, keep_capture: bool = False):
+        """停止当前会话。
+
+        keep_capture=True（重启后立即 start()）时保持采集并断开发送，新会话补发中间的音频；
+        否则（硬暂停、会话结束）停止采集，恢复时不会补发暂停期间采集的音频。
+        """
+        self._cancel_soft_pause_timer()
+        if self.pause_mode == "soft":
+            # 连接关闭后软暂停失效，恢复时需要建立新连接
+            self.pause_mode = "hard"
         if self.stop_event:
+            self._capture_kept_for = self.stop_event if keep_capture else None
             self.stop_event.set()
 
-        self._stop_audio_streamer()
-
+        # 先关闭发送队列：在事件循环线程中调用时，阻塞在队列上的发送线程需要被唤醒才能退出
         if self.ws:
             try:
                 self.ws.close()
@@ -232,17 +624,22 @@ class SonioxSession:
             finally:
                 self.ws = None
 
-        thread = self.thread
-
-        if thread and thread.is_alive():
-            thread.join(timeout=3.0)
-            if thread.is_alive():
-                print("⚠️  Soniox session thread did not terminate within timeout")
+        if keep_capture:
+            self._detach_audio_streamer()
+        else:
+            self._stop_audio_streamer()
 
-        if thread and not thread.is_alive():
-            self.thread = None
+        done = self._session_done
+        if done is not None and not done.is_set():
+            if in_loop_thread(self.loop):
+                # 在事件循环线程中（HTTP 处理函数）无法同步等待：取消协程，由下一次 start() 等待其退出
+                self._cancel_session_task()
+            else:
+                self.loop.call_soon_threadsafe(self._cancel_session_task)
+                if not done.wait(timeout=3.0):
+                    print("⚠️  Soniox session did not terminate within timeout")
 
-        if self.thread is None:
+        if done is None or done.is_set() or in_loop_thread(self.loop):
             self.stop_event = None
             self._reset_osc_buffer()
             self._reset_external_ws_buffer()
@@ -258,11 +655,17 @@ class SonioxSession:
 
         返回 (是否成功, 描述信息)
         """
+        if AUDIO_REPLAY_FILE:
+            return False, "File replay mode is enabled; audio source switching is disabled."
+
+        if AUDIO_STREAM_URL:
+            return False, "URL streaming mode is enabled; audio source switching is disabled."
+
         if USE_TWITCH_AUDIO_STREAM:
             return False, "Twitch streaming mode is enabled; audio source switching is disabled."
 
-        if source not in ("system", "microphone"):
-            return False, "Invalid audio source (expected 'system' or 'microphone')."
+        if source not in AUDIO_SOURCES:
+            return False, "Invalid audio source (expected 'system', 'microphone' or 'mixed')."
 
         with self.audio_lock:
             previous_source = self.audio_source
@@ -333,15 +736,172 @@ class SonioxSession:
         with self.audio_lock:
             return self.output_device_id
 
+    def get_audio_metrics(self) -> dict:
+        """获取最近一次发布的音频指标汇总"""
+        return self.metrics_publisher.latest
+
+    def get_connection_stats(self) -> dict:
+        """Soniox 连接统计：交接、自动重连、停滞与断线时长"""
+        downtime = self.downtime_seconds
+        disconnected_at = self._disconnected_at
+        if disconnected_at is not None:
+            downtime += time.monotonic() - disconnected_at
+        return {
+            "soniox_connected": self._active_connection is not None,
+            "soniox_pause_mode": self.pause_mode,
+            "soniox_finalize_requests": self.finalize_requests,
+            "soniox_finalizes": self.finalize_count,
+            "soniox_finalize_latency_ms": self.last_finalize_latency_ms,
+            "final_lag_ms": self._average_final_lag("endpoint"),
+            "finalized_final_lag_ms": self._average_final_lag("finalized"),
+            "soniox_handovers": self.handover_count,
+            "soniox_handover_failures": self.handover_failures,
+            "soniox_reconnects": self.reconnect_count,
+            "soniox_stalls": self.stall_count,
+            "soniox_downtime_seconds": downtime,
+            "soniox_last_downtime_seconds": self.last_downtime_seconds,
+            "soniox_last_disconnect_reason": self.last_disconnect_reason,
+        }
+
+    def _average_final_lag(self, kind: str) -> Optional[float]:
+        total, count = self._final_lag[kind]
+        return total / count if count else None
+
+    def _collect_audio_metrics(self) -> Optional[dict]:
+        """由指标发布线程调用：汇总电平统计与缓冲区/发送统计"""
+        with self.audio_lock:
+            streamer = self.audio_streamer
+
+        get_level_metrics = getattr(streamer, "get_level_metrics", None)
+        if get_level_metrics is None:
+            return None
+        metrics = get_level_metrics()
+        metrics.update(streamer.get_stats())
+
+        # 各阶段延迟：拉流（仅 Twitch 可估计）+ 发送队列 + 识别，合计为画面到字幕的估计延迟
+        metrics["stage_send_queue_ms"] = metrics.get("backlog_ms")
+        metrics["stage_asr_ms"] = self.asr_lag_ms
+        metrics.update(self.get_connection_stats())
+        decoder_lag = metrics.get("ingest_decoder_lag_ms")
+        if decoder_lag is not None and self.asr_lag_ms is not None:
+            metrics["glass_to_subtitle_ms"] = decoder_lag + metrics.get("backlog_ms", 0.0) + self.asr_lag_ms
+        return metrics
+
+    def _observe_asr_lag(self, tokens: list[Token], connection: Optional[_SonioxConnection] = None) -> None:
+        """用本次响应中最新的 token 结束时间估计识别延迟（以该连接自己的音频时间轴为准）"""
+        connection = connection or self._active_connection
+        if connection is None:
+            return
+        end_ms = max((token.end_ms for token in tokens if token.end_ms is not None), default=None)
+        if end_ms is None:
+            return
+        self.asr_lag_ms = max(0.0, connection.send_queue.get_audio_ms(self.sample_rate) - end_ms)
+
+    def _observe_final_lag(
+        self, final_tokens: list[Token], finalized: bool, connection: Optional[_SonioxConnection]
+    ) -> None:
+        """final tokens 的延迟：已发送音频时长与最新 final token 结束时间之差，按是否由 finalize 产生分别统计"""
+        connection = connection or self._active_connection
+        if connection is None:
+            return
+        end_ms = max((token.end_ms for token in final_tokens if token.end_ms is not None), default=None)
+        if end_ms is None:
+            return
+        lag = self._final_lag["finalized" if finalized else "endpoint"]
+        lag[0] += max(0.0, connection.send_queue.get_audio_ms(self.sample_rate) - end_ms)
+        lag[1] += 1
+
+    def _observe_finalize(self, connection: Optional[_SonioxConnection]) -> None:
+        """收到 <fin>：记录从发送 finalize 到确认完成的时间"""
+        self.finalize_count += 1
+        connection = connection or self._active_connection
+        if connection is None:
+            return
+        sent_at = connection.send_queue.finalize_sent_at
+        if sent_at:
+            self.last_finalize_latency_ms = (time.monotonic() - sent_at.popleft()) * 1000
+
+    def _publish_audio_metrics(self, metrics: dict) -> None:
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(
+            self.broadcast_callback({"type": "audio_metrics", "metrics": metrics}),
+            loop,
+        )
+
+    def _build_vad_config(self) -> Optional[VadConfig]:
+        if not AUDIO_VAD_ENABLED:
+            return None
+        return VadConfig(
+            threshold_db=AUDIO_VAD_THRESHOLD_DB,
+            hangover_ms=AUDIO_VAD_HANGOVER_MS,
+            preroll_ms=AUDIO_VAD_PREROLL_MS,
+        )
+
+    def _build_catchup_config(self) -> Optional[CatchupConfig]:
+        if not AUDIO_CATCHUP_ENABLED:
+            return None
+        return CatchupConfig(
+            trigger_ms=AUDIO_CATCHUP_TRIGGER_MS,
+            target_ms=AUDIO_CATCHUP_TARGET_MS,
+            silence_db=AUDIO_CATCHUP_SILENCE_DB,
+            max_speed=AUDIO_CATCHUP_MAX_SPEED,
+        )
+
     def _start_audio_streamer(self, ws) -> None:
         with self.audio_lock:
             existing_streamer = self.audio_streamer
+            if getattr(existing_streamer, "is_detached", False):
+                # 上一个会话结束后采集仍在继续：直接接到新连接并补发缓冲的音频
+                existing_streamer.set_suspended(self.pause_mode == "soft")
+                existing_streamer.attach(ws)
+                self.metrics_publisher.start()
+                return
             self.audio_streamer = None
 
         if existing_streamer:
             existing_streamer.stop()
 
-        if USE_TWITCH_AUDIO_STREAM:
+        vad_config = self._build_vad_config()
+
+        if AUDIO_REPLAY_FILE:
+            from file_audio_streamer import FileAudioStreamer
+
+            streamer = FileAudioStreamer(
+                ws,
+                path=AUDIO_REPLAY_FILE,
+                sample_rate=self.sample_rate,
+                chunk_size=self.chunk_size,
+                speed=AUDIO_REPLAY_SPEED,
+                loop=AUDIO_REPLAY_LOOP,
+                max_backlog_ms=AUDIO_MAX_BACKLOG_MS,
+                vad_config=vad_config,
+                keepalive_interval=SONIOX_KEEPALIVE_INTERVAL_SECONDS,
+                min_chunk_size=self.min_chunk_size,
+                finalize_silence_ms=SONIOX_FINALIZE_SILENCE_MS,
+            )
+        elif AUDIO_STREAM_URL:
+            from ffmpeg_audio_streamer import FfmpegAudioStreamer
+
+            streamer = FfmpegAudioStreamer(
+                ws,
+                input_url=AUDIO_STREAM_URL,
+                ffmpeg_path=FFMPEG_PATH,
+                sample_rate=self.sample_rate,
+                chunk_size=self.chunk_size,
+                max_backlog_ms=AUDIO_MAX_BACKLOG_MS,
+                vad_config=vad_config,
+                keepalive_interval=SONIOX_KEEPALIVE_INTERVAL_SECONDS,
+                min_chunk_size=self.min_chunk_size,
+                finalize_silence_ms=SONIOX_FINALIZE_SILENCE_MS,
+                reconnect_buffer_ms=AUDIO_RECONNECT_BUFFER_MS,
+                stall_seconds=FFMPEG_STALL_TIMEOUT_SECONDS,
+                ingest_profile=AUDIO_STREAM_INGEST_PROFILE,
+                catchup_config=self._build_catchup_config(),
+                input_kind=AUDIO_STREAM_INPUT_KIND,
+            )
+        elif USE_TWITCH_AUDIO_STREAM:
             from twitch_audio_streamer import TwitchAudioStreamer
 
             streamer = TwitchAudioStreamer(
@@ -351,6 +911,16 @@ class SonioxSession:
                 ffmpeg_path=FFMPEG_PATH,
                 sample_rate=self.sample_rate,
                 chunk_size=self.chunk_size,
+                max_backlog_ms=AUDIO_MAX_BACKLOG_MS,
+                vad_config=vad_config,
+                keepalive_interval=SONIOX_KEEPALIVE_INTERVAL_SECONDS,
+                min_chunk_size=self.min_chunk_size,
+                finalize_silence_ms=SONIOX_FINALIZE_SILENCE_MS,
+                reconnect_buffer_ms=AUDIO_RECONNECT_BUFFER_MS,
+                stall_seconds=FFMPEG_STALL_TIMEOUT_SECONDS,
+                ingest_profile=TWITCH_INGEST_PROFILE,
+                live_edge_interval=TWITCH_LIVE_EDGE_PROBE_SECONDS,
+                catchup_config=self._build_catchup_config(),
             )
         else:
             streamer = AudioStreamer(
@@ -359,15 +929,45 @@ class SonioxSession:
                 sample_rate=self.sample_rate,
                 chunk_size=self.chunk_size,
                 input_device_id=self.input_device_id,
-                output_device_id=self.output_device_id
+                output_device_id=self.output_device_id,
+                max_backlog_ms=AUDIO_MAX_BACKLOG_MS,
+                vad_config=vad_config,
+                keepalive_interval=SONIOX_KEEPALIVE_INTERVAL_SECONDS,
+                min_chunk_size=self.min_chunk_size,
+                finalize_silence_ms=SONIOX_FINALIZE_SILENCE_MS,
+                mix_config=MixConfig(
+                    mic_gain=AUDIO_MIX_MIC_GAIN,
+                    system_gain=AUDIO_MIX_SYSTEM_GAIN,
+                    ducking_db=AUDIO_MIX_DUCKING_DB,
+                ),
+                capture_rate=AUDIO_CAPTURE_SAMPLE_RATE if AUDIO_CAPTURE_NATIVE_FORMAT else None,
+                reconnect_buffer_ms=AUDIO_RECONNECT_BUFFER_MS,
             )
 
+        streamer.set_suspended(self.pause_mode == "soft")
+        if AUDIO_MUTE_GATE_ENABLED and isinstance(streamer, AudioStreamer):
+            streamer.set_mic_muted(self.mic_muted)
         with self.audio_lock:
             self.audio_streamer = streamer
 
         streamer.start()
+        self.metrics_publisher.start()
+
+    def _detach_audio_streamer(self) -> None:
+        """连接断开（会话内重连或重启）：启用跨连接缓冲（或音频源需要持续拉流）时保持采集并断开发送，否则停止音频流"""
+        with self.audio_lock:
+            streamer = self.audio_streamer
+
+        detach = getattr(streamer, "detach", None)
+        keep_running = AUDIO_RECONNECT_BUFFER_MS > 0 or getattr(streamer, "persistent_ingest", False)
+        if detach is None or not keep_running:
+            self._stop_audio_streamer()
+            return
+        if not streamer.is_detached:
+            detach()
 
     def _stop_audio_streamer(self) -> None:
+        self.metrics_publisher.stop()
         with self.audio_lock:
             streamer = self.audio_streamer
             self.audio_streamer = None
@@ -387,31 +987,31 @@ class SonioxSession:
 
         speaker_value = "?"
         for tok in reversed(tokens):
-            spk = tok.get("speaker")
+            spk = tok.speaker
             if spk is not None and spk != "":
                 speaker_value = str(spk)
                 break
 
-        text = "".join([tok.get("text", "") for tok in tokens]).strip()
+        text = "".join([tok.text for tok in tokens]).strip()
 
         if text:
             osc_manager.add_message_and_send(text, ongoing=False, speaker=speaker_value)
 
-    def _handle_osc_final_tokens(self, final_tokens: list[dict]):
+    def _handle_osc_final_tokens(self, final_tokens: list[Token]):
         """处理新增的 final tokens，用 <end> 断句并缓存译文"""
         if not self.get_osc_translation_enabled():
             return
 
         for token in final_tokens:
-            if not token.get("is_final"):
+            if not token.is_final:
                 continue
 
-            text = token.get("text") or ""
+            text = token.text
             if text == "<end>":
                 self._flush_osc_translation_segment()
                 continue
 
-            if token.get("translation_status") == "translation" and text:
+            if token.translation_status == "translation" and text:
                 with self._osc_buffer_lock:
                     self._osc_translation_tokens.append(token)
     
@@ -421,9 +1021,9 @@ class SonioxSession:
             return 0
         return len(text.split())
     
-    def _should_flush_external_ws(self, token: dict) -> bool:
+    def _should_flush_external_ws(self, token: Token) -> bool:
         """Check if external WebSocket buffer should be flushed based on conditions"""
-        text = token.get("text") or ""
+        text = token.text
         
         # Condition 1: Line end (<end> token)
         if text == "<end>":
@@ -464,8 +1064,8 @@ class SonioxSession:
                 return
             
             # Save current state before clearing (for detecting new additions)
-            final_text = "".join([tok.get("text", "") for tok in self._external_ws_tokens])
-            non_final_text = "".join([tok.get("text", "") for tok in self._external_ws_non_final_tokens])
+            final_text = "".join([tok.text for tok in self._external_ws_tokens])
+            non_final_text = "".join([tok.text for tok in self._external_ws_non_final_tokens])
             
             # Clear final tokens (non-final tokens are kept for next update)
             self._external_ws_tokens.clear()
@@ -477,19 +1077,16 @@ class SonioxSession:
             self._external_ws_last_flush_non_final_text = non_final_text
         
         # Convert tokens to text using the same method as OSC
-        text = "".join([tok.get("text", "") for tok in tokens_to_send]).strip()
+        text = "".join([tok.text for tok in tokens_to_send]).strip()
         
         if text and self.loop:
             # Get web_server from broadcast_callback closure or pass it differently
             # For now, we'll need to access web_server through a different mechanism
             # Let's add a callback for external WS sending
             if hasattr(self, 'external_ws_send_callback') and self.external_ws_send_callback:
-                asyncio.run_coroutine_threadsafe(
-                    self.external_ws_send_callback(text),
-                    self.loop
-                )
+                self._schedule(self.external_ws_send_callback(text))
     
-    def _handle_external_ws_final_tokens(self, final_tokens: list[dict]):
+    def _handle_external_ws_final_tokens(self, final_tokens: list[Token]):
         """Handle final tokens for external WebSocket sending"""
         # Check if external WS is enabled (via callback existence)
         if not hasattr(self, 'external_ws_send_callback') or not self.external_ws_send_callback:
@@ -506,10 +1103,10 @@ class SonioxSession:
             self._external_ws_non_final_token_count = 0
         
         for token in final_tokens:
-            if not token.get("is_final"):
+            if not token.is_final:
                 continue
             
-            text = token.get("text") or ""
+            text = token.text
             
             # Check for <end> token (triggers immediate flush)
             if text == "<end>":
@@ -519,7 +1116,7 @@ class SonioxSession:
             # Process original transcription tokens (not translations)
             # translation_status can be "original", "none", or missing
             # We want to send the original transcript, not the translation
-            translation_status = token.get("translation_status")
+            translation_status = token.translation_status
             if translation_status != "translation" and text:
                 with self._external_ws_buffer_lock:
                     # Add the final token to buffer
@@ -540,12 +1137,12 @@ class SonioxSession:
                     should_reset_word_count = True
                 elif self._external_ws_word_count >= 10:
                     # Check if comma is included
-                    combined_text = "".join([tok.get("text", "") for tok in self._external_ws_tokens])
+                    combined_text = "".join([tok.text for tok in self._external_ws_tokens])
                     if ',' in combined_text:
                         should_reset_word_count = True
                 elif self._external_ws_word_count >= 2:
                     # Check if dot is included
-                    combined_text = "".join([tok.get("text", "") for tok in self._external_ws_tokens])
+                    combined_text = "".join([tok.text for tok in self._external_ws_tokens])
                     if '.' in combined_text:
                         should_reset_word_count = True
                 
@@ -556,7 +1153,7 @@ class SonioxSession:
         # If <end> token exists or final token exists, send all at once
         self._flush_external_ws_segment()
     
-    def _handle_external_ws_non_final_tokens(self, non_final_tokens: list[dict]):
+    def _handle_external_ws_non_final_tokens(self, non_final_tokens: list[Token]):
         """Handle non-final tokens for external WebSocket sending"""
         # Check if external WS is enabled (via callback existence)
         if not hasattr(self, 'external_ws_send_callback') or not self.external_ws_send_callback:
@@ -569,8 +1166,8 @@ class SonioxSession:
         # Process original transcription tokens (not translations)
         filtered_tokens = []
         for token in non_final_tokens:
-            text = token.get("text") or ""
-            translation_status = token.get("translation_status")
+            text = token.text
+            translation_status = token.translation_status
             if translation_status != "translation" and text:
                 filtered_tokens.append(token)
         
@@ -580,15 +1177,15 @@ class SonioxSession:
         # Update non-final tokens buffer and increment counter
         with self._external_ws_buffer_lock:
             # Get previous non-final text for comparison
-            previous_non_final_text = "".join([tok.get("text", "") for tok in self._external_ws_non_final_tokens])
+            previous_non_final_text = "".join([tok.text for tok in self._external_ws_non_final_tokens])
             
             # Update non-final tokens buffer
             self._external_ws_non_final_tokens = filtered_tokens
             self._external_ws_non_final_token_count += 1
             
             # Get current state
-            current_final_text = "".join([tok.get("text", "") for tok in self._external_ws_tokens])
-            current_non_final_text = "".join([tok.get("text", "") for tok in self._external_ws_non_final_tokens])
+            current_final_text = "".join([tok.text for tok in self._external_ws_tokens])
+            current_non_final_text = "".join([tok.text for tok in self._external_ws_non_final_tokens])
             
             # Calculate newly added content since last flush
             # Final tokens: current - last flushed (only newly added final tokens)
@@ -605,8 +1202,8 @@ class SonioxSession:
             
             # Combine final and non-final tokens for condition checking
             all_tokens = self._external_ws_tokens + self._external_ws_non_final_tokens
-            combined_text = "".join([tok.get("text", "") for tok in all_tokens])
-            combined_word_count = sum([self._count_words(tok.get("text", "")) for tok in all_tokens])
+            combined_text = "".join([tok.text for tok in all_tokens])
+            combined_word_count = sum([self._count_words(tok.text) for tok in all_tokens])
         
         # Check conditions
         should_flush = False
@@ -636,118 +1233,488 @@ class SonioxSession:
                     self._external_ws_non_final_token_count = 0
             self._flush_external_ws_segment()
     
-    def _run_session(
+    async def _run_session(
         self,
         api_key: str,
         audio_format: str,
         translation: str,
         translation_target_lang: str,
         loop: asyncio.AbstractEventLoop,
+        stop_event: threading.Event,
+        done: threading.Event,
+        previous_done: Optional[threading.Event] = None,
     ):
-        """运行Soniox会话（内部方法）"""
-        if not api_key:
-            print("❌ _run_session called without API key. Exiting session thread.")
-            asyncio.run_coroutine_threadsafe(
-                self.broadcast_callback({
+        """运行Soniox会话（内部协程，运行在事件循环中）"""
+        self._session_task = asyncio.current_task()
+        streamer_started = None
+        try:
+            if previous_done is not None:
+                while not previous_done.is_set():
+                    await asyncio.sleep(0.05)
+            if stop_event.is_set():
+                return
+
+            if not api_key:
+                print("❌ _run_session called without API key. Exiting session.")
+                await self.broadcast_callback({
                     "type": "error",
                     "message": "Soniox API key is missing. Please set it in .env file."
-                }),
-                loop
-            )
+                })
+                return
+
+            backoff = RECONNECT_BACKOFF_INITIAL
+            while not stop_event.is_set():
+                print("Connecting to Soniox...")
+                connected_at = time.monotonic()
+                try:
+                    connection = await self._open_connection(
+                        api_key, audio_format, translation, self.get_translation_target_lang(), loop
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as connect_error:
+                    print(f"Error: {connect_error}")
+                    reason = f"connect failed: {connect_error}"
+                    retry = True
+                else:
+                    self._active_connection = connection
+                    self._active_changed = asyncio.Event()
+                    # 音频发送线程通过队列把帧交给事件循环中的发送任务；交接期间同时发送到新连接
+                    fanout = SonioxAudioFanout(connection.send_queue)
+                    self._fanout = fanout
+                    self.ws = fanout
+
+                    # Start streaming audio in the background（创建/恢复采集线程可能阻塞，放到线程池执行）
+                    streamer_started = loop.run_in_executor(None, self._start_audio_streamer, fanout)
+                    await streamer_started
+                    self._on_connected()
+
+                    ended = await self._supervise_connections(stop_event)
+                    if ended is None:
+                        break
+                    reason = self._describe_disconnect(ended)
+                    retry = self._should_reconnect(ended)
+                    # 断线期间音频由跨连接缓冲保留（或停止采集），重连后再接到新连接
+                    await self._close_connections()
+                    await loop.run_in_executor(None, self._detach_audio_streamer)
+                    streamer_started = None
+
+                self.last_disconnect_reason = reason
+                if not retry or not SONIOX_AUTO_RECONNECT or stop_event.is_set():
+                    break
+
+                if self._disconnected_at is None:
+                    self._disconnected_at = time.monotonic()
+                if time.monotonic() - connected_at >= STABLE_CONNECTION_SECONDS:
+                    backoff = RECONNECT_BACKOFF_INITIAL
+                # 指数退避并加入随机抖动，避免 Soniox 不可用时频繁重试
+                delay = backoff * random.uniform(0.8, 1.2)
+                backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+                print(f"🔁 Soniox connection lost ({reason}), reconnecting in {delay:.1f} s")
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Error: {e}")
+        finally:
+            stop_event.set()
+            if self.stop_event is stop_event:
+                self.stop_event = None
+                self.ws = None
+            try:
+                await asyncio.shield(self._close_connections())
+                # 被取消时采集可能仍在线程池中启动，等待其完成后再断开，避免留下未断开的采集
+                if streamer_started is not None:
+                    await asyncio.shield(asyncio.wait([streamer_started]))
+                # 只有重启（stop(keep_capture=True)）时保持采集；暂停、出错或连接正常结束时停止采集
+                if self._capture_kept_for is stop_event:
+                    release = self._detach_audio_streamer
+                else:
+                    release = self._stop_audio_streamer
+                await asyncio.shield(loop.run_in_executor(None, release))
+            except asyncio.CancelledError:
+                pass
+            if self._disconnected_at is not None:
+                self.downtime_seconds += time.monotonic() - self._disconnected_at
+                self._disconnected_at = None
+            if self._session_task is asyncio.current_task():
+                self._session_task = None
+            done.set()
+
+    def _on_connected(self) -> None:
+        """连接建立：自动重连成功时记录断线时长"""
+        disconnected_at = self._disconnected_at
+        if disconnected_at is None:
+            print("Session started.")
             return
+        self._disconnected_at = None
+        downtime = time.monotonic() - disconnected_at
+        self.reconnect_count += 1
+        self.downtime_seconds += downtime
+        self.last_downtime_seconds = downtime
+        print(f"🔁 Soniox session reconnected after {downtime:.1f} s")
+
+    def _describe_disconnect(self, connection: _SonioxConnection) -> str:
+        if connection.error_code is not None:
+            return f"error {connection.error_code}: {connection.error_message}"
+        if connection.finished:
+            return "session finished by server"
+        return connection.close_reason or "connection closed"
+
+    def _should_reconnect(self, connection: _SonioxConnection) -> bool:
+        """输入正常结束（已发送音频结束消息）或错误不可恢复时不重连"""
+        if connection.error_code == 401 and uses_temporary_keys():
+            # 临时 key 已过期或失效：换一个新的 key 重连
+            temp_key_manager.invalidate()
+            return True
+        if connection.error_code in FATAL_ERROR_CODES:
+            return False
+        if connection.finished and connection.send_queue.end_of_audio_sent:
+            return False
+        return True
+
+    async def _open_connection(
+        self,
+        api_key: str,
+        audio_format: str,
+        translation: str,
+        translation_target_lang: str,
+        loop: asyncio.AbstractEventLoop,
+        candidate: bool = False,
+    ) -> _SonioxConnection:
+        """建立一条 Soniox 连接并发送配置，启动该连接的发送与接收任务"""
+        if uses_temporary_keys():
+            # 临时 key 有有效期：重连与交接时从缓存取得当前有效的 key（缓存失效时在线程池中请求）
+            api_key = await get_api_key_async()
+            self.api_key = api_key
+        config = get_config(
+            api_key,
+            audio_format,
+            translation,
+            translation_target_lang=translation_target_lang,
+            sample_rate=self.sample_rate,
+        )
+        ws = await async_connect(SONIOX_WEBSOCKET_URL)
+        try:
+            # Send first request with config.
+            await ws.send(json.dumps(config))
+        except BaseException:
+            await ws.close()
+            raise
+
+        send_queue = SonioxSendQueue(loop, max_pending_bytes=self.sample_rate * 2)
+        connection = _SonioxConnection(ws, send_queue, translation_target_lang, candidate=candidate)
+        connection.sender_task = loop.create_task(send_queue.run(ws))
+        connection.reader_task = loop.create_task(self._read_connection(connection))
+        self._connections.add(connection)
+        return connection
+
+    async def _read_connection(self, connection: _SonioxConnection) -> None:
+        """接收任务：逐条处理该连接的响应，直到 finished、出错或被取消"""
+        send_queue = connection.send_queue
+        sample_rate = self.sample_rate
+        try:
+            async for message in connection.ws:
+                connection.last_message_at = time.monotonic()
+                connection.audio_ms_at_last_message = send_queue.get_audio_ms(sample_rate)
+                if not await self._handle_response(json.loads(message), connection):
+                    break
+        except ConnectionClosedOK:
+            connection.close_reason = "connection closed by server"
+        except asyncio.CancelledError:
+            # stop()/pause()/交接结束/停滞：以正常关闭码结束连接
+            pass
+        except Exception as e:
+            print(f"Error: {e}")
+            connection.close_reason = str(e) or type(e).__name__
+        finally:
+            connection.send_queue.close()
+            connection.sender_task.cancel()
+            self._connections.discard(connection)
+            try:
+                await connection.ws.close()
+            except Exception:
+                pass
+            handover = self._handover
+            if handover is not None and handover.connection is connection:
+                self._abort_handover(handover, "new connection closed before cutover")
 
-        config = get_config(api_key, audio_format, translation, translation_target_lang=translation_target_lang)
+    async def _supervise_connections(self, stop_event: threading.Event) -> Optional[_SonioxConnection]:
+        """监视 active 连接：交接后跟随新连接，到期时定时轮换，接收停滞时关闭连接。
 
-        print("Connecting to Soniox...")
-        self.stop_event = threading.Event()
+        active 连接结束且没有可接替的连接时返回该连接；会话被停止时返回 None。
+        """
+        rollover_seconds = SONIOX_SESSION_ROLLOVER_MINUTES * 60
+        while not stop_event.is_set():
+            connection = self._active_connection
+            changed = self._active_changed
+            changed.clear()
+
+            timeout = None
+            rollover_due = False
+            if rollover_seconds > 0 and self._handover is None:
+                if connection.rollover_at is None:
+                    connection.rollover_at = connection.opened_at + rollover_seconds
+                timeout = max(0.0, connection.rollover_at - time.monotonic())
+                rollover_due = True
+            if SONIOX_STALL_TIMEOUT_SECONDS > 0:
+                # 停滞检测每秒检查一次
+                timeout = 1.0 if timeout is None else min(timeout, 1.0)
+
+            changed_task = asyncio.ensure_future(changed.wait())
+            try:
+                finished, _ = await asyncio.wait(
+                    {connection.reader_task, changed_task},
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                changed_task.cancel()
+
+            if connection is not self._active_connection:
+                # 交接已完成，继续监视新连接
+                continue
+            if not finished:
+                now = time.monotonic()
+                if self._is_stalled(connection, now):
+                    self.stall_count += 1
+                    connection.close_reason = f"no response for {now - connection.last_message_at:.0f} s"
+                    print(f"⚠️  Soniox connection stalled ({connection.close_reason} while sending audio)")
+                    connection.reader_task.cancel()
+                elif rollover_due and now >= connection.rollover_at:
+                    # 定时轮换；交接失败时稍后重试
+                    connection.rollover_at = now + ROLLOVER_RETRY_SECONDS
+                    self._begin_handover("scheduled rollover")
+                continue
+            if connection.reader_task.done():
+                handover = self._handover
+                if handover is not None and handover.connection is not None:
+                    # active 连接意外结束，交接中的新连接立即接替
+                    await self._cut_over(handover, "previous connection closed")
+                    continue
+                return connection
+        return None
+
+    def _is_stalled(self, connection: _SonioxConnection, now: float) -> bool:
+        """持续发送音频却长时间没有收到响应。
+
+        VAD 静音期间只发送 keepalive，Soniox 不会返回响应，因此只有在上次响应后
+        又发送了至少半个检测窗口的音频时才判定为停滞。
+        """
+        if SONIOX_STALL_TIMEOUT_SECONDS <= 0:
+            return False
+        if now - connection.last_message_at < SONIOX_STALL_TIMEOUT_SECONDS:
+            return False
+        audio_ms = connection.send_queue.get_audio_ms(self.sample_rate) - connection.audio_ms_at_last_message
+        return audio_ms >= SONIOX_STALL_TIMEOUT_SECONDS * 500
+
+    async def _run_handover(self, handover: _Handover, loop: asyncio.AbstractEventLoop) -> None:
+        """建立新连接并开始重叠发送；超过最长等待时间仍未遇到端点时强制切换"""
         try:
-            with sync_connect(SONIOX_WEBSOCKET_URL) as ws:
-                self.ws = ws
-                # Send first request with config.
-                ws.send(json.dumps(config))
+            connection = await self._open_connection(
+                self.api_key,
+                self.audio_format,
+                self.translation,
+                handover.translation_target_lang,
+                loop,
+                candidate=True,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            self._abort_handover(handover, str(error))
+            return
 
-                # Start streaming audio in the background
-                self._start_audio_streamer(ws)
+        if self._handover is not handover or self._fanout is None:
+            # 交接期间会话已结束
+            connection.send_queue.close()
+            connection.reader_task.cancel()
+            return
 
-                print("Session started.")
+        handover.connection = connection
+        self._fanout.add(connection.send_queue)
+        handover.ready_at = time.monotonic() + SONIOX_HANDOVER_OVERLAP_MS / 1000
+        print(f"🔀 Soniox handover started ({handover.reason}): new connection is receiving audio alongside the current one")
 
-                # 累积所有的final tokens
-                all_final_tokens: list[dict] = []
-                
-                try:
-                    while True:
-                        message = ws.recv()
-                        res = json.loads(message)
-
-                        # Error from server.
-                        if res.get("error_code") is not None:
-                            print(f"Error: {res['error_code']} - {res['error_message']}")
-                            break
-
-                        # Parse tokens from current response.
-                        non_final_tokens: list[dict] = []
-                        has_translation = False  # 标记本次响应是否包含翻译token
-                        
-                        for token in res.get("tokens", []):
-                            if token.get("text"):
-                                if token.get("is_final"):
-                                    # Final tokens累积添加
-                                    all_final_tokens.append(token)
-                                    # 检查是否是翻译token
-                                    if token.get("translation_status") == "translation":
-                                        has_translation = True
-                                else:
-                                    # Non-final tokens每次重置
-                                    non_final_tokens.append(token)
-
-                        # 计算新增的final tokens（增量部分）
-                        new_final_tokens = all_final_tokens[self.last_sent_count:]
-
-                        if new_final_tokens:
-                            self._handle_osc_final_tokens(new_final_tokens)
-                            self._handle_external_ws_final_tokens(new_final_tokens)
-                        
-                        # Handle non-final tokens for external WebSocket sending
-                        if non_final_tokens:
-                            self._handle_external_ws_non_final_tokens(non_final_tokens)
-                        
-                        # 将新的final tokens写入日志
-                        if new_final_tokens and not self.is_paused:
-                            self.logger.write_to_log(new_final_tokens)
-                        
-                        # 如果有新的数据，发送给前端（暂停时也显示，只是不记录）
-                        if new_final_tokens or non_final_tokens:
-                            asyncio.run_coroutine_threadsafe(
-                                self.broadcast_callback({
-                                    "type": "update",
-                                    "final_tokens": new_final_tokens,  # 只发送新增的final tokens
-                                    "non_final_tokens": non_final_tokens,  # 当前所有non-final tokens
-                                    "has_translation": has_translation,  # 本次响应是否包含翻译
-                                    "endpoint_detected": res.get("endpoint_detected", False)  # 是否检测到endpoint
-                                }),
-                                loop
-                            )
-                            
-                            # 更新已发送的计数
-                            self.last_sent_count = len(all_final_tokens)
-
-                        # Session finished.
-                        if res.get("finished"):
-                            print("Session finished.")
-                            break
-
-                except ConnectionClosedOK:
-                    pass
-                except KeyboardInterrupt:
-                    print("\n⏹️ Interrupted by user.")
-                    if self.stop_event:
-                        self.stop_event.set()
-                except Exception as e:
-                    print(f"Error: {e}")
-        finally:
-            if self.stop_event:
-                self.stop_event.set()
-            self.stop_event = None
-            self.ws = None
-            self._stop_audio_streamer()
-            self.thread = None
+        await asyncio.sleep(max(SONIOX_HANDOVER_MAX_WAIT_SECONDS, SONIOX_HANDOVER_OVERLAP_MS / 1000))
+        await self._cut_over(handover, "no endpoint before timeout")
+
+    async def _cut_over(self, handover: _Handover, trigger: str) -> None:
+        """切换到新连接：旧连接不再接收音频并补齐剩余结果，新连接缓存的响应按切换点过滤后分发"""
+        if self._handover is not handover or handover.connection is None:
+            return
+        connection = handover.connection
+        fanout = self._fanout
+        if fanout is None or fanout.secondary is not connection.send_queue:
+            self._abort_handover(handover, "new connection stopped receiving audio")
+            return
+        self._handover = None
+
+        fanout.promote()
+        connection.cutover_ms = connection.send_queue.get_audio_ms(self.sample_rate)
+        previous = self._active_connection
+        self._active_connection = connection
+        if previous is not None:
+            previous.retiring = True
+            previous.send_queue.finish()
+            self.loop.call_later(RETIRING_CONNECTION_TIMEOUT_SECONDS, previous.reader_task.cancel)
+        self.handover_count += 1
+        if self._active_changed is not None:
+            self._active_changed.set()
+        print(
+            f"🔀 Soniox session handed over ({handover.reason}, {trigger}) "
+            f"after {time.monotonic() - handover.started_at:.1f} s"
+        )
+
+        # 依次分发切换前缓存的响应；分发过程中新到达的响应继续追加，清空后恢复直接分发
+        while True:
+            pending = connection.pending
+            if not pending:
+                connection.pending = None
+                break
+            connection.pending = []
+            for tokens, res in pending:
+                await self._dispatch_tokens(connection.filter_tokens(tokens), res, connection)
+
+    def _abort_handover(self, handover: _Handover, reason: str) -> None:
+        """交接失败：停止向新连接发送并关闭它，旧连接继续工作"""
+        if self._handover is not handover:
+            return
+        self._handover = None
+        self.handover_failures += 1
+        connection = handover.connection
+        if connection is not None:
+            if self._fanout is not None:
+                self._fanout.remove(connection.send_queue)
+            connection.send_queue.close()
+            if connection.reader_task is not asyncio.current_task():
+                connection.reader_task.cancel()
+        print(f"⚠️  Soniox handover failed ({reason}); keeping the current connection")
+
+    async def _close_connections(self) -> None:
+        """会话结束：取消交接并关闭所有连接"""
+        self._handover = None
+        task = self._handover_task
+        self._handover_task = None
+        if task is not None and not task.done():
+            task.cancel()
+        readers = []
+        for connection in list(self._connections):
+            connection.send_queue.close()
+            connection.reader_task.cancel()
+            readers.append(connection.reader_task)
+        if readers:
+            await asyncio.wait(readers)
+        self._connections.clear()
+        self._active_connection = None
+        self._active_changed = None
+        self._fanout = None
+
+    async def _handle_response(self, res: dict, connection: Optional[_SonioxConnection] = None) -> bool:
+        """处理一条 Soniox 响应并直接在事件循环中广播，返回 False 表示该连接应结束。
+
+        交接中的新连接在切换前只缓存响应；已被替换的旧连接只分发剩余的 final tokens。
+        """
+        # Error from server.
+        if res.get("error_code") is not None:
+            print(f"Error: {res['error_code']} - {res['error_message']}")
+            if connection is not None:
+                connection.error_code = res["error_code"]
+                connection.error_message = res.get("error_message")
+            return False
+
+        # 解析一次为 Token，之后各消费方直接读取属性，只在广播给前端时转换回字典
+        tokens = parse_tokens(res.get("tokens"))
+        if connection is not None:
+            pending = connection.pending
+            if pending is not None:
+                pending.append((tokens, res))
+                return not res.get("finished")
+            tokens = connection.filter_tokens(tokens)
+
+        if tokens:
+            self._observe_asr_lag(tokens, connection)
+        await self._dispatch_tokens(tokens, res, connection)
+
+        # 交接中：重叠时长已满足时，在旧连接的端点处切换
+        handover = self._handover
+        if (
+            handover is not None
+            and connection is not None
+            and connection is self._active_connection
+            and handover.ready_at is not None
+            and time.monotonic() >= handover.ready_at
+            and any(token.is_final and token.text == "<end>" for token in tokens)
+        ):
+            await self._cut_over(handover, "endpoint")
+
+        # Session finished.
+        if res.get("finished"):
+            if connection is not None:
+                connection.finished = True
+            if connection is None or not connection.retiring:
+                print("Session finished.")
+            return False
+        return True
+
+    async def _dispatch_tokens(
+        self, tokens: list[Token], res: dict, connection: Optional[_SonioxConnection] = None
+    ) -> None:
+        """把一条响应的 tokens 分发给 OSC、外部 WS、日志与前端。
+
+        每条响应中的 final tokens 即为新增部分，分发后不再保留，
+        长时间会话的内存占用不随 token 数量增长。
+        finalize 的确认标记 <fin> 不分发；确认结束了一句话时以 <end> 代替，OSC 与外部 WS 立即发送。
+        """
+        # Parse tokens from current response.
+        new_final_tokens: list[Token] = []  # 本次响应新增的final tokens
+        non_final_tokens: list[Token] = []
+        has_translation = False  # 标记本次响应是否包含翻译token
+        finalized = False
+
+        for token in tokens:
+            if token.text:
+                if token.is_final:
+                    if token.text == "<fin>":
+                        finalized = True
+                        continue
+                    new_final_tokens.append(token)
+                    # 检查是否是翻译token
+                    if token.translation_status == "translation":
+                        has_translation = True
+                else:
+                    # Non-final tokens每次重置
+                    non_final_tokens.append(token)
+
+        if new_final_tokens:
+            self._observe_final_lag(new_final_tokens, finalized, connection)
+            self._final_segment_open = new_final_tokens[-1].text != "<end>"
+        if finalized:
+            self._observe_finalize(connection)
+            if self._final_segment_open:
+                new_final_tokens.append(Token("<end>", is_final=True))
+                self._final_segment_open = False
+
+        if new_final_tokens:
+            self._handle_osc_final_tokens(new_final_tokens)
+            self._handle_external_ws_final_tokens(new_final_tokens)
+
+        # Handle non-final tokens for external WebSocket sending
+        if non_final_tokens:
+            self._handle_external_ws_non_final_tokens(non_final_tokens)
+
+        # 将新的final tokens写入日志
+        if new_final_tokens and not self.is_paused:
+            self.logger.write_to_log(new_final_tokens)
+
+        # 如果有新的数据，发送给前端（暂停时也显示，只是不记录）
+        if new_final_tokens or non_final_tokens:
+            # 更新已发送的计数
+            self.last_sent_count += len(new_final_tokens)
+            await self.broadcast_callback({
+                "type": "update",
+                "final_tokens": tokens_to_dicts(new_final_tokens),  # 只发送新增的final tokens
+                "non_final_tokens": tokens_to_dicts(non_final_tokens),  # 当前所有non-final tokens
+                "has_translation": has_translation,  # 本次响应是否包含翻译
+                "endpoint_detected": res.get("endpoint_detected", False)  # 是否检测到endpoint
+            })
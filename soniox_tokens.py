@@ -0,0 +1,107 @@
+"""Token 模块 - Soniox 识别结果 token 的紧凑表示（解析时构建一次，仅在输出 JSON 时转换为字典）"""
+
+from typing import Iterable, List, Optional
+
+# 说话人/语言/翻译状态的取值很少：解析时统一替换为此表中的同值对象（驻留），
+# 所有 token 共享同一个字符串，比较时也能走身份比较的快速路径
+_SHARED_VALUES: dict = {}
+_share = _SHARED_VALUES.setdefault
+_new = object.__new__
+
+
+class Token:
+    """Soniox 响应中的单个 token。
+
+    使用 __slots__，不为每个实例创建 __dict__；speaker/language/source_language/translation_status
+    在解析时驻留（见 _SHARED_VALUES）。会话、日志、OSC 与外部 WebSocket 直接读取属性，
+    只有向前端广播时才通过 to_dict() 转换为字典。
+    """
+
+    __slots__ = (
+        "text",
+        "is_final",
+        "speaker",
+        "language",
+        "source_language",
+        "translation_status",
+        "start_ms",
+        "end_ms",
+        "confidence",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        is_final: bool = False,
+        speaker: Optional[str] = None,
+        language: Optional[str] = None,
+        source_language: Optional[str] = None,
+        translation_status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        confidence: Optional[float] = None,
+    ):
+        self.text = text
+        self.is_final = is_final
+        self.speaker = speaker
+        self.language = language
+        self.source_language = source_language
+        self.translation_status = translation_status
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.confidence = confidence
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Token":
+        # 每个响应的每个 token 都会调用：直接写入 slots，跳过 __init__ 的参数处理
+        get = data.get
+        token = _new(cls)
+        token.text = get("text") or ""
+        token.is_final = get("is_final") is True
+        value = get("speaker")
+        token.speaker = _share(value, value)
+        value = get("language")
+        token.language = _share(value, value)
+        value = get("source_language")
+        token.source_language = _share(value, value)
+        value = get("translation_status")
+        token.translation_status = _share(value, value)
+        token.start_ms = get("start_ms")
+        token.end_ms = get("end_ms")
+        token.confidence = get("confidence")
+        return token
+
+    def to_dict(self) -> dict:
+        """转换为与 Soniox 原始格式一致的字典（省略值为 None 的字段）"""
+        data = {"text": self.text, "is_final": self.is_final}
+        if self.speaker is not None:
+            data["speaker"] = self.speaker
+        if self.language is not None:
+            data["language"] = self.language
+        if self.source_language is not None:
+            data["source_language"] = self.source_language
+        if self.translation_status is not None:
+            data["translation_status"] = self.translation_status
+        if self.start_ms is not None:
+            data["start_ms"] = self.start_ms
+        if self.end_ms is not None:
+            data["end_ms"] = self.end_ms
+        if self.confidence is not None:
+            data["confidence"] = self.confidence
+        return data
+
+    def __repr__(self) -> str:
+        return f"Token({self.text!r}, is_final={self.is_final}, speaker={self.speaker!r}, language={self.language!r})"
+
+
+def parse_tokens(raw_tokens: Optional[Iterable[dict]]) -> List[Token]:
+    """把响应中的 tokens 数组解析为 Token 列表"""
+    if not raw_tokens:
+        return []
+    from_json = Token.from_json
+    return [from_json(data) for data in raw_tokens]
+
+
+def tokens_to_dicts(tokens: Iterable[Token]) -> List[dict]:
+    """在输出 JSON 的边界把 Token 转换回字典"""
+    return [token.to_dict() for token in tokens]
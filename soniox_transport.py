@@ -0,0 +1,172 @@
+"""Soniox 传输模块 - 把音频发送线程的消息交给事件循环中的 WebSocket 发送任务"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Optional, Union
+
+from audio_pipeline import END_OF_AUDIO_MESSAGE, FINALIZE_MESSAGE
+
+
+class SonioxSendQueue:
+    """音频发送线程 -> 事件循环的发送队列。
+
+    对 AudioSender 提供与同步 WebSocket 相同的 send()/close() 接口：
+    send() 复制数据后通过 call_soon_threadsafe 放入 asyncio 队列（AudioSender 会立即回收帧），
+    由事件循环中的 run() 任务依次 await ws.send()。
+
+    排队数据超过 max_pending_bytes 时 send() 阻塞调用方，与同步 WebSocket 写入阻塞时一样，
+    网络卡顿时的积压留在采集端的环形缓冲区中（按原有策略丢弃最旧的音频），而不是在这里无限增长。
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending_bytes: int = 64000):
+        self._loop = loop
+        self.max_pending_bytes = int(max_pending_bytes)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._condition = threading.Condition()
+        self._pending_bytes = 0
+        self._closed = False
+        self.messages_sent = 0
+        self.audio_bytes = 0  # 已排队的音频字节数（对应该连接上 Soniox 的音频时间轴）
+        self.end_of_audio_sent = False  # 输入已结束（文件回放完毕等），之后的 finished 属于正常结束
+        # 已发送但尚未收到 <fin> 的 finalize 消息的排队时间（用于统计确认延迟）
+        self.finalize_sent_at: deque = deque()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def send(self, data: Union[str, bytes, memoryview]) -> None:
+        """由发送线程调用：排队一条消息（文本或二进制），连接已关闭时抛出 ConnectionError"""
+        payload = data if isinstance(data, str) else bytes(data)
+        size = len(payload)
+        with self._condition:
+            while self._pending_bytes >= self.max_pending_bytes and not self._closed:
+                self._condition.wait(0.5)
+            if self._closed:
+                raise ConnectionError("Soniox connection is closed")
+            self._pending_bytes += size
+            if not isinstance(payload, str):
+                self.audio_bytes += size
+            elif payload == END_OF_AUDIO_MESSAGE:
+                self.end_of_audio_sent = True
+            elif payload == FINALIZE_MESSAGE:
+                self.finalize_sent_at.append(time.monotonic())
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (payload, size))
+        except RuntimeError:
+            # 事件循环已关闭
+            self.close()
+            raise ConnectionError("Soniox connection is closed")
+
+    def close(self) -> None:
+        """关闭队列：唤醒阻塞的发送方，并让发送任务退出（可在任意线程调用）"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (None, 0))
+        except RuntimeError:
+            pass
+
+    def finish(self) -> None:
+        """不再接收新的音频：发送音频结束消息后关闭（不阻塞，可在事件循环线程中调用）。
+
+        Soniox 收到音频结束消息后会把剩余音频全部确认为 final，再返回 finished 响应。
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (END_OF_AUDIO_MESSAGE, 0))
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (None, 0))
+        except RuntimeError:
+            pass
+
+    def get_audio_ms(self, sample_rate: int) -> float:
+        """已发送到该连接的音频时长（毫秒，16-bit 单声道）"""
+        return self.audio_bytes / 2 * 1000 / sample_rate
+
+    async def run(self, ws) -> None:
+        """发送任务：按顺序把排队的消息写入 WebSocket，直到 close() 或发送失败"""
+        try:
+            while True:
+                payload, size = await self._queue.get()
+                if payload is None:
+                    return
+                await ws.send(payload)
+                self.messages_sent += 1
+                with self._condition:
+                    self._pending_bytes -= size
+                    self._condition.notify_all()
+        except asyncio.CancelledError:
+            raise
+        except Exception as send_error:
+            print(f"Error sending to Soniox: {send_error}")
+        finally:
+            self.close()
+
+    def get_pending_bytes(self) -> int:
+        with self._condition:
+            return self._pending_bytes
+
+
+class SonioxAudioFanout:
+    """音频发送线程 -> 一个或两个 Soniox 连接。
+
+    平时只有 primary；会话交接期间新连接作为 secondary 同时接收同样的音频，
+    切换时 promote() 让新连接成为 primary，旧连接不再接收音频。
+    AudioSender 始终持有同一个对象，交接不需要 detach/attach 采集。
+    """
+
+    def __init__(self, primary: SonioxSendQueue):
+        self.primary: Optional[SonioxSendQueue] = primary
+        self.secondary: Optional[SonioxSendQueue] = None
+
+    def send(self, data: Union[str, bytes, memoryview]) -> None:
+        """发送到所有连接；只有全部连接都已关闭时才抛出 ConnectionError"""
+        delivered = False
+        for target in (self.primary, self.secondary):
+            if target is None:
+                continue
+            try:
+                target.send(data)
+                delivered = True
+            except ConnectionError:
+                pass
+        if not delivered:
+            raise ConnectionError("Soniox connection is closed")
+
+    def add(self, queue: SonioxSendQueue) -> None:
+        """开始把音频同时发送到交接中的新连接"""
+        self.secondary = queue
+
+    def remove(self, queue: SonioxSendQueue) -> None:
+        """交接失败：停止向该连接发送"""
+        if self.secondary is queue:
+            self.secondary = None
+
+    def promote(self) -> Optional[SonioxSendQueue]:
+        """新连接成为 primary，返回不再接收音频的旧连接"""
+        previous = self.primary
+        self.primary = self.secondary
+        self.secondary = None
+        return previous
+
+    def close(self) -> None:
+        for target in (self.primary, self.secondary):
+            if target is not None:
+                target.close()
+
+
+def in_loop_thread(loop: Optional[asyncio.AbstractEventLoop]) -> bool:
+    """当前线程是否正在运行该事件循环"""
+    try:
+        return loop is not None and asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
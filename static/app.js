@@ -206,6 +206,7 @@ let shouldReconnect = true;  // 是否应该自动重连
 let isRestarting = false;    // 是否正在重启中
 let isPaused = false;        // 是否暂停中
 let audioSource = 'system';  // 音频输入来源
+const AUDIO_SOURCES = ['system', 'microphone', 'mixed'];  // 点击按钮时按此顺序循环
 
 // 初始化按钮文本
 updateSegmentModeButton();
@@ -847,6 +848,9 @@ function updateAudioSourceButton() {
 
   if (audioSource === 'microphone') {
     audioSourceIcon.textContent = '🎤';
+    audioSourceButton.title = t('audio_to_mixed');
+  } else if (audioSource === 'mixed') {
+    audioSourceIcon.textContent = '🎛️';
     audioSourceButton.title = t('audio_to_system');
   } else {
     audioSourceIcon.textContent = '🔊';
@@ -857,7 +861,7 @@ function updateAudioSourceButton() {
 async function fetchInitialAudioSource() {
   try {
     const stored = localStorage.getItem('audioSource');
-    if (stored === 'system' || stored === 'microphone') {
+    if (AUDIO_SOURCES.includes(stored)) {
       audioSource = stored;
       updateAudioSourceButton();
     }
@@ -872,7 +876,7 @@ async function fetchInitialAudioSource() {
     }
 
     const data = await response.json();
-    if (data && (data.source === 'system' || data.source === 'microphone')) {
+    if (data && AUDIO_SOURCES.includes(data.source)) {
       audioSource = data.source;
       updateAudioSourceButton();
       try {
@@ -1019,6 +1023,46 @@ async function restartRecognition({ auto = false, targetLang = null } = {}) {
   const manualFailureHtml = `<div style="text-align: center; padding: 40px; color: #ef4444;">${escapeHtml(t('restart_failed_try_again'))}</div>`;
 
   try {
+    const lang = (targetLang || currentTranslationTargetLang || '').toString().trim().toLowerCase();
+
+    // 手动重启/切换语言：服务器能以 make-before-break 方式交接时，保留当前字幕与 WebSocket 连接
+    if (!auto) {
+      const payload = { auto: false, handover: true };
+      if (lang) {
+        payload.target_lang = lang;
+      }
+
+      const response = await fetch('/restart', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(payload)
+      });
+
+      if (!response.ok) {
+        subtitleContainer.innerHTML = manualFailureHtml;
+        throw new Error(`Restart failed with status ${response.status}`);
+      }
+
+      const result = await response.json().catch(() => ({}));
+      if (result.mode === 'handover') {
+        console.log('Recognition handed over to a new session');
+        shouldReconnect = true;
+        return true;
+      }
+
+      // 服务器已完成重启（已清空字幕并断开所有客户端）：清空本地状态后重新连接
+      ws = null;
+      clearSubtitleState();
+      subtitleContainer.innerHTML = manualStatusHtml;
+      console.log('Recognition restarted successfully');
+
+      await delay(1500);
+
+      shouldReconnect = true;
+      connect();
+      return true;
+    }
+
     if (ws) {
       console.log('Closing old WebSocket connection...');
       try {
@@ -1031,14 +1075,9 @@ async function restartRecognition({ auto = false, targetLang = null } = {}) {
 
     clearSubtitleState();
 
-    if (!auto) {
-      subtitleContainer.innerHTML = manualStatusHtml;
-    }
-
     await delay(500);
 
-    const payload = { auto: !!auto };
-    const lang = (targetLang || currentTranslationTargetLang || '').toString().trim().toLowerCase();
+    const payload = { auto: true };
     if (lang) {
       payload.target_lang = lang;
     }
@@ -1050,13 +1089,10 @@ async function restartRecognition({ auto = false, targetLang = null } = {}) {
     });
 
     if (!response.ok) {
-      if (!auto) {
-        subtitleContainer.innerHTML = manualFailureHtml;
-      }
       throw new Error(`Restart failed with status ${response.status}`);
     }
 
-    console.log(auto ? 'Auto restart: new recognition session requested.' : 'Recognition restarted successfully');
+    console.log('Auto restart: new recognition session requested.');
 
     await delay(1500);
 
@@ -1089,7 +1125,7 @@ restartButton.addEventListener('click', () => {
 });
 
 // 暂停/恢复识别功能
-pauseButton.addEventListener('click', async () => {
+pauseButton.addEventListener('click', async (event) => {
   if (lockManualControls) {
     return;
   }
@@ -1104,8 +1140,13 @@ pauseButton.addEventListener('click', async () => {
         console.log('Recognition resumed');
       }
     } else {
-      // 暂停识别
-      const response = await fetch('/pause', { method: 'POST' });
+      // 暂停识别：默认保持连接（soft），Shift+点击断开连接（hard，适合长时间休息）
+      const payload = event.shiftKey ? { mode: 'hard' } : {};
+      const response = await fetch('/pause', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(payload)
+      });
       if (response.ok) {
         isPaused = true;
         pauseIcon.textContent = '▶️';
@@ -1123,7 +1164,7 @@ if (audioSourceButton) {
     if (lockManualControls) {
       return;
     }
-    const nextSource = audioSource === 'system' ? 'microphone' : 'system';
+    const nextSource = AUDIO_SOURCES[(AUDIO_SOURCES.indexOf(audioSource) + 1) % AUDIO_SOURCES.length];
 
     try {
       const response = await fetch('/audio-source', {
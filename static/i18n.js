@@ -13,6 +13,7 @@
             resume: 'Resume recognition',
             audio_to_system: 'Switch to system audio capture',
             audio_to_mic: 'Switch to microphone capture',
+            audio_to_mixed: 'Switch to microphone + system audio mix',
             segment_translation: 'Segment by translation (click to switch to endpoint mode)',
             segment_endpoint: 'Segment by endpoint (click to switch to translation mode)',
             display_both: 'Show both original and translation',
@@ -53,6 +54,7 @@
             resume: '继续识别',
             audio_to_system: '切换到系统音频采集',
             audio_to_mic: '切换到麦克风采集',
+            audio_to_mixed: '切换到麦克风与系统音频混合采集',
             segment_translation: '按翻译分段（点击切换到端点分段）',
             segment_endpoint: '按端点分段（点击切换到翻译分段）',
             display_both: '显示原文和翻译',
@@ -92,6 +94,7 @@
             resume: '認識を再開',
             audio_to_system: 'システム音声キャプチャに切り替え',
             audio_to_mic: 'マイクキャプチャに切り替え',
+            audio_to_mixed: 'マイクとシステム音声のミックスに切り替え',
             segment_translation: '翻訳で分割（クリックでエンドポイント分割へ）',
             segment_endpoint: 'エンドポイントで分割（クリックで翻訳分割へ）',
             display_both: '原文と翻訳を表示',
@@ -132,6 +135,7 @@
             resume: '인식 재개',
             audio_to_system: '시스템 오디오 캡처로 전환',
             audio_to_mic: '마이크 캡처로 전환',
+            audio_to_mixed: '마이크 + 시스템 오디오 믹스로 전환',
             segment_translation: '번역 기준 분할(클릭하여 엔드포인트 분할)',
             segment_endpoint: '엔드포인트 기준 분할(클릭하여 번역 분할)',
             display_both: '원문+번역 표시',
@@ -172,6 +176,7 @@
             resume: 'Возобновить распознавание',
             audio_to_system: 'Переключить на захват системного звука',
             audio_to_mic: 'Переключить на захват микрофона',
+            audio_to_mixed: 'Переключить на смешанный захват микрофона и системного звука',
             segment_translation: 'Сегментация по переводу (нажмите для сегментации по endpoint)',
             segment_endpoint: 'Сегментация по endpoint (нажмите для сегментации по переводу)',
             display_both: 'Показывать оригинал и перевод',
@@ -212,6 +217,7 @@
             resume: 'Reanudar reconocimiento',
             audio_to_system: 'Cambiar a captura de audio del sistema',
             audio_to_mic: 'Cambiar a captura de micrófono',
+            audio_to_mixed: 'Cambiar a mezcla de micrófono y audio del sistema',
             segment_translation: 'Segmentar por traducción (clic para segmentar por endpoint)',
             segment_endpoint: 'Segmentar por endpoint (clic para segmentar por traducción)',
             display_both: 'Mostrar original y traducción',
@@ -252,6 +258,7 @@
             resume: 'Retomar reconhecimento',
             audio_to_system: 'Alternar para captura de áudio do sistema',
             audio_to_mic: 'Alternar para captura do microfone',
+            audio_to_mixed: 'Alternar para mixagem de microfone e áudio do sistema',
             segment_translation: 'Segmentar por tradução (clique para segmentar por endpoint)',
             segment_endpoint: 'Segmentar por endpoint (clique para segmentar por tradução)',
             display_both: 'Mostrar original e tradução',
@@ -0,0 +1,48 @@
+"""pytest 公共配置：仓库根目录加入导入路径，导入会话/配置模块前提供占位 API key，以及会话相关的 fixture"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# config 在导入时要求提供 API key 或临时 key 地址；测试只连接本地模拟服务器
+os.environ.setdefault("SONIOX_API_KEY", "test")
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    """覆盖会话模块在导入时读取的配置常量（测试结束后恢复），例如 configure(AUDIO_VAD_ENABLED=False)"""
+    import soniox_session
+
+    def apply(**values):
+        for name, value in values.items():
+            if not hasattr(soniox_session, name):
+                raise AttributeError(f"soniox_session has no setting {name}")
+            monkeypatch.setattr(soniox_session, name, value)
+
+    return apply
+
+
+@pytest.fixture
+def make_session():
+    """创建 SonioxSession：日志写入 os.devnull，未指定广播回调时广播为空操作"""
+    from logger import TranscriptLogger
+    from soniox_session import SonioxSession
+
+    loggers = []
+
+    async def discard(data: dict) -> None:
+        return None
+
+    def create(broadcast=None):
+        logger = TranscriptLogger()
+        logger.log_file = open(os.devnull, "w", encoding="utf-8")
+        loggers.append(logger)
+        return SonioxSession(logger, broadcast or discard)
+
+    yield create
+    for logger in loggers:
+        logger.log_file.close()
@@ -0,0 +1,69 @@
+"""自适应帧长（未启用 VAD 门控）：静音期间发送最大帧，检测到语音后切换为最小帧，hangover 结束后恢复"""
+import threading
+import time
+
+import numpy as np
+
+from audio_pipeline import AudioRingBuffer, AudioSender
+
+SAMPLE_RATE = 16000
+MAX_FRAME = 3840  # 240 ms
+MIN_FRAME = 640  # 40 ms
+
+
+class _Sink:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frames = []
+
+    def send(self, data) -> None:
+        if not isinstance(data, str):
+            with self.lock:
+                self.frames.append(len(data) // 2)
+
+    def wait_for(self, samples: int, timeout: float = 2.0) -> list:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if sum(self.frames) >= samples:
+                    return list(self.frames)
+            time.sleep(0.01)
+        raise AssertionError(f"sent {sum(self.frames)} of {samples} samples")
+
+
+def _speech(samples: int) -> np.ndarray:
+    t = np.arange(samples) / SAMPLE_RATE
+    return (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+
+
+def test_frame_size_follows_speech_activity():
+    sink = _Sink()
+    ring = AudioRingBuffer(SAMPLE_RATE * 10)
+    sender = AudioSender(
+        sink,
+        ring,
+        frame_samples=MAX_FRAME,
+        sample_rate=SAMPLE_RATE,
+        min_frame_samples=MIN_FRAME,
+    )
+    sender.start()
+    try:
+        ring.write(np.zeros(MAX_FRAME * 2, dtype=np.int16))
+        sent = sink.wait_for(MAX_FRAME * 2)
+        assert sent == [MAX_FRAME, MAX_FRAME]
+
+        # 第一帧语音仍按最大帧读取，检测到语音后切换为最小帧
+        ring.write(_speech(MAX_FRAME * 2))
+        sent = sink.wait_for(MAX_FRAME * 4)
+        assert sent[2] == MAX_FRAME
+        assert sent[3:] == [MIN_FRAME] * (MAX_FRAME // MIN_FRAME)
+
+        # 静音：hangover（默认 600 ms，保持 hangover + 1 个样本，即 16 个最小帧）期间仍用最小帧，之后恢复最大帧
+        hangover_frames = 16
+        ring.write(np.zeros(MIN_FRAME * hangover_frames + MAX_FRAME, dtype=np.int16))
+        sent = sink.wait_for(MAX_FRAME * 5 + MIN_FRAME * hangover_frames)
+        tail = sent[3 + MAX_FRAME // MIN_FRAME:]
+        assert tail == [MIN_FRAME] * hangover_frames + [MAX_FRAME]
+        assert sender.get_stats()["adaptive_frames"]
+    finally:
+        sender.stop()
@@ -0,0 +1,63 @@
+"""混音：麦克风有人声时闪避系统音频，静音后恢复，系统音频不足时补零"""
+import numpy as np
+import pytest
+
+from audio_mixer import AudioMixer, MixConfig
+from audio_pipeline import AudioRingBuffer
+
+SAMPLE_RATE = 16000
+BLOCK = 320  # 20 ms
+
+
+def _system_ring(blocks: int) -> AudioRingBuffer:
+    ring = AudioRingBuffer(BLOCK * blocks, dtype=np.float32)
+    ring.write(np.full(BLOCK * blocks, 0.5, dtype=np.float32))
+    return ring
+
+
+def _voice() -> np.ndarray:
+    t = np.arange(BLOCK) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def test_system_audio_ducked_while_mic_speaks():
+    config = MixConfig(ducking_db=-12.0, attack_ms=0.0, release_ms=0.0)
+    mixer = AudioMixer(SAMPLE_RATE, BLOCK, config)
+    ring = _system_ring(5)
+    silence = np.zeros(BLOCK, dtype=np.float32)
+
+    assert mixer.mix(silence, ring) == pytest.approx(np.full(BLOCK, 0.5))
+
+    # 增益变化在下一块内过渡完成，之后保持闪避
+    voice = _voice()
+    mixer.mix(voice, ring)
+    mixed = mixer.mix(voice, ring).copy()
+    ducked = 0.5 * 10 ** (-12.0 / 20)
+    assert mixed - voice == pytest.approx(np.full(BLOCK, ducked), abs=1e-6)
+    assert mixer.get_stats()["mix_duck_gain_db"] == pytest.approx(-12.0)
+
+    mixer.mix(silence, ring)
+    assert mixer.mix(silence, ring) == pytest.approx(np.full(BLOCK, 0.5))
+    assert mixer.get_stats()["mix_duck_gain_db"] == pytest.approx(0.0)
+
+
+def test_ducking_ramps_within_block():
+    config = MixConfig(ducking_db=-12.0, attack_ms=20.0)
+    mixer = AudioMixer(SAMPLE_RATE, BLOCK, config)
+    voice = _voice()
+
+    system = mixer.mix(voice, _system_ring(1)) - voice
+    # 增益在块内从 1 单调下降，没有突变
+    assert system[0] == pytest.approx(0.5)
+    assert np.all(np.diff(system) <= 1e-7)
+    assert 0.5 * 10 ** (-12.0 / 20) < system[-1] < 0.5
+
+
+def test_missing_system_audio_is_zero_padded():
+    mixer = AudioMixer(SAMPLE_RATE, BLOCK, MixConfig())
+    ring = AudioRingBuffer(BLOCK, dtype=np.float32)
+    ring.write(np.full(BLOCK // 2, 0.5, dtype=np.float32))
+
+    mixed = mixer.mix(np.zeros(BLOCK, dtype=np.float32), ring)
+    assert mixed[BLOCK // 2:] == pytest.approx(np.zeros(BLOCK // 2))
+    assert mixer.get_stats()["mix_system_padded_seconds"] == pytest.approx(BLOCK / 2 / SAMPLE_RATE)
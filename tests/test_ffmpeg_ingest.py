@@ -0,0 +1,101 @@
+"""URL 拉流：用模拟的 ffmpeg 脚本检查有限长度输入只播放一次并通知 Soniox 音频结束，直播输入（含 HTTP 地址）断开后重新拉流"""
+import os
+import stat
+import sys
+import threading
+import time
+
+import pytest
+
+from ffmpeg_audio_streamer import FfmpegAudioStreamer
+
+SAMPLE_RATE = 16000
+STUB_SECONDS = 0.5
+
+
+@pytest.fixture
+def stub_ffmpeg(tmp_path):
+    """忽略参数、输出 STUB_SECONDS 的 PCM 后以退出码 0 结束的 ffmpeg；每次启动追加一行到 runs 文件"""
+    runs = tmp_path / "runs"
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"open({str(runs)!r}, 'a').write('run\\n')\n"
+        f"sys.stdout.buffer.write(b'\\x10\\x00' * {int(SAMPLE_RATE * STUB_SECONDS)})\n"
+        "sys.stdout.flush()\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return str(script), runs
+
+
+class _Sink:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.audio_bytes = 0
+        self.end_of_audio = 0
+
+    def send(self, data) -> None:
+        with self.lock:
+            if isinstance(data, str):
+                if data == "":
+                    self.end_of_audio += 1
+            else:
+                self.audio_bytes += len(data)
+
+
+def _stream(input_url: str, ffmpeg_path: str, seconds: float, input_kind: str = "auto") -> tuple:
+    sink = _Sink()
+    streamer = FfmpegAudioStreamer(
+        sink,
+        input_url=input_url,
+        ffmpeg_path=ffmpeg_path,
+        sample_rate=SAMPLE_RATE,
+        chunk_size=1280,
+        input_kind=input_kind,
+    )
+    streamer.start()
+    try:
+        time.sleep(seconds)
+        return sink, streamer, streamer.get_stats()
+    finally:
+        streamer.stop()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="stub ffmpeg is a shebang script")
+def test_finite_input_finishes_once(stub_ffmpeg, tmp_path):
+    ffmpeg_path, runs = stub_ffmpeg
+    media = tmp_path / "speech.wav"
+    media.write_bytes(b"")
+
+    sink, streamer, stats = _stream(str(media), ffmpeg_path, 2.0)
+
+    assert streamer.finished
+    assert stats["ffmpeg_restarts"] == 0
+    assert runs.read_text().count("run") == 1
+    assert sink.end_of_audio == 1
+    assert sink.audio_bytes == int(SAMPLE_RATE * STUB_SECONDS) * 2
+
+
+@pytest.mark.skipif(os.name == "nt", reason="stub ffmpeg is a shebang script")
+@pytest.mark.parametrize("input_url", ["rtmp://127.0.0.1/live/stream", "http://127.0.0.1:8000/radio"])
+def test_live_input_reconnects_after_exit(stub_ffmpeg, input_url):
+    ffmpeg_path, runs = stub_ffmpeg
+
+    sink, streamer, stats = _stream(input_url, ffmpeg_path, 2.0)
+
+    assert not streamer.finished
+    assert stats["ffmpeg_restarts"] >= 1
+    assert runs.read_text().count("run") >= 2
+    assert sink.end_of_audio == 0
+
+
+@pytest.mark.skipif(os.name == "nt", reason="stub ffmpeg is a shebang script")
+def test_http_input_marked_finite_finishes(stub_ffmpeg):
+    ffmpeg_path, runs = stub_ffmpeg
+
+    sink, streamer, stats = _stream("http://127.0.0.1:8000/speech.mp3", ffmpeg_path, 2.0, input_kind="finite")
+
+    assert streamer.finished
+    assert runs.read_text().count("run") == 1
+    assert sink.end_of_audio == 1
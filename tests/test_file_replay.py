@@ -0,0 +1,44 @@
+"""录音文件回放：解析 WAV 文件头，格式错误时抛出 ValueError（回放线程据此报告错误而不是崩溃）"""
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from file_audio_streamer import open_pcm_file
+
+
+def _wav_with_fmt(path, fmt: bytes) -> str:
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", 4) + b"\0" * 4
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+    return str(path)
+
+
+def test_reads_wav_samples(tmp_path):
+    path = tmp_path / "speech.wav"
+    samples = (np.arange(200, dtype=np.int16) * 100).reshape(-1, 2)
+    with wave.open(str(path), "wb") as output:
+        output.setnchannels(2)
+        output.setsampwidth(2)
+        output.setframerate(48000)
+        output.writeframes(samples.tobytes())
+
+    data, rate = open_pcm_file(str(path))
+
+    assert rate == 48000
+    assert np.array_equal(data, samples)
+
+
+@pytest.mark.parametrize(
+    "fmt",
+    [
+        struct.pack("<HHI", 1, 1, 16000),  # fmt 块不足 16 字节
+        struct.pack("<HHIIHH", 1, 0, 16000, 32000, 2, 16),  # 声道数为 0
+        struct.pack("<HHIIHH", 3, 1, 16000, 64000, 4, 32),  # float32
+    ],
+)
+def test_malformed_fmt_raises_value_error(tmp_path, fmt):
+    path = _wav_with_fmt(tmp_path / "bad.wav", fmt)
+
+    with pytest.raises(ValueError):
+        open_pcm_file(path)
@@ -0,0 +1,35 @@
+"""手动确认（finalize）：静音/句尾静音时 final 文本早于端点检测送达，<fin> 标记不被分发"""
+import asyncio
+import statistics
+
+import pytest
+from websockets.asyncio.server import serve
+
+from tools.benchmark_finalize import FakeSoniox, run_scenario, scenario_settings, write_speech
+
+ENDPOINT_MS = 1000.0
+SILENCE_MS = 300
+UTTERANCES = 2
+
+
+@pytest.mark.parametrize("scenario", ["mute", "silence"])
+def test_finalize_delivers_final_text_before_endpoint(scenario, configure, tmp_path):
+    wav_path = str(tmp_path / "speech.wav")
+    write_speech(wav_path, UTTERANCES)
+    fake = FakeSoniox(ENDPOINT_MS)
+
+    async def run():
+        async with serve(fake.handler, "127.0.0.1", 0) as server:
+            url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            configure(**scenario_settings(scenario, url, wav_path, SILENCE_MS))
+            return await run_scenario(scenario, fake)
+
+    result = asyncio.run(run())
+
+    assert result["utterances"] == UTTERANCES
+    assert len(result["latencies"]) == UTTERANCES, "every utterance should reach the external WebSocket"
+    assert result["finalize_messages"] >= UTTERANCES
+    assert not result["leaked"], "<fin> marker must not be dispatched"
+    # 端点检测需要 ENDPOINT_MS 的静音；finalize 至少快一半
+    assert statistics.mean(result["latencies"]) < ENDPOINT_MS / 2
+    assert result["stats"]["soniox_finalize_latency_ms"] is not None
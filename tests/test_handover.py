@@ -0,0 +1,111 @@
+"""交接：新连接按切换点（cutover_ms）过滤 tokens，旧连接只补齐 final tokens，两条连接的结果不重复"""
+import asyncio
+
+from soniox_session import _Handover, _SonioxConnection
+from soniox_tokens import parse_tokens
+
+
+def _tokens(*items) -> list:
+    """(文本, 是否 final, start_ms) -> Token 列表"""
+    raw = []
+    for text, is_final, start_ms in items:
+        data = {"text": text, "is_final": is_final}
+        if start_ms is not None:
+            data["start_ms"] = start_ms
+            data["end_ms"] = start_ms + 100
+        else:
+            data["translation_status"] = "translation"
+        raw.append(data)
+    return parse_tokens(raw)
+
+
+def _texts(tokens: list) -> list:
+    return [token.text for token in tokens]
+
+
+class _SendQueue:
+    def __init__(self, audio_ms: float = 0.0):
+        self.audio_ms = audio_ms
+        self.finished = False
+
+    def get_audio_ms(self, sample_rate: int) -> float:
+        return self.audio_ms
+
+    def finish(self) -> None:
+        self.finished = True
+
+
+class _Fanout:
+    def __init__(self, secondary):
+        self.secondary = secondary
+        self.promoted = False
+
+    def promote(self) -> None:
+        self.promoted = True
+
+
+class _ReaderTask:
+    def cancel(self) -> None:
+        pass
+
+
+def test_tokens_before_cutover_are_dropped():
+    connection = _SonioxConnection(None, _SendQueue(), "", candidate=True)
+    connection.cutover_ms = 1000
+
+    tokens = _tokens(
+        ("old", True, 400),
+        ("旧", True, None),  # 译文没有时间戳，跟随前面的原文
+        ("new", True, 1000),
+        ("新", True, None),
+        ("<end>", True, None),
+        ("early", False, 900),
+        ("late", False, 1200),
+    )
+    assert _texts(connection.filter_tokens(tokens)) == ["new", "新", "<end>", "late"]
+
+
+def test_retiring_connection_keeps_only_final_tokens():
+    connection = _SonioxConnection(None, _SendQueue(), "")
+    connection.retiring = True
+
+    tokens = _tokens(("done", True, 100), ("guess", False, 200))
+    assert _texts(connection.filter_tokens(tokens)) == ["done"]
+
+
+def test_cut_over_dispatches_buffered_responses_once(make_session):
+    session = make_session()
+    old = _SonioxConnection(None, _SendQueue(), "")
+    old.reader_task = _ReaderTask()
+    new = _SonioxConnection(None, _SendQueue(audio_ms=1000), "", candidate=True)
+    # 交接期间新连接收到的响应：切换点之前的部分已由旧连接输出
+    new.pending.append((_tokens(("hello", True, 200), ("world", True, 600)), {}))
+    new.pending.append((_tokens(("again", True, 1100), ("typing", False, 1300)), {}))
+
+    dispatched = []
+
+    async def record(tokens, res, connection=None):
+        dispatched.append((connection, _texts(tokens)))
+
+    async def run():
+        session.loop = asyncio.get_running_loop()
+        session._dispatch_tokens = record
+        session._active_connection = old
+        session._connections = {old, new}
+        fanout = _Fanout(new.send_queue)
+        session._fanout = fanout
+        handover = _Handover("test", "")
+        handover.connection = new
+        session._handover = handover
+        await session._cut_over(handover, "endpoint")
+        return fanout
+
+    fanout = asyncio.run(run())
+
+    assert fanout.promoted
+    assert session._active_connection is new
+    assert old.retiring and old.send_queue.finished
+    assert new.cutover_ms == 1000
+    assert new.pending is None
+    assert dispatched == [(new, []), (new, ["again", "typing"])]
+    assert session.handover_count == 1
@@ -0,0 +1,140 @@
+"""静音门控：用本地 OSC 发送方模拟 VRChat 的 MuteSelf，静音期间不再发送麦克风音频
+
+启动 osc_manager 的 OSC 服务器（127.0.0.1:9001），把 MuteSelf 交给 SonioxSession.handle_mute_change()，
+AudioStreamer 使用合成的录音设备（麦克风为正弦波，系统音频为静音）按实时速度采集，发送端只记录收到的数据。
+"""
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from pythonosc import udp_client
+
+from audio_capture import AudioStreamer
+from osc_manager import osc_manager
+
+SAMPLE_RATE = 16000
+MIC_AMPLITUDE = 0.3
+MUTE_SECONDS = 1.5
+TAIL_MS = 200
+
+
+class _SyntheticRecorder:
+    """按实时速度产出音频块的录音设备（麦克风为 440 Hz 正弦波，系统音频为静音）"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.position = 0
+        self.next_at = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def record(self, numframes: int) -> np.ndarray:
+        self.next_at += numframes / SAMPLE_RATE
+        delay = self.next_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        if self.source == "system":
+            return np.zeros((numframes, 1), dtype=np.float32)
+        index = np.arange(self.position, self.position + numframes)
+        self.position += numframes
+        return (np.sin(2 * np.pi * 440 * index / SAMPLE_RATE) * MIC_AMPLITUDE).astype(np.float32)[:, None]
+
+
+class _SyntheticStreamer(AudioStreamer):
+    def _create_recorder(self, source, input_device_id, output_device_id):
+        return _SyntheticRecorder(source)
+
+
+class _Sink:
+    """代替 Soniox 连接：记录每条消息的时间、类型与音频电平"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events: list = []  # (时刻, "audio"/"keepalive", 样本数, 峰值)
+
+    def send(self, data) -> None:
+        now = time.monotonic()
+        with self.lock:
+            if isinstance(data, str):
+                self.events.append((now, "keepalive", 0, 0))
+            else:
+                samples = np.frombuffer(bytes(data), dtype=np.int16)
+                peak = int(np.abs(samples).max()) if samples.size else 0
+                self.events.append((now, "audio", samples.shape[0], peak))
+
+    def between(self, start: float, end: float) -> list:
+        with self.lock:
+            return [event for event in self.events if start <= event[0] < end]
+
+
+@pytest.fixture
+def osc_session(make_session, configure):
+    """接收 MuteSelf 的会话与向本地 OSC 服务器发送消息的客户端"""
+    configure(AUDIO_MUTE_GATE_ENABLED=True, AUDIO_MUTE_GATE_TAIL_MS=TAIL_MS, SONIOX_FINALIZE_ON_MUTE=False)
+    session = make_session()
+    osc_manager.set_mute_callback(session.handle_mute_change)
+    yield session, udp_client.SimpleUDPClient("127.0.0.1", 9001)
+    osc_manager.clear_mute_callback()
+
+
+async def _mute_cycle(source: str, session, osc) -> tuple:
+    """采集 source，静音 MUTE_SECONDS 后取消静音，返回 (发送端记录, 静音时刻, 取消静音时刻, 统计)"""
+    try:
+        await osc_manager.start_server()
+    except OSError as error:
+        pytest.skip(f"cannot listen for OSC on port 9001: {error}")
+
+    sink = _Sink()
+    streamer = _SyntheticStreamer(
+        sink,
+        initial_source=source,
+        sample_rate=SAMPLE_RATE,
+        chunk_size=SAMPLE_RATE * 80 // 1000,
+        keepalive_interval=0.3,
+    )
+    with session.audio_lock:
+        session.audio_streamer = streamer
+    streamer.start()
+    try:
+        await asyncio.sleep(0.6)
+        osc.send_message("/avatar/parameters/MuteSelf", True)
+        muted_at = time.monotonic()
+        await asyncio.sleep(MUTE_SECONDS)
+        osc.send_message("/avatar/parameters/MuteSelf", False)
+        unmuted_at = time.monotonic()
+        await asyncio.sleep(0.8)
+        stats = streamer.get_stats()
+    finally:
+        streamer.stop()
+        with session.audio_lock:
+            session.audio_streamer = None
+        await osc_manager.stop_server()
+    return sink, muted_at, unmuted_at, stats
+
+
+@pytest.mark.parametrize("source", ["microphone", "mixed"])
+def test_mute_self_gates_microphone(source, osc_session):
+    session, osc = osc_session
+    sink, muted_at, unmuted_at, stats = asyncio.run(_mute_cycle(source, session, osc))
+
+    # 尾音与最后一帧在发送线程中的排队留出余量
+    muted = sink.between(muted_at + TAIL_MS / 1000 + 0.25, unmuted_at)
+    muted_audio = [event for event in muted if event[1] == "audio"]
+    resumed = sink.between(unmuted_at + 0.25, unmuted_at + 0.8)
+    resumed_peak = max((event[3] for event in resumed if event[1] == "audio"), default=0)
+
+    if source == "microphone":
+        assert not muted_audio, "no microphone audio should be sent while muted"
+        assert any(event[1] == "keepalive" for event in muted), "keepalives keep the connection open"
+    else:
+        assert muted_audio, "system audio keeps streaming in mixed mode"
+        assert max(event[3] for event in muted_audio) == 0, "the microphone is silenced in the mix"
+    assert resumed_peak >= MIC_AMPLITUDE * 32767 / 2, "microphone audio resumes after unmute"
+    assert not stats["mic_muted"]
+    assert stats["mic_gated_seconds"] == pytest.approx(MUTE_SECONDS - TAIL_MS / 1000, abs=0.35)
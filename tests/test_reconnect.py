@@ -0,0 +1,116 @@
+"""自动重连：连接失败时按指数退避重试，连接稳定后退避复位；持续发送音频却收不到响应时判定为停滞并关闭连接"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import soniox_session
+from soniox_session import _SonioxConnection
+
+
+class _SendQueue:
+    def __init__(self, audio_ms: float = 0.0):
+        self.audio_ms = audio_ms
+        self.end_of_audio_sent = False
+
+    def get_audio_ms(self, sample_rate: int) -> float:
+        return self.audio_ms
+
+
+def _reconnect_delays(session, monkeypatch, attempts: int) -> list:
+    """连接始终失败，返回每次重连前等待的时长"""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    stop_event = threading.Event()
+
+    async def fail_to_connect(*args, **kwargs):
+        if len(delays) + 1 >= attempts:
+            stop_event.set()
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(soniox_session.random, "uniform", lambda low, high: 1.0)
+    monkeypatch.setattr(soniox_session.asyncio, "sleep", fake_sleep)
+    session._open_connection = fail_to_connect
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        session.loop = loop
+        await session._run_session("key", "auto", "none", "", loop, stop_event, threading.Event())
+
+    asyncio.run(run())
+    return delays
+
+
+def test_backoff_doubles_up_to_maximum(make_session, configure, monkeypatch):
+    configure(SONIOX_AUTO_RECONNECT=True, RECONNECT_BACKOFF_INITIAL=1.0, RECONNECT_BACKOFF_MAX=30.0)
+    session = make_session()
+
+    delays = _reconnect_delays(session, monkeypatch, attempts=8)
+
+    assert delays == [1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0]
+    assert session.last_disconnect_reason == "connect failed: refused"
+
+
+def test_backoff_resets_after_stable_connection(make_session, configure, monkeypatch):
+    configure(SONIOX_AUTO_RECONNECT=True, RECONNECT_BACKOFF_INITIAL=1.0, STABLE_CONNECTION_SECONDS=0.0)
+    session = make_session()
+
+    assert _reconnect_delays(session, monkeypatch, attempts=4) == [1.0, 1.0, 1.0]
+
+
+def test_fatal_errors_are_not_retried(make_session, monkeypatch):
+    monkeypatch.setattr(soniox_session, "uses_temporary_keys", lambda: False)
+    session = make_session()
+    connection = _SonioxConnection(None, _SendQueue(), "")
+
+    connection.error_code = 401
+    assert not session._should_reconnect(connection)
+    connection.error_code = 503
+    assert session._should_reconnect(connection)
+
+
+def test_stall_requires_audio_sent_since_last_response(make_session, configure):
+    configure(SONIOX_STALL_TIMEOUT_SECONDS=4.0)
+    session = make_session()
+    now = time.monotonic()
+    connection = _SonioxConnection(None, _SendQueue(audio_ms=5000), "")
+
+    connection.last_message_at = now - 2
+    assert not session._is_stalled(connection, now)
+
+    connection.last_message_at = now - 5
+    connection.audio_ms_at_last_message = 4000  # 之后只发送了 keepalive（VAD 静音）
+    assert not session._is_stalled(connection, now)
+
+    connection.audio_ms_at_last_message = 0
+    assert session._is_stalled(connection, now)
+
+
+def test_stalled_connection_is_closed(make_session, configure):
+    configure(SONIOX_STALL_TIMEOUT_SECONDS=1.0, SONIOX_SESSION_ROLLOVER_MINUTES=0)
+    session = make_session()
+
+    async def run():
+        connection = _SonioxConnection(None, _SendQueue(audio_ms=2000), "")
+        connection.last_message_at = time.monotonic() - 2
+        connection.reader_task = asyncio.ensure_future(asyncio.Event().wait())
+        session._active_connection = connection
+        session._active_changed = asyncio.Event()
+        started = time.monotonic()
+        ended = await asyncio.wait_for(session._supervise_connections(threading.Event()), timeout=5)
+        return connection, ended, time.monotonic() - started
+
+    connection, ended, elapsed = asyncio.run(run())
+
+    assert ended is connection
+    assert connection.reader_task.cancelled()
+    assert connection.close_reason.startswith("no response for")
+    assert session.stall_count == 1
+    assert session._should_reconnect(connection)
+    assert elapsed == pytest.approx(1.0, abs=0.5)
@@ -0,0 +1,58 @@
+"""多相重采样：任意分块的输出与一次性处理整段音频逐位一致"""
+import numpy as np
+import pytest
+
+from audio_resampler import PolyphaseResampler
+
+
+def _signal(rate: int, seconds: float, channels: int) -> np.ndarray:
+    rng = np.random.default_rng(rate + channels)
+    t = np.arange(int(rate * seconds)) / rate
+    tone = 0.3 * np.sin(2 * np.pi * 440 * t) + 0.1 * np.sin(2 * np.pi * 3100 * t)
+    return (tone[:, None] + 0.05 * rng.standard_normal((t.shape[0], channels))).astype(np.float32)
+
+
+def _chunked(resampler: PolyphaseResampler, data: np.ndarray, sizes) -> np.ndarray:
+    outputs = []
+    position = 0
+    index = 0
+    while position < data.shape[0]:
+        size = sizes[index % len(sizes)]
+        # process() 返回内部缓冲区的视图，需要复制
+        outputs.append(resampler.process(data[position:position + size]).copy())
+        position += size
+        index += 1
+    return np.concatenate(outputs)
+
+
+@pytest.mark.parametrize("in_rate, channels", [(48000, 2), (44100, 2), (48000, 1), (22050, 1)])
+def test_chunked_output_is_bit_identical_to_one_shot(in_rate, channels):
+    data = _signal(in_rate, 1.0, channels)
+
+    one_shot = PolyphaseResampler(in_rate, 16000, max_input_frames=data.shape[0]).process(data).copy()
+    # 块长不整除重采样比例，且包含超过 max_input_frames 的块（触发扩容）与长度为 1 的块
+    chunked = _chunked(PolyphaseResampler(in_rate, 16000, max_input_frames=480), data, [480, 441, 1, 1000, 7])
+
+    assert chunked.dtype == np.float32
+    assert chunked.shape == one_shot.shape
+    assert chunked.shape[0] == pytest.approx(16000, abs=1)
+    assert np.array_equal(chunked, one_shot)
+
+
+def test_same_rate_is_passthrough_downmix():
+    data = _signal(16000, 0.1, 2)
+    resampler = PolyphaseResampler(16000, 16000)
+
+    assert resampler.passthrough
+    assert np.allclose(resampler.process(data), data.mean(axis=1))
+
+
+def test_removes_content_above_output_nyquist():
+    rate = 48000
+    t = np.arange(rate) / rate
+    # 12 kHz 高于 16 kHz 输出的奈奎斯特频率，不应混叠进输出
+    tone = (0.5 * np.sin(2 * np.pi * 12000 * t)).astype(np.float32)
+
+    output = PolyphaseResampler(rate, 16000, max_input_frames=rate).process(tone)
+
+    assert np.sqrt(np.mean(output[200:-200] ** 2)) < 0.5 / np.sqrt(2) * 10 ** (-60 / 20)
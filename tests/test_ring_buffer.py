@@ -0,0 +1,74 @@
+"""环形缓冲区：丢弃最旧数据、等待空间、连接正常时的丢弃上限与跨连接缓冲"""
+import threading
+
+import numpy as np
+
+from audio_pipeline import AudioRingBuffer
+
+
+def _write(ring: AudioRingBuffer, count: int) -> None:
+    ring.write(np.ones(count, dtype=np.int16))
+
+
+def test_live_limit_is_independent_of_reconnect_window():
+    ring = AudioRingBuffer(300, limit=200)
+
+    _write(ring, 250)
+    assert ring.depth == 200
+    assert ring.dropped_samples == 50
+
+    # 连接断开：积压可增长到容量
+    ring.hold()
+    _write(ring, 80)
+    assert ring.depth == 280
+    _write(ring, 50)
+    assert ring.depth == 300
+
+    # 连接恢复：保留积压用于补发但不再增长，读出后回落到 limit
+    ring.release()
+    _write(ring, 10)
+    assert ring.depth == 300
+    out = np.zeros(150, dtype=np.int16)
+    assert ring.read_into(out, timeout=0) == 150
+    _write(ring, 200)
+    assert ring.depth == 200
+    assert ring.get_stats(1000)["backlog_limit_ms"] == 200
+
+
+def test_drops_oldest_when_full():
+    ring = AudioRingBuffer(8)
+
+    ring.write(np.arange(6, dtype=np.int16))
+    ring.write(np.arange(6, 12, dtype=np.int16))
+    assert ring.depth == 8
+    assert ring.dropped_samples == 4
+    assert ring.overrun_count == 1
+
+    out = np.zeros(8, dtype=np.int16)
+    assert ring.read_into(out, timeout=0) == 8
+    assert out.tolist() == list(range(4, 12))
+
+
+def test_oversized_write_keeps_newest():
+    ring = AudioRingBuffer(4)
+
+    ring.write(np.arange(10, dtype=np.int16))
+    out = np.zeros(4, dtype=np.int16)
+    assert ring.read_into(out, timeout=0) == 4
+    assert out.tolist() == [6, 7, 8, 9]
+
+
+def test_wait_for_space_blocks_until_reader_drains():
+    ring = AudioRingBuffer(8)
+    ring.write(np.arange(8, dtype=np.int16))
+    assert not ring.wait_for_space(4, timeout=0.05)
+
+    out = np.zeros(4, dtype=np.int16)
+    reader = threading.Timer(0.05, ring.read_into, args=(out,), kwargs={"timeout": 0})
+    reader.start()
+    assert ring.wait_for_space(4, timeout=1.0)
+    reader.join()
+    assert ring.dropped_samples == 0
+
+    ring.close()
+    assert not ring.wait_for_space(8, timeout=1.0)
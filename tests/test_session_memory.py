@@ -0,0 +1,55 @@
+"""会话内存回归：长时间处理 token 响应后，会话的 Python 堆占用保持平稳
+
+直接把合成的 Soniox 响应交给 SonioxSession._handle_response()（日志写入 os.devnull、广播为空操作），
+预热后用 tracemalloc 记录堆占用，再处理相当于一小时的响应。
+"""
+import asyncio
+import gc
+import tracemalloc
+
+RESPONSES_PER_SECOND = 8
+SIMULATED_SECONDS = 3600
+MAX_GROWTH_KB = 512
+
+
+def _build_response(index: int) -> dict:
+    """约 125 ms 音频对应的一条响应：2 个 final token（其中一个为译文）+ 3 个 non-final token"""
+    base_ms = index * 125
+    tokens = [
+        {"text": f" word{index}", "is_final": True, "start_ms": base_ms, "end_ms": base_ms + 60,
+         "speaker": "1", "language": "en", "translation_status": "original", "confidence": 0.97},
+        {"text": f" mot{index}", "is_final": True, "speaker": "1", "language": "fr",
+         "translation_status": "translation"},
+    ]
+    tokens += [
+        {"text": f" next{index}-{n}", "is_final": False, "start_ms": base_ms + 60 + n * 20,
+         "end_ms": base_ms + 80 + n * 20, "speaker": "1", "language": "en"}
+        for n in range(3)
+    ]
+    if index % 40 == 39:
+        tokens.append({"text": "<end>", "is_final": True})
+    return {"tokens": tokens, "final_audio_proc_ms": base_ms + 60, "total_audio_proc_ms": base_ms + 125}
+
+
+def test_session_memory_stays_flat(make_session):
+    session = make_session()
+    total = SIMULATED_SECONDS * RESPONSES_PER_SECOND
+    warmup = total // 10
+
+    async def handle(start: int, end: int) -> None:
+        for index in range(start, end):
+            await session._handle_response(_build_response(index))
+
+    tracemalloc.start()
+    try:
+        asyncio.run(handle(0, warmup))
+        gc.collect()
+        heap_before = tracemalloc.get_traced_memory()[0]
+        asyncio.run(handle(warmup, total))
+        gc.collect()
+        heap_after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    growth_kb = (heap_after - heap_before) / 1024
+    assert growth_kb < MAX_GROWTH_KB, f"heap grew by {growth_kb:.0f} KB over {total} responses"
@@ -0,0 +1,60 @@
+"""临时 API key：缓存、事件循环中不阻塞、过期前后台刷新并复用 HTTP 连接"""
+import asyncio
+import time
+
+import pytest
+
+from soniox_client import TempKeyManager
+from tools.benchmark_temp_keys import KeyServer, max_loop_stall
+
+LATENCY = 0.15
+
+
+@pytest.fixture
+def key_server():
+    server = KeyServer(LATENCY, ttl=3600)
+    yield server
+    server.close()
+
+
+def test_get_key_requests_once_and_caches(key_server):
+    manager = TempKeyManager(key_server.url, refresh_margin=60)
+    keys = {manager.get_key() for _ in range(20)}
+
+    assert len(keys) == 1
+    assert key_server.requests == 1
+    assert manager.get_stats()["temp_key_fetches"] == 1
+
+
+def test_get_key_async_does_not_block_event_loop(key_server):
+    manager = TempKeyManager(key_server.url, refresh_margin=60)
+
+    async def fetch():
+        await manager.get_key_async()
+
+    stall_ms = asyncio.run(max_loop_stall(fetch))
+
+    assert key_server.requests == 1
+    assert stall_ms < LATENCY * 1000 / 2
+
+
+def test_background_refresh_renews_before_expiry(key_server):
+    ttl = 1.5
+    key_server.ttl = ttl
+    manager = TempKeyManager(key_server.url, refresh_margin=ttl / 2)
+    manager.start()
+    try:
+        manager.get_key()  # 等待启动时的首次预取
+        deadline = time.monotonic() + ttl * 3
+        worst_ms = 0.0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            manager.get_key()
+            worst_ms = max(worst_ms, (time.perf_counter() - started) * 1000)
+            time.sleep(0.05)
+    finally:
+        manager.stop()
+
+    assert manager.get_stats()["temp_key_fetches"] >= 3
+    assert worst_ms < LATENCY * 1000 / 2, "get_key should hit the prefetched key"
+    assert len(key_server.connections) == 1, "refreshes should reuse one pooled HTTP connection"
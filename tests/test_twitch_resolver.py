@@ -0,0 +1,67 @@
+"""Twitch 地址解析：按 multivariant 地址 token 中的过期时间刷新缓存"""
+import json
+import time
+from urllib.parse import quote
+
+from twitch_audio_streamer import TwitchStreamResolver
+
+
+class _Stream:
+    def __init__(self, index: int, expires: float):
+        self.index = index
+        self.expires = expires
+
+    def to_url(self) -> str:
+        # variant 地址不带 token
+        return f"https://video-weaver.example/v1/playlist/{self.index}.m3u8"
+
+    def to_manifest_url(self) -> str:
+        token = quote(json.dumps({"channel": "test", "expires": int(self.expires)}))
+        return f"https://usher.example/api/channel/hls/test.m3u8?sig=abc&token={token}"
+
+
+class _Plugin:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.calls = 0
+
+    def streams(self) -> dict:
+        self.calls += 1
+        return {"audio_only": _Stream(self.calls, time.time() + self.ttl)}
+
+
+def _resolver(ttl: float) -> tuple:
+    resolver = TwitchStreamResolver("test", "audio_only")
+    plugin = _Plugin(ttl)
+    resolver._plugin = plugin
+    return resolver, plugin
+
+
+def test_cached_until_token_expiry():
+    resolver, plugin = _resolver(ttl=3600)
+
+    first, cached = resolver.get_url()
+    assert not cached
+    second, cached = resolver.get_url()
+    assert cached and second == first
+    assert plugin.calls == 1
+    assert resolver._expires_at > time.time() + TwitchStreamResolver.DEFAULT_TTL_SECONDS
+
+
+def test_refreshes_when_token_is_about_to_expire():
+    resolver, plugin = _resolver(ttl=TwitchStreamResolver.REFRESH_MARGIN_SECONDS / 2)
+
+    first, _ = resolver.get_url()
+    second, cached = resolver.get_url()
+    assert not cached and second != first
+    assert plugin.calls == 2
+
+
+def test_invalidate_forces_resolve():
+    resolver, plugin = _resolver(ttl=3600)
+
+    resolver.get_url()
+    resolver.invalidate()
+    _, cached = resolver.get_url()
+    assert not cached
+    assert plugin.calls == 2
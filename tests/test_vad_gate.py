@@ -0,0 +1,61 @@
+"""语音门：检测到语音时补发 pre-roll，语音结束后按 hangover 继续放行"""
+import numpy as np
+
+from audio_pipeline import FramePool
+from audio_vad import VadConfig, VoiceActivityGate
+
+SAMPLE_RATE = 16000
+FRAME = 320  # 20 ms
+
+
+def _gate(preroll_ms: int = 60, hangover_ms: int = 40) -> tuple:
+    pool = FramePool(FRAME)
+    config = VadConfig(preroll_ms=preroll_ms, hangover_ms=hangover_ms)
+    return VoiceActivityGate(pool, SAMPLE_RATE, FRAME, config), pool
+
+
+def _frame(pool: FramePool, speech: bool, index: int) -> np.ndarray:
+    frame = pool.acquire()
+    if speech:
+        t = np.arange(FRAME) / SAMPLE_RATE
+        frame[:] = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    else:
+        frame[:] = 0
+    frame[0] = index  # 标记帧序号，便于检查顺序
+    return frame
+
+
+def test_preroll_released_before_speech_in_order():
+    gate, pool = _gate(preroll_ms=60)
+
+    for index in range(10):
+        assert gate.process(_frame(pool, False, index)) == []
+    sent = gate.process(_frame(pool, True, 10))
+
+    # 60 ms pre-roll = 最近 3 个静音帧，之后是语音帧
+    assert [int(frame[0]) for frame in sent] == [7, 8, 9, 10]
+    assert gate.is_open
+    assert gate.gated_samples == 7 * FRAME
+
+
+def test_hangover_keeps_gate_open_after_speech():
+    gate, pool = _gate(preroll_ms=20, hangover_ms=40)
+
+    gate.process(_frame(pool, True, 0))
+    assert len(gate.process(_frame(pool, False, 1))) == 1
+    assert len(gate.process(_frame(pool, False, 2))) == 1
+    # hangover（40 ms = 2 帧）用完后关闭
+    assert gate.process(_frame(pool, False, 3)) == []
+    assert not gate.is_open
+
+
+def test_reset_returns_preroll_frames_to_pool():
+    gate, pool = _gate(preroll_ms=60)
+
+    for index in range(3):
+        gate.process(_frame(pool, False, index))
+    allocations = pool.allocations
+    gate.reset()
+    for index in range(3):
+        pool.acquire()
+    assert pool.allocations == allocations
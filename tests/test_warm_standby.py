@@ -0,0 +1,108 @@
+"""预热切换：新音频源打开期间旧音频源继续采集，新源产出首块后在块边界切换，打开失败时保留旧音频源"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from audio_capture import AudioStreamer
+
+SAMPLE_RATE = 16000
+CHUNK = 1280  # 80 ms
+OPEN_SECONDS = 0.4
+LEVELS = {"system": 0.25, "microphone": 0.5}
+
+
+class _SlowRecorder:
+    """按实时速度产出恒定电平的录音设备；麦克风打开需要 OPEN_SECONDS，fail=True 时打开失败"""
+
+    def __init__(self, source: str, fail: bool):
+        self.source = source
+        self.fail = fail
+        self.next_at = 0.0
+
+    def __enter__(self):
+        if self.source == "microphone":
+            time.sleep(OPEN_SECONDS)
+            if self.fail:
+                raise OSError("device unavailable")
+        self.next_at = time.monotonic()
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def record(self, numframes: int) -> np.ndarray:
+        self.next_at += numframes / SAMPLE_RATE
+        delay = self.next_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return np.full((numframes, 1), LEVELS[self.source], dtype=np.float32)
+
+
+class _Streamer(AudioStreamer):
+    fail_microphone = False
+
+    def _create_recorder(self, source, input_device_id, output_device_id):
+        return _SlowRecorder(source, self.fail_microphone)
+
+
+class _Sink:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.chunks = []
+
+    def send(self, data) -> None:
+        if not isinstance(data, str):
+            with self.lock:
+                self.chunks.append(np.frombuffer(bytes(data), dtype=np.int16).copy())
+
+    def samples(self) -> np.ndarray:
+        with self.lock:
+            return np.concatenate(self.chunks) if self.chunks else np.zeros(0, dtype=np.int16)
+
+
+def _switch(fail_microphone: bool) -> tuple:
+    sink = _Sink()
+    streamer = _Streamer(sink, initial_source="system", sample_rate=SAMPLE_RATE, chunk_size=CHUNK)
+    streamer.fail_microphone = fail_microphone
+    streamer.start()
+    try:
+        time.sleep(0.5)
+        switched_at = time.monotonic()
+        assert streamer.set_source("microphone")
+        time.sleep(OPEN_SECONDS + 0.8)
+        elapsed = time.monotonic() - switched_at
+        stats = streamer.get_stats()
+    finally:
+        streamer.stop()
+    return sink.samples(), elapsed, stats
+
+
+def _level(source: str) -> int:
+    return int(LEVELS[source] * 32767)
+
+
+def test_old_source_keeps_streaming_until_cutover():
+    samples, elapsed, stats = _switch(fail_microphone=False)
+
+    system, microphone = _level("system"), _level("microphone")
+    assert set(np.unique(samples)) <= {system, microphone}
+    # 切换前全部是旧音频源，切换后全部是新音频源，没有交错
+    first = int(np.argmax(samples == microphone))
+    assert samples[first] == microphone
+    assert np.all(samples[:first] == system)
+    assert np.all(samples[first:] == microphone)
+    # 新音频源打开期间旧音频源持续采集：切换窗口内的音频没有缺口
+    assert first / SAMPLE_RATE >= 0.5 + OPEN_SECONDS - 0.2
+    assert stats["source_switches"] == 1
+    assert stats["last_cutover_ms"] == pytest.approx(OPEN_SECONDS * 1000, abs=250)
+    assert samples.shape[0] / SAMPLE_RATE == pytest.approx(0.5 + elapsed, abs=0.35)
+
+
+def test_failed_open_keeps_old_source():
+    samples, _, stats = _switch(fail_microphone=True)
+
+    assert np.all(samples == _level("system"))
+    assert stats["source_switch_failures"] == 1
+    assert stats["source_switches"] == 0
@@ -0,0 +1,7 @@
+"""开发用基准脚本，从仓库根目录以 python -m tools.<脚本名> 运行。
+
+config 在导入时要求提供 API key 或临时 key 地址；基准只连接本地模拟服务器，这里在导入任何脚本之前提供占位值。
+"""
+import os
+
+os.environ.setdefault("SONIOX_API_KEY", "benchmark")
@@ -0,0 +1,223 @@
+"""
+手动确认（finalize）基准 - 比较等待端点检测与 finalize 时，说话结束到 final 文本送达外部 WebSocket 的延迟
+
+本地启动一个模拟 Soniox 的 WebSocket 服务器：每个含语音的音频帧产生一个 non-final token，
+只在语音后静音达到 --endpoint-ms 时把它们确认为 final（+ <end>），收到 finalize 时立即确认（+ <fin>）。
+会话以实时速度回放合成的“语音/静音”交替音频，分三种情况运行：
+- endpoint：不发送 finalize，等待端点检测
+- mute：每句话开始时取消静音、结束时模拟 VRChat 静音（SonioxSession.handle_mute_change）
+- silence：本地 VAD 检测到 --silence-ms 的句尾静音后发送 finalize
+统计每句话从服务器收到最后一个语音帧到整句 final 文本送达外部 WebSocket 回调的时间，
+以及会话指标中的 finalize 往返时间与 final 延迟。行为检查（<fin> 不被分发、finalize 快于端点检测）见 tests/test_finalize.py。
+
+用法: python -m tools.benchmark_finalize [--utterances 4] [--endpoint-ms 1000] [--silence-ms 300]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import wave
+
+import numpy as np
+from websockets.asyncio.server import serve
+
+import soniox_session
+from logger import TranscriptLogger
+from soniox_session import SonioxSession
+
+SAMPLE_RATE = 16000
+SPEECH_MS = 1200
+SILENCE_MS = 1680
+SPEECH_AMPLITUDE = 3000
+SCENARIOS = ("endpoint", "mute", "silence")
+
+
+def write_speech(path: str, utterances: int) -> None:
+    """“语音”（白噪声）与静音交替的 16 kHz 单声道 WAV"""
+    rng = np.random.default_rng(1)
+    speech = int(SAMPLE_RATE * SPEECH_MS / 1000)
+    silence = int(SAMPLE_RATE * SILENCE_MS / 1000)
+    parts = [np.zeros(silence // 2, dtype=np.int16)]
+    for _ in range(utterances):
+        parts.append((rng.standard_normal(speech) * SPEECH_AMPLITUDE).astype(np.int16))
+        parts.append(np.zeros(silence, dtype=np.int16))
+    with wave.open(path, "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(SAMPLE_RATE)
+        file.writeframes(np.concatenate(parts).tobytes())
+
+
+class FakeSoniox:
+    """按语音帧产生 non-final token，端点或 finalize 时确认为 final"""
+
+    def __init__(self, endpoint_ms: float):
+        self.endpoint_ms = endpoint_ms
+        self.speech_end_at: dict = {}  # 句子编号 -> 收到最后一个语音帧的时刻
+        self.on_speech_start = None
+        self.on_speech_end = None
+        self.finalize_messages = 0
+
+    async def handler(self, ws):
+        await ws.recv()  # 会话配置
+        audio_ms = 0.0
+        silence_ms = 0.0
+        pending: list = []
+        utterance = -1
+        in_speech = False
+        async for message in ws:
+            if isinstance(message, bytes):
+                samples = np.frombuffer(message, dtype=np.int16)
+                frame_ms = samples.shape[0] * 1000 / SAMPLE_RATE
+                speech = samples.shape[0] and float(np.abs(samples).mean()) > SPEECH_AMPLITUDE / 10
+                finals: list = []
+                if speech:
+                    if not in_speech:
+                        utterance += 1
+                        if self.on_speech_start is not None:
+                            self.on_speech_start()
+                    in_speech = True
+                    silence_ms = 0.0
+                    pending.append({
+                        "text": f" u{utterance}w{len(pending)}", "start_ms": int(audio_ms),
+                        "end_ms": int(audio_ms + frame_ms),
+                    })
+                else:
+                    if in_speech:
+                        in_speech = False
+                        self.speech_end_at[utterance] = time.perf_counter()
+                        if self.on_speech_end is not None:
+                            self.on_speech_end()
+                    silence_ms += frame_ms
+                    if pending and silence_ms >= self.endpoint_ms:
+                        finals = pending + [{"text": "<end>"}]
+                        pending = []
+                audio_ms += frame_ms
+                await self._send(ws, finals, pending)
+            elif message == "":
+                await ws.send(json.dumps({"tokens": [], "finished": True}))
+                return
+            elif json.loads(message).get("type") == "finalize":
+                self.finalize_messages += 1
+                finals = pending + [{"text": "<fin>"}]
+                pending = []
+                await self._send(ws, finals, pending)
+
+    @staticmethod
+    async def _send(ws, finals: list, pending: list) -> None:
+        tokens = [dict(token, is_final=True) for token in finals]
+        tokens += [dict(token, is_final=False) for token in pending]
+        await ws.send(json.dumps({"tokens": tokens}))
+
+
+def scenario_settings(name: str, url: str, wav_path: str, silence_ms: int) -> dict:
+    """该情况下会话模块使用的配置：连接模拟服务器，以实时速度回放合成音频"""
+    return {
+        "SONIOX_WEBSOCKET_URL": url,
+        "AUDIO_REPLAY_FILE": wav_path,
+        "AUDIO_REPLAY_SPEED": 1.0,
+        "AUDIO_REPLAY_LOOP": False,
+        "AUDIO_VAD_ENABLED": False,
+        "SONIOX_FINALIZE_ON_MUTE": name == "mute",
+        "SONIOX_FINALIZE_SILENCE_MS": silence_ms if name == "silence" else 0,
+    }
+
+
+async def run_scenario(name: str, fake: FakeSoniox) -> dict:
+    """回放一次合成音频（配置由调用方按 scenario_settings() 设置），返回每句话的延迟与会话指标"""
+    fake.speech_end_at = {}
+    fake.finalize_messages = 0
+
+    delivered: dict = {}
+    leaked = []
+
+    async def external_ws_send(text: str) -> None:
+        now = time.perf_counter()
+        if "<fin>" in text:
+            leaked.append(text)
+        for word in text.split():
+            utterance = int(word[1:word.index("w")])
+            delivered[utterance] = now
+
+    async def broadcast(data: dict) -> None:
+        if data.get("type") == "update" and any(t["text"] == "<fin>" for t in data["final_tokens"]):
+            leaked.append("broadcast")
+
+    logger = TranscriptLogger()
+    logger.log_file = open(os.devnull, "w", encoding="utf-8")
+    session = SonioxSession(logger, broadcast)
+    session.external_ws_send_callback = external_ws_send
+    if name == "mute":
+        fake.on_speech_start = lambda: session.handle_mute_change(False)
+        fake.on_speech_end = lambda: session.handle_mute_change(True)
+    else:
+        fake.on_speech_start = fake.on_speech_end = None
+
+    loop = asyncio.get_running_loop()
+    session.start("finalize-check", "pcm_s16le", "one_way", loop)
+    while session.is_running():
+        await asyncio.sleep(0.05)
+    stats = session.get_connection_stats()
+    await loop.run_in_executor(None, session.stop)
+    logger.log_file.close()
+
+    latencies = [
+        (delivered[index] - ended) * 1000
+        for index, ended in fake.speech_end_at.items()
+        if index in delivered and delivered[index] >= ended
+    ]
+    return {
+        "latencies": latencies,
+        "utterances": len(fake.speech_end_at),
+        "finalize_messages": fake.finalize_messages,
+        "leaked": leaked,
+        "stats": stats,
+    }
+
+
+async def _main(args, wav_path: str) -> None:
+    fake = FakeSoniox(args.endpoint_ms)
+    results = {}
+    async with serve(fake.handler, "127.0.0.1", 0) as server:
+        url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        for name in SCENARIOS:
+            for key, value in scenario_settings(name, url, wav_path, args.silence_ms).items():
+                setattr(soniox_session, key, value)
+            results[name] = await run_scenario(name, fake)
+
+    print()
+    for name, result in results.items():
+        latencies = result["latencies"]
+        stats = result["stats"]
+        if not latencies:
+            print(f"{name:8s}: no utterance was delivered")
+            continue
+        finalize_rtt = stats["soniox_finalize_latency_ms"]
+        final_lag = stats["finalized_final_lag_ms"] if name != "endpoint" else stats["final_lag_ms"]
+        print(
+            f"{name:8s}: speech end -> final text avg {statistics.mean(latencies):7.1f} ms, "
+            f"max {max(latencies):7.1f} ms over {len(latencies)} utterances; "
+            f"{result['finalize_messages']} finalize messages"
+            + (f", finalize round trip {finalize_rtt:.1f} ms" if finalize_rtt is not None else "")
+            + (f", final lag {final_lag:.0f} ms" if final_lag is not None else "")
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--utterances", type=int, default=4)
+    parser.add_argument("--endpoint-ms", type=float, default=1000.0, help="simulated server endpoint delay")
+    parser.add_argument("--silence-ms", type=int, default=300, help="local trailing silence before finalize")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="finalize-bench-") as workdir:
+        wav_path = os.path.join(workdir, "speech.wav")
+        write_speech(wav_path, args.utterances)
+        asyncio.run(_main(args, wav_path))
+
+
+if __name__ == "__main__":
+    main()
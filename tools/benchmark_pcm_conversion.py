@@ -0,0 +1,119 @@
+"""
+PCM 转换基准 - 比较逐帧分配（astype + tobytes）与预分配缓冲区（PcmConverter + FramePool + as_bytes_view）
+
+对同一段 float32 采集数据逐帧执行两条路径，得到待发送的字节数据：
+- old：np.clip -> * 32767 -> astype(int16) -> tobytes()，每一步都产生新数组/新 bytes
+- new：PcmConverter.convert() 写入预分配缓冲区 -> 复制到 FramePool 的帧 -> as_bytes_view() 零拷贝发送 -> 归还帧
+分别统计：
+- ns/frame：不开启 tracemalloc 时每帧耗时（取 --repeat 次中最好的一次）
+- allocations：开启 tracemalloc 并保留每帧产生的全部对象，统计新增的内存块数与字节数，
+  换算为每帧与每秒音频（sample_rate / frame_samples 帧）的分配次数
+
+用法: python -m tools.benchmark_pcm_conversion [--frames 20000] [--frame-samples 3840] [--repeat 5]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from audio_pipeline import FramePool, PcmConverter, as_bytes_view
+
+SAMPLE_RATE = 16000
+
+
+def _send(payload) -> int:
+    """代替 ws.send()：只读取长度，保证两条路径都产出可发送的字节数据"""
+    return len(payload)
+
+
+def _old_path(samples: np.ndarray, keep: list, slot: int) -> None:
+    clipped = np.clip(samples, -1.0, 1.0)
+    scaled = clipped * 32767
+    frame = scaled.astype(np.int16)
+    payload = frame.tobytes()
+    _send(payload)
+    if keep is not None:
+        keep[slot:slot + 4] = clipped, scaled, frame, payload
+
+
+def _new_path(samples: np.ndarray, keep: list, slot: int, converter: PcmConverter, pool: FramePool) -> None:
+    converted = converter.convert(samples)
+    frame = pool.acquire()
+    np.copyto(frame, converted)
+    payload = as_bytes_view(frame)
+    _send(payload)
+    pool.release(frame)
+    if keep is not None:
+        keep[slot:slot + 4] = converted, frame, payload, None
+
+
+def _time_path(run, chunks: list, frames: int, repeat: int) -> float:
+    """每帧耗时（纳秒），取最好的一次"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for index in range(frames):
+            run(chunks[index % len(chunks)], None, 0)
+        elapsed = time.perf_counter_ns() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / frames
+
+
+def _count_allocations(run, chunks: list, frames: int) -> tuple:
+    """保留每帧产生的对象，返回 (每帧新增内存块数, 每帧新增字节数)"""
+    keep = [None] * (frames * 4)  # 预先分配，保存引用时不产生新的内存块
+    run(chunks[0], None, 0)  # 预热：首次调用时的缓存/扩容不计入
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for index in range(frames):
+            run(chunks[index % len(chunks)], keep, index * 4)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    size = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    return blocks / frames, size / frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--frame-samples", type=int, default=3840, help="samples per frame (3840 = 240 ms)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    # 采集设备返回 float32；略超出 [-1, 1] 以覆盖削波
+    chunks = [(rng.standard_normal(args.frame_samples) * 0.4).astype(np.float32) for _ in range(16)]
+    converter = PcmConverter(args.frame_samples)
+    pool = FramePool(args.frame_samples)
+    paths = {
+        "old (astype + tobytes)": lambda samples, keep, slot: _old_path(samples, keep, slot),
+        "new (PcmConverter + as_bytes_view)": lambda samples, keep, slot: _new_path(
+            samples, keep, slot, converter, pool
+        ),
+    }
+
+    frames_per_second = SAMPLE_RATE / args.frame_samples
+    allocation_frames = min(args.frames, 2000)
+    print(
+        f"{args.frames} frames of {args.frame_samples} samples "
+        f"({args.frame_samples * 1000 / SAMPLE_RATE:g} ms, {frames_per_second:.2f} frames per second of audio)"
+    )
+    for name, run in paths.items():
+        ns_per_frame = _time_path(run, chunks, args.frames, args.repeat)
+        blocks, size = _count_allocations(run, chunks, allocation_frames)
+        print(
+            f"{name:36s}: {ns_per_frame:9.0f} ns/frame, {blocks:5.2f} allocations/frame "
+            f"({blocks * frames_per_second:6.1f} allocations/s of audio, "
+            f"{blocks * 1_000_000_000 / ns_per_frame:12.0f} allocations/s at full speed), "
+            f"{size / 1024:7.2f} KB allocated/frame"
+        )
+    print(f"pool allocations after warm-up: {pool.allocations} (initial frames only)")
+
+
+if __name__ == "__main__":
+    main()
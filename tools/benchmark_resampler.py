@@ -0,0 +1,82 @@
+"""
+原生格式采集基准 - 测量进程内降混 + 重采样每秒音频的 CPU 开销，并与按设备速率（16 kHz 单声道）采集比较
+
+与 _CaptureWorker 的处理顺序一致，对合成的 float32 采集块逐块执行：
+- baseline：系统后端直接提供 16 kHz 单声道，采集线程只做 PcmConverter.convert()
+- native：设备原生格式（默认 48 kHz 立体声）经 PolyphaseResampler.process()（先 Downmixer 平均声道）
+  重采样到 16 kHz 单声道，再做 PcmConverter.convert()
+统计每种格式、每种块长下处理 1 秒音频消耗的进程 CPU 时间（time.process_time，取 --repeat 次中最好的一次）。
+
+用法: python -m tools.benchmark_resampler [--seconds 60] [--block-ms 240 20] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from audio_pipeline import PcmConverter
+from audio_resampler import PolyphaseResampler
+
+OUTPUT_RATE = 16000
+# (采样率, 声道数)；第一个为基线：系统后端直接提供发送格式
+FORMATS = ((OUTPUT_RATE, 1), (48000, 2), (44100, 2), (48000, 1))
+
+
+def _make_blocks(rate: int, channels: int, block_frames: int) -> list:
+    """几块不同的合成音频（语音频段的正弦叠加噪声），循环使用"""
+    rng = np.random.default_rng(rate + channels)
+    blocks = []
+    for index in range(8):
+        t = (np.arange(block_frames) + index * block_frames) / rate
+        tone = 0.3 * np.sin(2 * np.pi * 440 * t) + 0.1 * np.sin(2 * np.pi * 3100 * t)
+        block = tone[:, None] + 0.05 * rng.standard_normal((block_frames, channels))
+        blocks.append(block.astype(np.float32))
+    return blocks
+
+
+def _cpu_per_second(rate: int, channels: int, block_ms: int, seconds: float, repeat: int) -> float:
+    """处理 1 秒音频消耗的 CPU 时间（毫秒）"""
+    block_frames = rate * block_ms // 1000
+    blocks = _make_blocks(rate, channels, block_frames)
+    count = max(1, int(seconds * 1000 / block_ms))
+    best = None
+    for _ in range(repeat):
+        resampler = PolyphaseResampler(rate, OUTPUT_RATE, max_input_frames=block_frames)
+        converter = PcmConverter(OUTPUT_RATE * block_ms // 1000 + 2)
+        started = time.process_time()
+        for index in range(count):
+            data = blocks[index % len(blocks)]
+            samples = resampler.process(data)
+            converter.convert(samples)
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000 / (count * block_ms / 1000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0, help="audio processed per measurement")
+    parser.add_argument("--block-ms", type=int, nargs="+", default=[240, 20], help="capture block lengths")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"CPU time per second of audio, converted to {OUTPUT_RATE} Hz mono int16 ({args.seconds:g} s per run)")
+    for block_ms in args.block_ms:
+        baseline = None
+        for rate, channels in FORMATS:
+            cost = _cpu_per_second(rate, channels, block_ms, args.seconds, args.repeat)
+            if baseline is None:
+                baseline = cost
+                label = "baseline (device-rate capture)"
+                extra = ""
+            else:
+                label = "native capture + resample"
+                extra = f", +{cost - baseline:6.3f} ms vs baseline ({cost / baseline:5.1f}x)"
+            print(
+                f"{block_ms:4d} ms blocks, {rate:5d} Hz x {channels} ch, {label:31s}: "
+                f"{cost:7.3f} ms CPU/s ({cost / 10:6.3f}% of one core){extra}"
+            )
+
+
+if __name__ == "__main__":
+    main()
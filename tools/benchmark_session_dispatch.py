@@ -0,0 +1,133 @@
+"""
+Soniox 响应分发基准 - 比较同步线程 + run_coroutine_threadsafe 与 asyncio 原生会话的每条消息开销
+
+本地启动一个模拟 Soniox 的 WebSocket 服务器推送 token 响应（内含发送时刻），
+分别用两种方式接收、解析并“广播”到事件循环：
+- paced：按固定间隔推送，统计每条消息从服务器发出到广播执行的延迟
+- burst：不限速推送，统计每条消息的平均处理时间（吞吐）
+
+用法: python -m tools.benchmark_session_dispatch [--messages 20000] [--tokens 8] [--interval-ms 2]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+
+from websockets.asyncio.client import connect as async_connect
+from websockets.asyncio.server import serve
+from websockets.sync.client import connect as sync_connect
+
+
+def _build_message(index: int, tokens: int) -> dict:
+    return {
+        "tokens": [
+            {"text": f" word{index}-{n}", "is_final": n < tokens // 2, "start_ms": index * 10, "end_ms": index * 10 + 5}
+            for n in range(tokens)
+        ],
+        "final_audio_proc_ms": index * 10,
+        "total_audio_proc_ms": index * 10 + 5,
+    }
+
+
+async def _serve_messages(ws, count: int, tokens: int, interval: float) -> None:
+    # 第一条消息为会话配置，收到后开始推送
+    await ws.recv()
+    for index in range(count):
+        message = _build_message(index, tokens)
+        message["sent_at"] = time.perf_counter()
+        await ws.send(json.dumps(message))
+        if interval > 0:
+            await asyncio.sleep(interval)
+        elif index % 64 == 0:
+            await asyncio.sleep(0)
+    await ws.send(json.dumps({"tokens": [], "finished": True, "sent_at": time.perf_counter()}))
+    await ws.wait_closed()
+
+
+class _Collector:
+    """模拟 broadcast_callback：记录每条消息到达事件循环的延迟"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.latencies: list = []
+        self.done = asyncio.Event()
+
+    async def broadcast(self, data: dict) -> None:
+        self.latencies.append(time.perf_counter() - data["sent_at"])
+        if len(self.latencies) >= self.count + 1:
+            self.done.set()
+
+
+def _run_thread_client(url: str, loop: asyncio.AbstractEventLoop, collector: _Collector) -> None:
+    """旧实现：同步 WebSocket 线程，每条消息一次 run_coroutine_threadsafe"""
+    with sync_connect(url) as ws:
+        ws.send(json.dumps({"config": True}))
+        while True:
+            res = json.loads(ws.recv())
+            finals = [token for token in res["tokens"] if token.get("is_final")]
+            asyncio.run_coroutine_threadsafe(
+                collector.broadcast({"final_tokens": finals, "sent_at": res["sent_at"]}), loop
+            )
+            if res.get("finished"):
+                break
+
+
+async def _run_async_client(url: str, collector: _Collector) -> None:
+    """新实现：事件循环内接收、解析并直接 await 广播"""
+    async with async_connect(url) as ws:
+        await ws.send(json.dumps({"config": True}))
+        async for message in ws:
+            res = json.loads(message)
+            finals = [token for token in res["tokens"] if token.get("is_final")]
+            await collector.broadcast({"final_tokens": finals, "sent_at": res["sent_at"]})
+            if res.get("finished"):
+                break
+
+
+def _summarize(name: str, latencies: list, elapsed: float) -> None:
+    values = sorted(latency * 1_000_000 for latency in latencies)
+    count = len(values)
+    p99 = values[min(count - 1, int(count * 0.99))]
+    print(
+        f"{name:>15}: {count} messages in {elapsed:.2f} s "
+        f"({elapsed / count * 1_000_000:.1f} µs/message), "
+        f"latency mean {statistics.fmean(values):.0f} µs, p50 {statistics.median(values):.0f} µs, p99 {p99:.0f} µs"
+    )
+
+
+async def _benchmark(mode: str, count: int, tokens: int, interval: float) -> None:
+    collector = _Collector(count)
+    async with serve(lambda ws: _serve_messages(ws, count, tokens, interval), "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        url = f"ws://127.0.0.1:{port}"
+        started = time.perf_counter()
+        if mode == "thread":
+            loop = asyncio.get_running_loop()
+            thread = threading.Thread(target=_run_thread_client, args=(url, loop, collector), daemon=True)
+            thread.start()
+            await collector.done.wait()
+            await loop.run_in_executor(None, thread.join)
+        else:
+            await _run_async_client(url, collector)
+        elapsed = time.perf_counter() - started
+    _summarize(f"{'paced' if interval > 0 else 'burst'} {mode}", collector.latencies, elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=8, help="tokens per response")
+    parser.add_argument("--interval-ms", type=float, default=2.0, help="interval between paced messages")
+    args = parser.parse_args()
+
+    paced_count = max(1, min(args.messages, int(5000 / max(args.interval_ms, 0.1))))
+    for mode in ("thread", "asyncio"):
+        asyncio.run(_benchmark(mode, paced_count, args.tokens, args.interval_ms / 1000))
+    for mode in ("thread", "asyncio"):
+        asyncio.run(_benchmark(mode, args.messages, args.tokens, 0.0))
+
+
+if __name__ == "__main__":
+    main()
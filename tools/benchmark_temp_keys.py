@@ -0,0 +1,137 @@
+"""
+临时 API key 基准 - 用本地模拟的临时 key 服务器测量 TempKeyManager 的取 key 耗时
+
+模拟服务器每次请求延迟 --latency-ms 后返回 {"apiKey", "expiresAt"}，统计请求次数与 TCP 连接数：
+- 逐次 requests.post（旧实现）与 TempKeyManager.get_key() 的每次取 key 耗时
+- 事件循环中冷启动取 key 时，同步请求与 get_key_async() 造成的最大事件循环停顿
+缓存、后台预取与连接复用的行为检查见 tests/test_temp_keys.py。
+
+用法: python -m tools.benchmark_temp_keys [--calls 50] [--latency-ms 150]
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from soniox_client import TempKeyManager
+
+
+class KeyServer:
+    """本地临时 key 服务器"""
+
+    def __init__(self, latency: float, ttl: float):
+        self.latency = latency
+        self.ttl = ttl
+        self.requests = 0
+        self.connections: set = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 支持 keep-alive
+
+            def do_POST(self):
+                server.requests += 1
+                server.connections.add(self.client_address)
+                time.sleep(server.latency)
+                expires_at = datetime.now(timezone.utc) + timedelta(seconds=server.ttl)
+                body = json.dumps({
+                    "apiKey": f"temp-key-{server.requests}",
+                    "expiresAt": expires_at.isoformat().replace("+00:00", "Z"),
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/temp-key"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.connections = set()
+
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _time_calls(func, calls: int) -> tuple:
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sum(timings) / len(timings), max(timings)
+
+
+async def max_loop_stall(fetch) -> float:
+    """在事件循环中执行 fetch()，返回期间最大的事件循环停顿（毫秒）"""
+    stall = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stall = max(stall, (now - last) * 1000 - 5)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    await fetch()
+    await asyncio.sleep(0.02)
+    running = False
+    await task
+    return stall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="simulated key server latency")
+    args = parser.parse_args()
+
+    server = KeyServer(args.latency_ms / 1000, ttl=3600)
+
+    # 每次取 key 的耗时：旧实现每次都请求，TempKeyManager 只在首次请求
+    server.reset()
+    old_avg, old_max = _time_calls(lambda: requests.post(server.url, timeout=10).json(), args.calls)
+    old_requests, old_connections = server.requests, len(server.connections)
+
+    server.reset()
+    manager = TempKeyManager(server.url, refresh_margin=60)
+    new_avg, new_max = _time_calls(manager.get_key, args.calls)
+    print(f"requests.post per call : avg {old_avg:7.2f} ms, max {old_max:7.2f} ms, "
+          f"{old_requests} requests over {old_connections} connections")
+    print(f"TempKeyManager.get_key : avg {new_avg:7.2f} ms, max {new_max:7.2f} ms, "
+          f"{server.requests} requests over {len(server.connections)} connections")
+
+    # 冷启动时的事件循环停顿
+    async def blocking_fetch():
+        requests.post(server.url, timeout=10).json()
+
+    async def async_fetch():
+        manager.invalidate()
+        await manager.get_key_async()
+
+    blocking_stall = asyncio.run(max_loop_stall(blocking_fetch))
+    async_stall = asyncio.run(max_loop_stall(async_fetch))
+    print(f"event loop stall on a cold fetch: blocking {blocking_stall:.1f} ms, get_key_async {async_stall:.1f} ms")
+    server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+token 分发基准 - 测量每个 token 从解析 Soniox 响应到分发给各消费方的开销
+
+把预先序列化的 Soniox 响应依次 json.loads 后交给 SonioxSession._handle_response()，
+消费方为真实的日志写入（os.devnull）、外部 WebSocket 缓冲，以及与 WebServer.broadcast_to_clients
+相同的 json.dumps 广播，统计每个 token 的平均耗时。
+
+用法: python -m tools.benchmark_token_dispatch [--responses 50000] [--repeat 3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from logger import TranscriptLogger
+from soniox_session import SonioxSession
+
+SPEAKERS = ("1", "2")
+
+
+def _build_messages(count: int) -> tuple:
+    """生成响应：每条含 3 个 final（原文 2 个 + 译文 1 个）与 4 个 non-final token"""
+    messages = []
+    tokens_total = 0
+    for index in range(count):
+        base_ms = index * 120
+        speaker = SPEAKERS[(index // 50) % 2]
+        tokens = [
+            {"text": f" word{index}", "start_ms": base_ms, "end_ms": base_ms + 40, "confidence": 0.98,
+             "is_final": True, "speaker": speaker, "language": "en", "translation_status": "original"},
+            {"text": ",", "start_ms": base_ms + 40, "end_ms": base_ms + 50, "confidence": 0.91,
+             "is_final": True, "speaker": speaker, "language": "en", "translation_status": "original"},
+            {"text": f" mot{index}", "is_final": True, "speaker": speaker, "language": "fr",
+             "source_language": "en", "translation_status": "translation"},
+        ]
+        tokens += [
+            {"text": f" next{n}", "start_ms": base_ms + 60 + n * 15, "end_ms": base_ms + 70 + n * 15,
+             "confidence": 0.7, "is_final": False, "speaker": speaker, "language": "en",
+             "translation_status": "original"}
+            for n in range(4)
+        ]
+        if index % 30 == 29:
+            tokens.append({"text": "<end>", "is_final": True})
+        tokens_total += len(tokens)
+        messages.append(json.dumps({"tokens": tokens, "final_audio_proc_ms": base_ms + 50,
+                                    "total_audio_proc_ms": base_ms + 120}))
+    return messages, tokens_total
+
+
+async def _run(messages: list) -> float:
+    logger = TranscriptLogger()
+    logger.log_file = open(os.devnull, "w", encoding="utf-8")
+
+    async def broadcast(data: dict) -> None:
+        # 与 WebServer.broadcast_to_clients 一致：每条广播序列化一次
+        json.dumps(data)
+
+    async def external_ws_send(text: str) -> None:
+        return None
+
+    session = SonioxSession(logger, broadcast)
+    session.external_ws_send_callback = external_ws_send
+    session.external_ws_send_non_final = True
+    session.loop = asyncio.get_running_loop()
+
+    started = time.perf_counter()
+    for message in messages:
+        await session._handle_response(json.loads(message))
+    elapsed = time.perf_counter() - started
+    logger.log_file.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    messages, tokens_total = _build_messages(args.responses)
+    best = min(asyncio.run(_run(messages)) for _ in range(args.repeat))
+    print(
+        f"{args.responses} responses / {tokens_total} tokens: best {best:.2f} s, "
+        f"{best / tokens_total * 1_000_000:.2f} µs/token, {best / args.responses * 1_000_000:.1f} µs/response"
+    )
+
+
+if __name__ == "__main__":
+    main()
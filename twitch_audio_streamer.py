@@ -1,57 +1,95 @@
 """Twitch 音频捕获模块 - 从 Twitch 串流提取音频并输出 PCM_s16le"""
 
-import subprocess
+import json
 import threading
 import time
-from typing import Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 
+from audio_catchup import CatchupConfig
+from audio_vad import VadConfig
+from ffmpeg_audio_streamer import FfmpegAudioStreamer
+from ffmpeg_supervisor import FfmpegSupervisor, build_pcm_command, profile_live_start_index
 
-class TwitchAudioStreamer:
-    """从 Twitch 直播串流提取音频并输出 PCM_s16le 到 Soniox。
 
-    依赖：streamlink + ffmpeg。
+class TwitchStreamResolver:
+    """Twitch 串流地址解析器：长期持有 streamlink 会话与插件，并缓存解析出的 HLS 地址。
 
-    说明：streamlink 为可选依赖，仅在使用 Twitch 作为音频源时才会尝试导入。
+    Twitch 的 multivariant 播放列表地址带有签名 token（其中包含过期时间），在过期前重复使用缓存的地址，
+    ffmpeg 重连时无需重新创建会话、加载插件和获取播放列表。
+    streamlink 返回给 ffmpeg 的 variant 地址不带 token，过期时间从对应 stream 的 multivariant 地址读取；
+    地址提前失效时 ffmpeg 读不到数据，由 invalidate() 丢弃缓存并重新解析。
     """
 
-    def __init__(
-        self,
-        ws,
-        channel: str,
-        quality: str = "audio_only",
-        ffmpeg_path: str = "ffmpeg",
-        sample_rate: int = 16000,
-        chunk_size: int = 3840,
-    ):
-        if not channel:
-            raise ValueError("Twitch channel is empty")
+    # 距离过期不足该时间（秒）时重新解析
+    REFRESH_MARGIN_SECONDS = 60.0
+    # 无法从地址中读出过期时间时的缓存时长（秒）
+    DEFAULT_TTL_SECONDS = 600.0
 
-        self.ws = ws
+    def __init__(self, channel: str, quality: str):
         self.channel = channel
         self.quality = quality
-        self.ffmpeg_path = ffmpeg_path
-        self.sample_rate = sample_rate
-        self.chunk_size = chunk_size
+        self.url = f"https://www.twitch.tv/{channel}"
 
-        self._stop_event = threading.Event()
-        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._session = None
+        self._plugin = None
+        self._stream_url: Optional[str] = None
+        self._expires_at = 0.0
+        self.resolve_count = 0
 
-    def start(self) -> None:
-        if self._thread and self._thread.is_alive():
-            return
+    def get_url(self) -> Tuple[str, bool]:
+        """返回 (串流地址, 是否来自缓存)"""
+        with self._lock:
+            if self._stream_url and time.time() < self._expires_at - self.REFRESH_MARGIN_SECONDS:
+                return self._stream_url, True
 
-        self._stop_event.clear()
-        self._thread = threading.Thread(target=self._run, name="TwitchAudioStreamer", daemon=True)
-        self._thread.start()
+            stream_url, expires_at = self._resolve()
+            self._stream_url = stream_url
+            self._expires_at = expires_at
+            self.resolve_count += 1
+            return stream_url, False
 
-    def stop(self) -> None:
-        self._stop_event.set()
-        thread = self._thread
-        if thread and thread.is_alive():
-            thread.join(timeout=2.0)
-        self._thread = None
+    def invalidate(self) -> None:
+        """丢弃缓存的地址（例如 ffmpeg 无法打开或未读到任何数据时）"""
+        with self._lock:
+            self._stream_url = None
+            self._expires_at = 0.0
+
+    def fetch_playlist(self, stream_url: str) -> str:
+        """使用已缓存的 streamlink 会话获取媒体播放列表（复用其 HTTP 连接）"""
+        with self._lock:
+            session = self._session
+        if session is None:
+            raise RuntimeError("streamlink session is not initialized")
+        response = session.http.get(stream_url, timeout=5)
+        return response.text
+
+    @staticmethod
+    def _manifest_url(stream) -> str:
+        """stream 对应的 multivariant 播放列表地址（旧版 streamlink 为 url_master）"""
+        try:
+            return stream.to_manifest_url()
+        except Exception:
+            return getattr(stream, "url_master", None) or ""
+
+    def _parse_expiry(self, stream_url: str) -> float:
+        """从 multivariant 播放列表地址的 token 参数中读取过期时间（unix 时间戳）"""
+        try:
+            token = parse_qs(urlparse(stream_url).query).get("token")
+            if token:
+                expires = json.loads(token[0]).get("expires")
+                if expires:
+                    return float(expires)
+        except Exception:
+            pass
+        return time.time() + self.DEFAULT_TTL_SECONDS
+
+    def _get_plugin(self):
+        if self._plugin is not None:
+            return self._plugin
 
-    def _resolve_stream_url(self) -> str:
         try:
             import streamlink
         except ModuleNotFoundError as exc:
@@ -59,23 +97,27 @@ class TwitchAudioStreamer:
                 "streamlink is not installed. Please install it (pip install streamlink)."
             ) from exc
 
-        session = streamlink.Streamlink()
-        url = f"https://www.twitch.tv/{self.channel}"
+        if self._session is None:
+            self._session = streamlink.Streamlink()
 
         # Twitch low-latency mode: initialize the Twitch plugin explicitly so we can pass plugin options.
         # If the installed streamlink version/plugin doesn't support this option, fall back to session.streams().
-        streams = None
         try:
             from streamlink.plugins.twitch import __plugin__ as Twitch
 
-            plugin = Twitch(session, url, options={"low-latency": True})
-            streams = plugin.streams()
+            self._plugin = Twitch(self._session, self.url, options={"low-latency": True})
         except Exception:
             print("⚠️  Unable to enable Twitch low-latency mode; falling back to standard streamlink behavior")
-            streams = session.streams(url)
+            self._plugin = False
+        return self._plugin
+
+    def _resolve(self) -> Tuple[str, float]:
+        """返回 (variant 播放列表地址, 过期时间)"""
+        plugin = self._get_plugin()
+        streams = plugin.streams() if plugin else self._session.streams(self.url)
 
         if not streams:
-            raise RuntimeError(f"No streams available for {url}")
+            raise RuntimeError(f"No streams available for {self.url}")
 
         preferred = self.quality
         stream = streams.get(preferred) or streams.get("audio_only") or streams.get("best")
@@ -83,81 +125,251 @@ class TwitchAudioStreamer:
             raise RuntimeError(f"Unable to find suitable stream quality (preferred={preferred})")
 
         try:
-            return stream.to_url()
+            stream_url = stream.to_url()
         except Exception as error:
             raise RuntimeError(f"Failed to resolve stream URL: {error}")
+        return stream_url, self._parse_expiry(self._manifest_url(stream))
 
-    def _run(self) -> None:
-        bytes_per_chunk = int(self.chunk_size) * 2  # int16 mono
 
-        while not self._stop_event.is_set():
-            process: Optional[subprocess.Popen] = None
+def _parse_program_date_time(value: str) -> float:
+    return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).timestamp()
+
+
+def parse_hls_segments(playlist: str) -> List[Tuple[float, float]]:
+    """解析 HLS 媒体播放列表，返回各分片的 (开始时间 unix 秒, 时长)。
+
+    开始时间来自 #EXT-X-PROGRAM-DATE-TIME；没有该标签的分片按上一分片顺延，
+    在出现第一个标签之前的分片被忽略。
+    """
+    segments: List[Tuple[float, float]] = []
+    program_time: Optional[float] = None
+    duration: Optional[float] = None
+    for line in playlist.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-PROGRAM-DATE-TIME:"):
             try:
-                stream_url = self._resolve_stream_url()
-                print(f"📺 Twitch audio streaming: {self.channel} ({self.quality})")
-
-                cmd = [
-                    self.ffmpeg_path,
-                    "-hide_banner",
-                    "-loglevel",
-                    "error",
-                    "-i",
-                    stream_url,
-                    "-vn",
-                    "-ac",
-                    "1",
-                    "-ar",
-                    str(self.sample_rate),
-                    "-f",
-                    "s16le",
-                    "-acodec",
-                    "pcm_s16le",
-                    "pipe:1",
-                ]
-
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    bufsize=0,
-                )
-
-                assert process.stdout is not None
-                while not self._stop_event.is_set():
-                    data = process.stdout.read(bytes_per_chunk)
-                    if not data:
-                        break
-                    try:
-                        self.ws.send(data)
-                    except Exception as send_error:
-                        print(f"Error sending Twitch audio data: {send_error}")
-                        return
-
-                if self._stop_event.is_set():
-                    return
-
-                stderr_text = ""
-                if process.stderr is not None:
-                    try:
-                        stderr_text = process.stderr.read().decode("utf-8", errors="ignore").strip()
-                    except Exception:
-                        stderr_text = ""
-                if stderr_text:
-                    print(f"ffmpeg error: {stderr_text}")
-
-            except FileNotFoundError:
-                print("❌ ffmpeg not found. Please install ffmpeg and ensure it's in PATH, or set FFMPEG_PATH in config.py")
-                return
-            except ModuleNotFoundError as error:
-                print(f"❌ {error}")
+                program_time = _parse_program_date_time(line.split(":", 1)[1])
+            except ValueError:
+                program_time = None
+        elif line.startswith("#EXTINF:"):
+            try:
+                duration = float(line[len("#EXTINF:"):].split(",", 1)[0])
+            except ValueError:
+                duration = None
+        elif line and not line.startswith("#"):
+            if program_time is not None and duration is not None:
+                segments.append((program_time, duration))
+                program_time += duration
+            duration = None
+    return segments
+
+
+class LiveEdgeMonitor:
+    """直播延迟估计：定期获取播放列表，用分片时间戳与墙钟比较。
+
+    - live_edge_lag：最新分片结束时间落后墙钟的时长（编码/CDN/播放列表更新造成的延迟）
+    - decoder_lag：ffmpeg 已输出音频对应的直播时间落后墙钟的时长。
+      ffmpeg 启动时记下起始分片的时间戳，此后用 -progress 的 out_time 推算已输出位置
+    - 两者之差即 HLS 分片缓冲 + 格式探测 + 解码/管道缓冲造成的延迟
+
+    播放列表只在监测线程中获取，缓慢的 HTTP 请求不会阻塞 PCM 读取线程。
+    """
+
+    def __init__(self, resolver: TwitchStreamResolver, decoder: FfmpegSupervisor, profile: str, interval: float):
+        self.resolver = resolver
+        self.decoder = decoder
+        self.live_start_index = profile_live_start_index(profile)
+        self.interval = interval
+
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stream_url: Optional[str] = None
+        self._anchor_generation = 0  # 每次 ffmpeg 启动加一，监测线程据此重新记录起始分片
+        self._start_media_time: Optional[float] = None
+        self.live_edge_lag_ms: Optional[float] = None
+        self.decoder_lag_ms: Optional[float] = None
+
+    def anchor(self, stream_url: str) -> None:
+        """ffmpeg 刚启动时调用（读取线程）：唤醒监测线程，按 live_start_index 记录起始分片的直播时间"""
+        self._stream_url = stream_url
+        self._start_media_time = None
+        self._anchor_generation += 1
+        self._wake.set()
+
+    def start(self) -> None:
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name="TwitchLiveEdgeMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        anchored = 0
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop_event.is_set():
                 return
-            except Exception as error:
-                print(f"Error streaming Twitch audio: {error}")
-            finally:
-                if process and process.poll() is None:
-                    try:
-                        process.terminate()
-                    except Exception:
-                        pass
-
-            time.sleep(1.0)
+            generation = self._anchor_generation
+            stream_url = self._stream_url
+            if not stream_url:
+                continue
+            try:
+                segments = parse_hls_segments(self.resolver.fetch_playlist(stream_url))
+            except Exception:
+                continue
+            if not segments:
+                continue
+
+            if generation != anchored:
+                anchored = generation
+                # 获取期间 ffmpeg 又重启了：等待下一次唤醒按新地址记录
+                if generation == self._anchor_generation:
+                    index = max(-len(segments), min(self.live_start_index, len(segments) - 1))
+                    self._start_media_time = segments[index][0]
+
+            now = time.time()
+            last_start, last_duration = segments[-1]
+            self.live_edge_lag_ms = (now - (last_start + last_duration)) * 1000
+
+            start_media_time = self._start_media_time
+            out_time = self.decoder.out_time_seconds
+            if start_media_time is not None and out_time > 0:
+                self.decoder_lag_ms = (now - (start_media_time + out_time)) * 1000
+
+    def get_stats(self) -> dict:
+        live_edge_lag = self.live_edge_lag_ms
+        decoder_lag = self.decoder_lag_ms
+        buffering = None
+        if live_edge_lag is not None and decoder_lag is not None:
+            buffering = decoder_lag - live_edge_lag
+        return {
+            "ingest_live_edge_lag_ms": live_edge_lag,
+            "ingest_decoder_lag_ms": decoder_lag,
+            "stage_source_to_playlist_ms": live_edge_lag,
+            "stage_hls_and_decoder_ms": buffering,
+        }
+
+
+_resolvers: Dict[Tuple[str, str], TwitchStreamResolver] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_stream_resolver(channel: str, quality: str) -> TwitchStreamResolver:
+    """按频道与码流获取进程内共享的解析器（跨 Soniox 会话复用）"""
+    key = (channel, quality)
+    with _resolvers_lock:
+        resolver = _resolvers.get(key)
+        if resolver is None:
+            resolver = TwitchStreamResolver(channel, quality)
+            _resolvers[key] = resolver
+        return resolver
+
+
+class TwitchAudioStreamer(FfmpegAudioStreamer):
+    """从 Twitch 直播串流提取音频并输出 PCM_s16le 到 Soniox。
+
+    依赖：streamlink + ffmpeg。
+
+    说明：streamlink 为可选依赖，仅在使用 Twitch 作为音频源时才会尝试导入。
+
+    拉流、解码与重连由 FfmpegAudioStreamer 完成；这里只负责用 streamlink 解析（并缓存）HLS 地址，
+    以及按播放列表估计直播延迟。
+    """
+
+    thread_name = "TwitchAudioStreamer"
+    sender_name = "TwitchAudioSender"
+    source_label = "Twitch"
+
+    def __init__(
+        self,
+        ws,
+        channel: str,
+        quality: str = "audio_only",
+        ffmpeg_path: str = "ffmpeg",
+        sample_rate: int = 16000,
+        chunk_size: int = 3840,
+        max_backlog_ms: int = 2000,
+        vad_config: Optional[VadConfig] = None,
+        keepalive_interval: float = 5.0,
+        min_chunk_size: Optional[int] = None,
+        reconnect_buffer_ms: int = 0,
+        stall_seconds: float = 6.0,
+        ingest_profile: str = "standard",
+        live_edge_interval: float = 5.0,
+        catchup_config: Optional[CatchupConfig] = None,
+        finalize_silence_ms: int = 0,
+    ):
+        if not channel:
+            raise ValueError("Twitch channel is empty")
+
+        self.channel = channel
+        self.quality = quality
+        self.resolver = get_stream_resolver(channel, quality)
+        super().__init__(
+            ws,
+            input_url=self.resolver.url,
+            ffmpeg_path=ffmpeg_path,
+            sample_rate=sample_rate,
+            chunk_size=chunk_size,
+            max_backlog_ms=max_backlog_ms,
+            vad_config=vad_config,
+            keepalive_interval=keepalive_interval,
+            min_chunk_size=min_chunk_size,
+            reconnect_buffer_ms=reconnect_buffer_ms,
+            stall_seconds=stall_seconds,
+            ingest_profile=ingest_profile,
+            catchup_config=catchup_config,
+            finalize_silence_ms=finalize_silence_ms,
+        )
+        self.live_edge = LiveEdgeMonitor(self.resolver, self.decoder, ingest_profile, live_edge_interval)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        super().start()
+        self.live_edge.start()
+
+    def stop(self) -> None:
+        self.live_edge.stop()
+        super().stop()
+
+    def get_stats(self) -> dict:
+        """获取读取/发送缓冲区统计"""
+        stats = super().get_stats()
+        stats["stream_url_resolves"] = self.resolver.resolve_count
+        stats.update(self.live_edge.get_stats())
+        return stats
+
+    def _is_finite_input(self, input_url: str) -> bool:
+        """Twitch 频道地址始终是直播"""
+        return False
+
+    def _resolve_input(self) -> str:
+        stream_url, cached = self.resolver.get_url()
+        source = "cached URL" if cached else "resolved URL"
+        print(
+            f"📺 Twitch audio streaming: {self.channel} ({self.quality}, {source}, {self.ingest_profile} profile)"
+        )
+        return stream_url
+
+    def _build_command(self, input_url: str) -> List[str]:
+        # streamlink 解析出的 Twitch 地址总是 HLS 播放列表
+        return build_pcm_command(self.ffmpeg_path, input_url, self.sample_rate, self.ingest_profile)
+
+    def _on_decoder_started(self, input_url: str) -> None:
+        self.live_edge.anchor(input_url)
+
+    def _on_no_data(self) -> None:
+        # 没有读到任何数据：地址可能已失效或直播已结束，下次重新解析
+        self.resolver.invalidate()
@@ -9,7 +9,7 @@ from aiohttp import web
 from aiohttp import WSMsgType
 
 from config import get_resource_path, LOCK_MANUAL_CONTROLS, EXTERNAL_WS_URI
-from audio_capture import get_audio_devices
+from audio_capture import device_registry
 
 # 日语假名注音支持
 try:
@@ -295,14 +295,16 @@ class WebServer:
                 status=403
             )
 
-        from soniox_client import get_api_key
+        from soniox_client import get_api_key_async
 
         is_auto = False
+        prefer_handover = False
         requested_target_lang = None
         try:
             payload = await request.json()
             if isinstance(payload, dict):
                 is_auto = bool(payload.get("auto"))
+                prefer_handover = bool(payload.get("handover"))
                 if payload.get("target_lang") is not None:
                     requested_target_lang = payload.get("target_lang")
         except Exception:
@@ -311,13 +313,20 @@ class WebServer:
         
         print("\n[Server] Received restart request...")
 
+        previous_target_lang = self.soniox_session.get_translation_target_lang()
         if requested_target_lang is not None:
             ok, message = self.soniox_session.set_translation_target_lang(requested_target_lang)
             if not ok:
                 return web.json_response({"status": "error", "message": message}, status=400)
+
+        # 会话正在运行时以 make-before-break 方式交接：新连接接管前旧连接继续识别，字幕与日志保持不变
+        if prefer_handover:
+            changed = self.soniox_session.get_translation_target_lang() != previous_target_lang
+            if self.soniox_session.handover("translation target change" if changed else "restart"):
+                return web.json_response({"status": "ok", "message": "Recognition handover started", "mode": "handover"})
         
-        # 先停止当前的Soniox会话
-        self.soniox_session.stop()
+        # 先停止当前的Soniox会话（保持采集，新会话补发重启期间的音频）
+        self.soniox_session.stop(keep_capture=True)
         
         # 关闭当前日志文件
         self.logger.close_log_file()
@@ -344,23 +353,27 @@ class WebServer:
         # 启动新的Soniox会话
         try:
             print("[Server] Starting new recognition session...")
-            api_key = get_api_key()
+            api_key = await get_api_key_async()
             audio_format = "pcm_s16le"
             translation = "one_way"  # 总是启用翻译
             
             loop = asyncio.get_event_loop()
-            self.soniox_session.start(
+            started = self.soniox_session.start(
                 api_key,
                 audio_format,
                 translation,
                 loop,
                 translation_target_lang=self.soniox_session.get_translation_target_lang(),
             )
+            if not started:
+                raise RuntimeError("Failed to start recognition session")
             
             print("[Server] New session started successfully")
-            return web.json_response({"status": "ok", "message": "Recognition restarted"})
+            return web.json_response({"status": "ok", "message": "Recognition restarted", "mode": "restart"})
         except Exception as e:
             print(f"[Server] Failed to restart: {e}")
+            # 新会话没有启动：停止为重启保留的采集
+            self.soniox_session.stop()
             return web.json_response({"status": "error", "message": str(e)}, status=500)
 
     async def osc_translation_get_handler(self, request):
@@ -393,15 +406,28 @@ class WebServer:
                 status=403
             )
 
+        # 可选 {"mode": "soft" | "hard"}：soft 保持连接以便立即恢复，hard 断开连接（长时间休息）
+        mode = None
+        try:
+            payload = await request.json()
+            if isinstance(payload, dict) and payload.get("mode") is not None:
+                mode = str(payload.get("mode"))
+        except Exception:
+            # 兼容旧客户端：无 body 时使用默认暂停方式
+            mode = None
+
         print("\n[Server] Received pause request...")
-        paused = self.soniox_session.pause()
+        try:
+            paused = self.soniox_session.pause(mode)
+        except ValueError as error:
+            return web.json_response({"status": "error", "message": str(error)}, status=400)
 
         if paused:
             message = "Recognition paused"
         else:
             message = "Recognition already paused"
 
-        return web.json_response({"status": "ok", "message": message})
+        return web.json_response({"status": "ok", "message": message, "mode": self.soniox_session.pause_mode})
     
     async def resume_handler(self, request):
         """恢复识别端点"""
@@ -412,13 +438,18 @@ class WebServer:
             )
 
         print("\n[Server] Received resume request...")
-        from soniox_client import get_api_key
+        from soniox_client import get_api_key_async
 
         if not self.soniox_session.is_paused:
             return web.json_response({"status": "ok", "message": "Recognition already running"})
 
+        if self.soniox_session.can_resume_in_place():
+            # 软暂停：连接仍在，无需获取 key 或重新连接
+            self.soniox_session.resume()
+            return web.json_response({"status": "ok", "message": "Recognition resumed", "mode": "soft"})
+
         try:
-            api_key = get_api_key()
+            api_key = await get_api_key_async()
         except RuntimeError as error:
             print(f"[Server] Resume failed: {error}")
             return web.json_response({"status": "error", "message": str(error)}, status=500)
@@ -492,13 +523,20 @@ class WebServer:
         return web.json_response({"status": "ok", "html": html})
 
     async def get_audio_devices_handler(self, request):
-        """获取所有可用的音频设备列表"""
-        devices = get_audio_devices()
+        """获取所有可用的音频设备列表（读取设备注册表缓存，不在事件循环上枚举设备）"""
+        devices = await device_registry.get_devices_async()
         return web.json_response({
             "status": "ok",
             "devices": devices
         })
 
+    async def get_audio_metrics_handler(self, request):
+        """获取最近一次汇总的音频指标（由后台线程定期更新，此处只读取结果）"""
+        return web.json_response({
+            "status": "ok",
+            "metrics": self.soniox_session.get_audio_metrics()
+        })
+
     async def get_audio_device_settings_handler(self, request):
         """获取当前音频设备设置"""
         return web.json_response({
@@ -597,6 +635,7 @@ class WebServer:
         app.router.add_get('/audio-source', self.get_audio_source_handler)
         app.router.add_post('/audio-source', self.set_audio_source_handler)
         app.router.add_get('/audio-devices', self.get_audio_devices_handler)
+        app.router.add_get('/audio-metrics', self.get_audio_metrics_handler)
         app.router.add_get('/audio-device-settings', self.get_audio_device_settings_handler)
         app.router.add_post('/audio-device-input', self.set_input_device_handler)
         app.router.add_post('/audio-device-output', self.set_output_device_handler)